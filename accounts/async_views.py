@@ -0,0 +1,153 @@
+"""
+Native async views, routed instead of their DRF counterparts when
+QUIZ_ASYNC_VIEWS is on (see `quiz.async_views` for the quiz ones).
+
+DRF views are synchronous, so these are plain Django coroutines that mirror
+the DRF behaviour: JWT authentication, JSON bodies rendered with DRF's
+encoder and `{"detail": ...}` errors. Login and activation await password
+hashing (see `accounts.hashing`) instead of running it on the event loop.
+"""
+import json
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate as aauthenticate_credentials
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from . import hashing
+from .authentication import ClaimsJWTAuthentication, ClaimsUser, claims_user
+from .models import CustomUser
+from .serializers import LoginSerializer, ParticipantActivationSerializer, UserSerializer, login_response
+
+
+def api_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def error_response(detail, status):
+    return api_response({"detail": detail}, status=status)
+
+
+def _busy(exc):
+    response = error_response(exc.detail, exc.status_code)
+    response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+def parse_body(request):
+    """Request data, from a JSON or form body; raises ValueError on malformed JSON."""
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST
+
+
+def _unauthorized(request, auth, detail):
+    response = api_response(detail if isinstance(detail, dict) else {"detail": detail}, status=401)
+    response['WWW-Authenticate'] = auth.authenticate_header(request)
+    return response
+
+
+async def aauthenticate(request):
+    """
+    Async ClaimsJWTAuthentication: the token is checked in process and, when
+    it lacks the claims, its user loaded with the async ORM. Sets
+    `request.user` and returns None, or returns the 401 response.
+    """
+    auth = ClaimsJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return _unauthorized(request, auth, "Authentication credentials were not provided.")
+    try:
+        validated_token = auth.get_validated_token(raw_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except InvalidToken as e:
+        return _unauthorized(request, auth, e.detail)
+    except KeyError:
+        return _unauthorized(request, auth, "Token contained no recognizable user identification")
+
+    user = claims_user(validated_token)
+    if user is None:
+        user = await CustomUser.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None:
+            return _unauthorized(request, auth, "User not found")
+        if not user.is_active:
+            return _unauthorized(request, auth, "User is inactive")
+    request.user = user
+    return None
+
+
+def jwt_authenticated(view):
+    """Run an async view for JWT-authenticated callers only."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        response = await aauthenticate(request)
+        if response is not None:
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_GET
+@jwt_authenticated
+async def me(request):
+    """Async `ProtectedMeView`."""
+    user = request.user
+    if isinstance(user, ClaimsUser):
+        try:
+            user = await user.aget_user()
+        except AuthenticationFailed as e:
+            return _unauthorized(request, ClaimsJWTAuthentication(), e.detail)
+    return api_response(UserSerializer(user).data)
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    """Async `LoginView`."""
+    try:
+        data = parse_body(request)
+    except ValueError as e:
+        return error_response(f"JSON parse error - {e}", 400)
+    try:
+        # Field checks only: the credentials are checked below
+        credentials = LoginSerializer().to_internal_value(data)
+    except serializers.ValidationError as e:
+        error = e.detail.get("non_field_errors") or e.detail.get("username")
+        return error_response(error[0] if error else "Invalid input.", 401)
+
+    try:
+        user = await aauthenticate_credentials(username=credentials["username"], password=credentials["password"])
+    except hashing.HashingBusy as e:
+        return _busy(e)
+    if user is None:
+        return error_response("Invalid username or password.", 401)
+    return api_response(await sync_to_async(login_response)(user))
+
+
+@csrf_exempt
+@require_http_methods(["PATCH"])
+async def activate(request):
+    """Async `ActivateParticipantView`."""
+    try:
+        data = parse_body(request)
+    except ValueError as e:
+        return error_response(f"JSON parse error - {e}", 400)
+    serializer = ParticipantActivationSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return api_response(serializer.errors, status=400)
+
+    try:
+        password_hash = await hashing.amake_password(serializer.validated_data["password"])
+    except hashing.HashingBusy as e:
+        return _busy(e)
+
+    def save():
+        user = serializer.save(password_hash=password_hash)
+        return login_response(user, participant=serializer.quiz_participant.participant_id)
+    return api_response(await sync_to_async(save)())
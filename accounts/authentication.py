@@ -0,0 +1,139 @@
+"""
+JWT authentication from token claims alone.
+
+Tokens minted by `accounts.tokens.for_user` carry the user type and the
+participant profile id, which is all the permission classes and the
+enrolment lookup need: `ClaimsJWTAuthentication` turns them into a
+`ClaimsUser` without touching the database. Views that need the full user
+(e.g. /me) load it through `user_cache`, a small per-process LRU whose
+entries expire after AUTH_USER_CACHE_TTL seconds and are dropped when the
+user is saved or deleted in this process.
+
+Tokens without the claims (minted before them) are authenticated as before,
+by loading the user.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.utils.functional import cached_property
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from .models import CustomUser
+from .tokens import USER_TYPE_CLAIM
+
+
+class UserCache:
+    """Thread-safe LRU of users, each kept at most `ttl` seconds."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pk):
+        with self._lock:
+            entry = self._users.get(pk)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._users[pk]
+                return None
+            self._users.move_to_end(pk)
+        # A copy: requests must not share a mutable instance
+        return copy.copy(user)
+
+    def set(self, user):
+        with self._lock:
+            self._users[user.pk] = (copy.copy(user), time.monotonic() + self.ttl)
+            self._users.move_to_end(user.pk)
+            while len(self._users) > self.size:
+                self._users.popitem(last=False)
+
+    def discard(self, pk):
+        with self._lock:
+            self._users.pop(pk, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+def _checked(user):
+    if user is None:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    user_cache.set(user)
+    return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    Authenticated user backed by its token: `pk`, `user_type` and
+    `participant_id` are claims. Any other attribute is read from the full
+    user (see `get_user`).
+    """
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the id as a string
+        return CustomUser._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def username(self):
+        return self.get_user().username
+
+    def get_user(self):
+        """The full CustomUser, from `user_cache` or the database."""
+        user = user_cache.get(self.pk)
+        if user is None:
+            user = _checked(CustomUser.objects.filter(pk=self.pk).first())
+        return user
+
+    async def aget_user(self):
+        """`get_user` for async views."""
+        user = user_cache.get(self.pk)
+        if user is None:
+            user = _checked(await CustomUser.objects.filter(pk=self.pk).afirst())
+        return user
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or attr == 'token':
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.get_user(), attr)
+
+
+def claims_user(validated_token):
+    """A ClaimsUser for a token carrying the claims, else None."""
+    if USER_TYPE_CLAIM in validated_token and api_settings.USER_ID_CLAIM in validated_token:
+        return ClaimsUser(validated_token)
+    return None
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the claims of the token instead of loading its user."""
+
+    def get_user(self, validated_token):
+        return claims_user(validated_token) or super().get_user(validated_token)
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """Documents ClaimsJWTAuthentication as the bearer JWT scheme."""
+    target_class = ClaimsJWTAuthentication
+
+
+def full_user(user):
+    """The CustomUser behind an authenticated `request.user`."""
+    return user.get_user() if isinstance(user, ClaimsUser) else user
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from . import hashing
+
+UserModel = get_user_model()
+
+
+class HashingExecutorBackend(ModelBackend):
+    """ModelBackend whose password checks run on the hashing executor (see accounts.hashing)."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = UserModel._default_manager.filter(**{UserModel.USERNAME_FIELD: username}).first()
+        is_correct, must_update = hashing.verify_password(password, user.password if user else '')
+        if not (is_correct and self.user_can_authenticate(user)):
+            return None
+        if must_update:
+            user.password = hashing.make_password(password)
+            user.save(update_fields=['password'])
+        return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = await UserModel._default_manager.filter(**{UserModel.USERNAME_FIELD: username}).afirst()
+        is_correct, must_update = await hashing.averify_password(password, user.password if user else '')
+        if not (is_correct and self.user_can_authenticate(user)):
+            return None
+        if must_update:
+            user.password = await hashing.amake_password(password)
+            await user.asave(update_fields=['password'])
+        return user
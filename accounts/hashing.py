@@ -0,0 +1,131 @@
+"""
+Password hashing off the request workers.
+
+Password hashers are slow on purpose; during a login storm they would hold
+every worker thread (and, under ASGI, block the event loop). With
+AUTH_HASHING_WORKERS > 0, password checks (login) and hashes (activation)
+run on a pool of that many processes; sync views wait for the result,
+async views await it. At most AUTH_HASHING_QUEUE_SIZE jobs wait for a free
+worker: beyond that `HashingBusy` is raised and answered 503 with a
+Retry-After header, so a storm sheds load instead of piling up requests.
+With 0 workers (the default) hashing runs inline, as Django does.
+
+Workers hash with the PASSWORD_HASHERS of the process that started them.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many logins in progress, retry shortly."
+    default_code = 'hashing_busy'
+
+    def __init__(self):
+        super().__init__()
+        # DRF's exception handler turns it into a Retry-After header
+        self.wait = settings.AUTH_HASHING_RETRY_AFTER
+
+
+def _init_worker(password_hashers):
+    # Spawned workers only hash: they need no project settings but these
+    if not settings.configured:
+        settings.configure(PASSWORD_HASHERS=password_hashers)
+
+
+class HashingExecutor:
+    """Process pool with a bounded number of jobs in flight."""
+
+    def __init__(self, workers, queue_size):
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # Not fork: the server process has threads and open connections
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(settings.PASSWORD_HASHERS,),
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, fn, *args):
+        """Future of `fn(*args)` on a worker; raises HashingBusy when the queue is full."""
+        if not self.slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self.pool.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The shared HashingExecutor, started on first use; None when hashing runs inline."""
+    global _executor
+    if settings.AUTH_HASHING_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = HashingExecutor(settings.AUTH_HASHING_WORKERS, settings.AUTH_HASHING_QUEUE_SIZE)
+        return _executor
+
+
+@receiver(setting_changed)
+def reset_executor(setting, **kwargs):
+    global _executor
+    if setting.startswith('AUTH_HASHING_') or setting == 'PASSWORD_HASHERS':
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown()
+                _executor = None
+
+
+def _run(fn, *args):
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+    return executor.submit(fn, *args).result()
+
+
+async def _arun(fn, *args):
+    executor = get_executor()
+    if executor is None:
+        # Off the event loop, without taking the thread shared by sync_to_async calls
+        return await sync_to_async(fn, thread_sensitive=False)(*args)
+    return await asyncio.wrap_future(executor.submit(fn, *args))
+
+
+def verify_password(password, encoded):
+    """
+    (is correct, must be rehashed) for a password and its hash. An unknown
+    user's hash is '': the hasher still runs once, so both take as long.
+    """
+    return _run(hashers.verify_password, password, encoded)
+
+
+async def averify_password(password, encoded):
+    return await _arun(hashers.verify_password, password, encoded)
+
+
+def make_password(password):
+    return _run(hashers.make_password, password)
+
+
+async def amake_password(password):
+    return await _arun(hashers.make_password, password)
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def drop_sessions(apps, schema_editor):
+    # Rows hold full token strings and no jti: users without a row start a
+    # new session on their next login or refresh
+    apps.get_model('accounts', 'UserToken').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sessions, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='usertoken',
+            name='access_token',
+        ),
+        migrations.RemoveField(
+            model_name='usertoken',
+            name='refresh_token',
+        ),
+        migrations.AddField(
+            model_name='usertoken',
+            name='jti',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='usertoken',
+            name='expires_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
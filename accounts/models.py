@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 class CustomUser(AbstractUser):
     CREATOR = 'creator'
@@ -12,11 +13,18 @@ class CustomUser(AbstractUser):
 
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default=CREATOR)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive email lookups (bulk invitations)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
+
 
 class UserToken(models.Model):
+    """The user's one session: the refresh token last issued to it (see accounts.sessions)."""
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
-    access_token = models.TextField()
-    refresh_token = models.TextField()
+    jti = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
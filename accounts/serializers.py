@@ -4,7 +4,26 @@ from django.utils.timezone import now
 from quiz.models import QuizParticipant
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
-from accounts.models import UserToken
+from accounts import hashing
+from accounts.sessions import rotate_session, start_session
+from accounts.tokens import PARTICIPANT_CLAIM, for_user
+from oper.db_routers import pin
+
+
+def login_response(user, participant=None):
+    """Start a new session for `user`; the response body with its tokens."""
+    refresh = for_user(user, participant=participant)
+    start_session(user, refresh)
+    # The caller is not authenticated yet: PrimaryPinMiddleware cannot pin them
+    pin(user.pk)
+    return {
+        "access": str(refresh.access_token),
+        "refresh": str(refresh),
+        "user": {
+            "email": user.email,
+            "user_type": user.user_type,
+        }
+    }
 
 
 class ParticipantActivationSerializer(serializers.Serializer):
@@ -29,9 +48,10 @@ class ParticipantActivationSerializer(serializers.Serializer):
         self.quiz_participant = quiz_participant
         return data
 
-    def save(self):
+    def save(self, password_hash=None):
+        # Async views hash the password beforehand, without blocking the loop
         user = self.user
-        user.set_password(self.validated_data["password"])
+        user.password = password_hash or hashing.make_password(self.validated_data["password"])
         user.is_active = True
         user.save()
 
@@ -51,22 +71,7 @@ class LoginSerializer(serializers.Serializer):
         if not user:
             raise serializers.ValidationError("Invalid username or password.")
 
-        refresh = RefreshToken.for_user(user)
-        access = str(refresh.access_token)
-
-        UserToken.objects.update_or_create(
-            user=user,
-            defaults={"access_token": access, "refresh_token": str(refresh)}
-        )
-
-        return {
-            "access": access,
-            "refresh": str(refresh),
-            "user": {
-                "email": user.email,
-                "user_type": user.user_type,
-            }
-        }
+        return login_response(user)
 
 
 class TokenRefreshSerializer(serializers.Serializer):
@@ -88,16 +93,12 @@ class TokenRefreshSerializer(serializers.Serializer):
         except get_user_model().DoesNotExist:
             raise serializers.ValidationError("User not found.")
 
-        new_refresh = RefreshToken.for_user(user)
+        new_refresh = for_user(user, participant=old_refresh.get(PARTICIPANT_CLAIM))
         new_access = str(new_refresh.access_token)
 
-        UserToken.objects.update_or_create(
-            user=user,
-            defaults={
-                "access_token": new_access,
-                "refresh_token": str(new_refresh),
-            }
-        )
+        # Only the user's current session can be refreshed
+        if not rotate_session(user, old_refresh, new_refresh):
+            raise serializers.ValidationError("Session ended by a newer login.")
 
         return {
             "access": new_access,
@@ -0,0 +1,95 @@
+"""
+One session per user: only the refresh token last issued to a user can be
+refreshed. Logging in (or activating) starts a new session and ends the
+previous one; its access token stays valid until it expires.
+
+A session is just the `jti` and expiry of its refresh token, kept by the
+store named in AUTH_SESSION_STORE:
+
+- "db": a UserToken row per user, written with a single upsert on login
+  and a single compare-and-swap UPDATE on refresh;
+- "cache": a cache key per user, expiring with the refresh token; shared
+  by all workers only with a shared cache backend. A refresh claims the
+  token it spends with an atomic `cache.add`, so a token is rotated once
+  however many concurrent refreshes present it. A login racing a refresh
+  of the previous session may still be overwritten by it: unlike the "db"
+  store, this one is best-effort against that race.
+
+A user without a recorded session (evicted from the cache, or none since
+sessions were recorded) may refresh any valid token, which becomes its
+session.
+"""
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import UserToken
+
+DB = 'db'
+CACHE = 'cache'
+
+
+def _expires_at(refresh):
+    return datetime.fromtimestamp(refresh['exp'], tz=dt_timezone.utc)
+
+
+class DatabaseSessions:
+
+    def start(self, user_id, refresh):
+        UserToken.objects.bulk_create(
+            [UserToken(user_id=user_id, jti=refresh['jti'], expires_at=_expires_at(refresh))],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['jti', 'expires_at', 'updated_at'],
+        )
+
+    def rotate(self, user_id, old, new):
+        rotated = UserToken.objects.filter(user_id=user_id, jti=old['jti']).update(
+            jti=new['jti'], expires_at=_expires_at(new), updated_at=timezone.now()
+        )
+        if rotated:
+            return True
+        if UserToken.objects.filter(user_id=user_id).exists():
+            return False
+        self.start(user_id, new)
+        return True
+
+
+def _timeout(refresh):
+    return max(refresh['exp'] - int(timezone.now().timestamp()), 1)
+
+
+class CacheSessions:
+    key = 'auth-session:{}'
+    # Set once a refresh token has been spent, until it expires
+    spent_key = 'auth-session-spent:{}'
+
+    def start(self, user_id, refresh):
+        cache.set(self.key.format(user_id), refresh['jti'], _timeout(refresh))
+
+    def rotate(self, user_id, old, new):
+        current = cache.get(self.key.format(user_id))
+        if current is not None and current != old['jti']:
+            return False
+        # Of concurrent rotations of `old`, only the one adding the key goes on
+        if not cache.add(self.spent_key.format(old['jti']), True, _timeout(old)):
+            return False
+        self.start(user_id, new)
+        return True
+
+
+STORES = {DB: DatabaseSessions(), CACHE: CacheSessions()}
+
+
+def session_store():
+    return STORES[settings.AUTH_SESSION_STORE]
+
+
+def start_session(user, refresh):
+    """Make `refresh` the user's only refreshable token."""
+    session_store().start(user.pk, refresh)
+
+
+def rotate_session(user, old, new):
+    """Replace the user's session `old` by `new`; False if `old` is not its session."""
+    return session_store().rotate(user.pk, old, new)
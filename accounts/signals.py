@@ -0,0 +1,9 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import user_cache
+from .models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def evict_user(sender, instance, **kwargs):
+    user_cache.discard(instance.pk)
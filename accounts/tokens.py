@@ -0,0 +1,40 @@
+"""
+JWTs carrying the claims that authenticate a request without a database
+query (see `accounts.authentication`): the user type and, for participants,
+the id of their `Participant` profile.
+
+Every token pair is minted with `for_user`; the access token inherits the
+claims of its refresh token.
+"""
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import CustomUser
+
+USER_TYPE_CLAIM = 'user_type'
+PARTICIPANT_CLAIM = 'participant_id'
+# Read by TokenUser.is_staff; only set on staff tokens
+STAFF_CLAIM = 'is_staff'
+
+
+def participant_id(user):
+    """Id of the user's Participant profile, None for creators and users without one."""
+    if user.user_type != CustomUser.PARTICIPANT:
+        return None
+    try:
+        return user.participant_profile.pk
+    except ObjectDoesNotExist:
+        return None
+
+
+def for_user(user, participant=None):
+    """
+    RefreshToken for `user` with the authentication claims. `participant` is
+    the id of the user's profile when already known (a profile is never
+    reassigned), saving its lookup.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh[USER_TYPE_CLAIM] = user.user_type
+    refresh[PARTICIPANT_CLAIM] = participant or participant_id(user)
+    if user.is_staff:
+        refresh[STAFF_CLAIM] = True
+    return refresh
@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from accounts import async_views
 from accounts.views import ActivateParticipantView, LoginView, RefreshTokenView, ProtectedMeView
 
 
 urlpatterns = [
-    path("activate/", ActivateParticipantView.as_view(), name="participant-activate"),
-    path("login/", LoginView.as_view(), name="login"),
+    path(
+        "activate/",
+        async_views.activate if settings.QUIZ_ASYNC_VIEWS else ActivateParticipantView.as_view(),
+        name="participant-activate",
+    ),
+    path("login/", async_views.login if settings.QUIZ_ASYNC_VIEWS else LoginView.as_view(), name="login"),
     path("refresh/", RefreshTokenView.as_view(), name="token-refresh"),
-    path("me/", ProtectedMeView.as_view(), name="me"),
+    path("me/", async_views.me if settings.QUIZ_ASYNC_VIEWS else ProtectedMeView.as_view(), name="me"),
 ]
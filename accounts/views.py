@@ -3,16 +3,16 @@ from rest_framework.generics import RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from accounts.serializers import (
     ParticipantActivationSerializer,
     LoginSerializer,
     TokenRefreshSerializer,
-    UserSerializer
+    UserSerializer,
+    login_response,
 )
 from drf_spectacular.utils import extend_schema, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
-from .models import UserToken
+from .authentication import full_user
 
 
 class ActivateParticipantView(APIView):
@@ -37,21 +37,10 @@ class ActivateParticipantView(APIView):
         serializer = ParticipantActivationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-
-            UserToken.objects.update_or_create(
-                user=user,
-                defaults={"access_token": str(refresh.access_token), "refresh_token": str(refresh)}
+            return Response(
+                login_response(user, participant=serializer.quiz_participant.participant_id),
+                status=status.HTTP_200_OK
             )
-
-            return Response({
-                "access": str(refresh.access_token),
-                "refresh": str(refresh),
-                "user": {
-                    "email": user.email,
-                    "user_type": user.user_type,
-                }
-            }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -117,4 +106,4 @@ class ProtectedMeView(RetrieveAPIView):
     serializer_class = UserSerializer
 
     def get_object(self):
-        return self.request.user
+        return full_user(self.request.user)
@@ -0,0 +1,74 @@
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'created_at',
+        'method',
+        'path',
+        'status_code',
+        'duration_ms',
+        'query_count',
+        'db_time_ms',
+        'sampled',
+        'download',
+    )
+    list_filter = ('route', 'sampled', 'created_at')
+    search_fields = ['request_id', 'path']
+    list_select_related = ('user',)
+    # The profile itself is downloaded, never rendered
+    exclude = ('profile', 'stats', 'statements')
+    readonly_fields = (
+        'request_id', 'created_at', 'user', 'method', 'path', 'route', 'status_code',
+        'duration_ms', 'query_count', 'db_time_ms', 'sampled', 'download', 'stats_summary', 'sql_log',
+    )
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            # The list shows no blob: don't read them
+            queryset = queryset.defer('profile', 'stats', 'statements')
+        return queryset
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='monitoring_requestprofile_download',
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(bytes(profile.profile), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="{profile.request_id}.prof"'
+        return response
+
+    def download(self, obj):
+        url = reverse('admin:monitoring_requestprofile_download', args=[obj.pk])
+        return format_html('<a href="{}">{}.prof</a>', url, obj.request_id)
+    download.short_description = 'Profile'
+
+    def stats_summary(self, obj):
+        return format_html('<pre>{}</pre>', obj.stats)
+    stats_summary.short_description = 'Top functions'
+
+    def sql_log(self, obj):
+        lines = '\n'.join(f"{statement['ms']:>9.3f} ms  {statement['sql']}" for statement in obj.statements)
+        return format_html('<pre>{}</pre>', lines)
+    sql_log.short_description = 'SQL'
@@ -0,0 +1,121 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+Each worker process aggregates its own requests: scrape every worker (or
+sum them in Prometheus). Series are labelled by route name, so their number
+is bounded by the URL configuration.
+"""
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _labels(names, values):
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name + _labels(self.labels, labels), value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Counter):
+    """Cumulative buckets, sum and count per label set, as Prometheus expects."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels, buckets):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, *labels, value):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Non-cumulative counts per bucket (the last one is +Inf), then the sum
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        names = self.labels + ('le',)
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                yield self.name + '_bucket' + _labels(names, labels + (bound,)), cumulative
+            yield self.name + '_sum' + _labels(self.labels, labels), series[-1]
+            yield self.name + '_count' + _labels(self.labels, labels), cumulative
+
+
+requests_total = Counter(
+    'quiz_http_requests_total', 'Requests served.', ('route', 'method', 'status'),
+)
+request_duration = Histogram(
+    'quiz_http_request_duration_seconds', 'Time from the request to its response.', ('route',), DURATION_BUCKETS,
+)
+db_queries = Histogram(
+    'quiz_http_request_db_queries', 'Database statements issued per request.', ('route',), QUERY_BUCKETS,
+)
+db_duration = Histogram(
+    'quiz_http_request_db_seconds', 'Time spent in the database per request.', ('route',), DURATION_BUCKETS,
+)
+render_duration = Histogram(
+    'quiz_http_request_render_seconds', 'Time spent rendering the response (DRF renderers, templates).',
+    ('route',), DURATION_BUCKETS,
+)
+response_size = Histogram(
+    'quiz_http_response_size_bytes', 'Size of response bodies (streamed ones are not measured).',
+    ('route',), SIZE_BUCKETS,
+)
+
+REGISTRY = (requests_total, request_duration, db_queries, db_duration, render_duration, response_size)
+
+
+def expose():
+    """Every metric, in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(f'{sample} {_number(value)}' for sample, value in metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.clear()
@@ -0,0 +1,133 @@
+"""
+Per-request performance instrumentation.
+
+`RequestMetricsMiddleware` measures each request: its total time, the
+number and total time of its database statements (every connection is
+wrapped on creation, see `monitoring.signals`), the time spent rendering
+its response and the size of its body. Measurements feed the histograms of
+`monitoring.metrics`, labelled by route name, and are sent back to staff
+users as a Server-Timing header, which browser devtools display.
+
+The work of streamed responses happens after the middleware returns: only
+the time to their first byte is measured.
+"""
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+from . import metrics
+
+_current = ContextVar('request_metrics', default=None)
+
+UNMATCHED = 'unmatched'
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'render_start', 'render_time', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_start = None
+        self.render_time = 0.0
+        # (sql, seconds) of each statement, when a profiler asks for them
+        self.statements = None
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper counting the statements of the current request, if any."""
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        current.queries += 1
+        current.db_time += elapsed
+        if current.statements is not None:
+            current.statements.append((sql, elapsed))
+
+
+def current_metrics():
+    """The RequestMetrics of the request being served, None outside of RequestMetricsMiddleware."""
+    return _current.get()
+
+
+def route_name(request):
+    """The name of the matched URL pattern (with its namespace), e.g. "quiz-detail"."""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.url_name else UNMATCHED
+
+
+def server_timing(current, total):
+    return ', '.join((
+        f'db;dur={current.db_time * 1000:.1f};desc="{current.queries} queries"',
+        f'render;dur={current.render_time * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ))
+
+
+class RequestMetricsMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        current = RequestMetrics()
+        token = _current.set(current)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, current, time.perf_counter() - start, getattr(request, 'user', None))
+        return response
+
+    async def __acall__(self, request):
+        current = RequestMetrics()
+        token = _current.set(current)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject):
+            # Still the session user: it may need a query
+            user = await request.auser()
+        self.record(request, response, current, time.perf_counter() - start, user)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses and admin pages render after the view returns
+        current = _current.get()
+        if current is not None:
+            current.render_start = time.perf_counter()
+            response.add_post_render_callback(lambda _: self.rendered(current))
+        return response
+
+    @staticmethod
+    def rendered(current):
+        current.render_time = time.perf_counter() - current.render_start
+
+    def record(self, request, response, current, total, user):
+        route = route_name(request)
+        metrics.requests_total.inc(route, request.method, str(response.status_code))
+        metrics.request_duration.observe(route, value=total)
+        metrics.db_queries.observe(route, value=current.queries)
+        metrics.db_duration.observe(route, value=current.db_time)
+        metrics.render_duration.observe(route, value=current.render_time)
+        if not response.streaming:
+            metrics.response_size.observe(route, value=len(response.content))
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = server_timing(current, total)
@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+from accounts.models import CustomUser
+
+
+# A request run under the profiler (see monitoring.profiling)
+class RequestProfile(models.Model):
+    # X-Request-ID of the proxy when it sent one, else generated
+    request_id = models.CharField(max_length=64, db_index=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    route = models.CharField(max_length=200)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    db_time_ms = models.FloatField()
+    # Picked by MONITORING_PROFILE_SAMPLE_RATE rather than asked for by staff
+    sampled = models.BooleanField(default=False)
+    # Top functions by cumulative time, as printed by pstats
+    stats = models.TextField()
+    # The profile in the .prof format of cProfile (pstats, snakeviz, ...)
+    profile = models.BinaryField()
+    # [{"sql": ..., "ms": ...}] in execution order; parameters are left out
+    statements = models.JSONField(default=list)
+
+    # Relationships
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.request_id})"
@@ -0,0 +1,198 @@
+"""
+On-demand request profiling.
+
+`ProfilingMiddleware` runs a request under cProfile and stores the profile,
+the request's SQL log and its timings as a `RequestProfile`, which the
+admin lists and offers for download, when:
+
+- a staff user asks for it, with an `X-Profile: 1` header or a `profile=1`
+  query parameter. Staff is checked before the request runs, so that no
+  one else can hold the profiler: from the `is_staff` claim of a bearer
+  JWT, without a query, or else from the session user (the admin's);
+- the request is picked by MONITORING_PROFILE_SAMPLE_RATE, the fraction of
+  all requests profiled. At 0 (the default) an unflagged request costs a
+  header and a query parameter lookup; at a low rate profiling can be left
+  on in production.
+
+One request at a time is profiled per process: others run unprofiled
+meanwhile. The response of a stored profile carries its id in
+X-Profile-Id; the newest MONITORING_PROFILE_KEEP profiles are kept.
+
+The middleware must come after AuthenticationMiddleware. The SQL log is
+collected by RequestMetricsMiddleware, which must come first. Under ASGI
+the profiler follows the event loop thread: it also records the coroutines
+of concurrent requests, and not the Python code that async views run in
+worker threads (their SQL is logged).
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import threading
+import time
+import uuid
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from accounts.tokens import STAFF_CLAIM
+from .middleware import current_metrics, route_name
+from .models import RequestProfile
+
+# Lines of the stats summary
+TOP_FUNCTIONS = 50
+
+_profiling = threading.Lock()
+_jwt = JWTAuthentication()
+
+
+def requested(request):
+    return request.headers.get('X-Profile') == '1' or request.GET.get('profile') == '1'
+
+
+def token_staff(request):
+    """
+    Whether the bearer JWT of the request is a staff token, checked without
+    a query; None when the request carries no bearer token.
+    """
+    header = _jwt.get_header(request)
+    if header is None:
+        return None
+    raw = _jwt.get_raw_token(header)
+    if raw is None:
+        return False
+    try:
+        return bool(_jwt.get_validated_token(raw).get(STAFF_CLAIM))
+    except InvalidToken:
+        return False
+
+
+def is_staff(request):
+    staff = token_staff(request)
+    if staff is None:
+        staff = request.user.is_staff
+    return staff
+
+
+async def ais_staff(request):
+    staff = token_staff(request)
+    if staff is None:
+        staff = (await request.auser()).is_staff
+    return staff
+
+
+class Run:
+    """A request being profiled."""
+
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.metrics = current_metrics()
+        if self.metrics is not None:
+            self.metrics.statements = []
+        self.profiler = cProfile.Profile()
+        self.start = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self.start
+        self.statements = []
+        if self.metrics is not None:
+            self.statements, self.metrics.statements = self.metrics.statements, None
+        _profiling.release()
+
+    def store(self, request, response, user):
+        summary = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=summary)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        profile = RequestProfile.objects.create(
+            request_id=(request.headers.get('X-Request-ID') or uuid.uuid4().hex)[:64],
+            method=request.method,
+            path=request.get_full_path()[:2048],
+            route=route_name(request),
+            status_code=response.status_code,
+            duration_ms=self.duration * 1000,
+            query_count=len(self.statements),
+            db_time_ms=sum(elapsed for _, elapsed in self.statements) * 1000,
+            sampled=self.sampled,
+            stats=summary.getvalue(),
+            # As Stats.dump_stats() writes it
+            profile=marshal.dumps(stats.stats),
+            statements=[{'sql': sql, 'ms': round(elapsed * 1000, 3)} for sql, elapsed in self.statements],
+            user_id=user.pk if user is not None and user.is_authenticated else None,
+        )
+        prune()
+        return profile
+
+
+def prune():
+    """Delete all but the newest MONITORING_PROFILE_KEEP profiles."""
+    keep = settings.MONITORING_PROFILE_KEEP
+    oldest_kept = list(RequestProfile.objects.order_by('-pk').values_list('pk', flat=True)[keep - 1:keep])
+    if oldest_kept:
+        RequestProfile.objects.filter(pk__lt=oldest_kept[0]).delete()
+
+
+def sample():
+    rate = settings.MONITORING_PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def start(sampled):
+    """A Run profiling the current request, or None if another one is being profiled."""
+    if not _profiling.acquire(blocking=False):
+        return None
+    try:
+        return Run(sampled)
+    except ValueError:
+        # Another profiler (a debugger, coverage) holds the thread
+        _profiling.release()
+        return None
+
+
+class ProfilingMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if requested(request) and is_staff(request):
+            run = start(sampled=False)
+        else:
+            run = start(sampled=True) if sample() else None
+        if run is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            run.stop()
+        response['X-Profile-Id'] = run.store(request, response, request.user).request_id
+        return response
+
+    async def __acall__(self, request):
+        if requested(request) and await ais_staff(request):
+            run = start(sampled=False)
+        else:
+            run = start(sampled=True) if sample() else None
+        if run is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            run.stop()
+        user = request.user
+        if isinstance(user, SimpleLazyObject):
+            user = await request.auser()
+        profile = await sync_to_async(run.store)(request, response, user)
+        response['X-Profile-Id'] = profile.request_id
+        return response
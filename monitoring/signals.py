@@ -0,0 +1,12 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from .middleware import record_query
+
+
+@receiver(connection_created)
+def instrument_connection(connection, **kwargs):
+    # Connections are per thread: the ones serving async views' queries are
+    # not the request thread's, so each one counts for the request in its
+    # context. First in the list: execute_wrapper() blocks pop the last one.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
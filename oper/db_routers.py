@@ -0,0 +1,124 @@
+"""
+Read replica routing.
+
+With QUIZ_READ_REPLICA naming a database alias, reads made inside
+`replica_reads()` go to that alias: the read-only quiz views (list, detail,
+progress, leaderboard, analytics) and the admin statistics opt in. Every
+other read and every write goes to `default`.
+
+A replica lags behind the primary. So that users read their own writes, a
+user is pinned to the primary for QUIZ_REPLICA_PIN_SECONDS after a write:
+`PrimaryPinMiddleware` pins the authenticated user of any successful
+unsafe request (answer submissions, admin edits), `pin()` is called on
+login and activation, whose user is not authenticated yet. Pins live in the
+default cache, which must be shared by the workers for a pin to hold across
+them.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def replica_enabled():
+    return bool(settings.QUIZ_READ_REPLICA)
+
+
+def pin(user_id):
+    """Send the reads of `user_id` to the primary for the next few seconds."""
+    if replica_enabled():
+        cache.set(_pin_key(user_id), True, settings.QUIZ_REPLICA_PIN_SECONDS)
+
+
+async def apin(user_id):
+    if replica_enabled():
+        await cache.aset(_pin_key(user_id), True, settings.QUIZ_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return replica_enabled() and cache.get(_pin_key(user_id), False)
+
+
+async def ais_pinned(user_id):
+    return replica_enabled() and await cache.aget(_pin_key(user_id), False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Route the reads of the block to the replica, when one is configured and
+    `enabled`. For read-only code: reads that must see the block's own writes
+    or locks would miss them.
+    """
+    token = _replica_reads.set(enabled and replica_enabled())
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        return settings.QUIZ_READ_REPLICA
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+
+def _writer(request, response):
+    """The id of the user whose write `response` acknowledges, or None."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return None
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+class PrimaryPinMiddleware:
+    """Pin the author of a successful unsafe request to the primary."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if replica_enabled():
+            user_id = _writer(request, response)
+            if user_id is not None:
+                pin(user_id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if replica_enabled() and request.method not in SAFE_METHODS:
+            # request.user may be the lazy session user: resolve it off the event loop
+            user_id = await sync_to_async(_writer)(request, response)
+            if user_id is not None:
+                await apin(user_id)
+        return response
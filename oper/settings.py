@@ -43,16 +43,22 @@ INSTALLED_APPS = [
     'drf_spectacular',
     'accounts',
     'quiz',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    # First, so that it covers the whole request (see monitoring.middleware)
+    'monitoring.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After authentication: only staff may ask for a profile (see monitoring.profiling)
+    'monitoring.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'oper.db_routers.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'oper.urls'
@@ -83,9 +89,78 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Concurrent workers: writers queue for the lock (up to `timeout`
+        # seconds) instead of failing on upgrade, and readers never wait on them
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL;',
+        },
     }
 }
 
+# Read replica: set QUIZ_REPLICA_DATABASE to the file of a replica of the
+# default database (kept in sync outside Django) to serve the read-only quiz
+# views and the admin statistics from it (see oper.db_routers). A user is
+# pinned to the primary for QUIZ_REPLICA_PIN_SECONDS after each write, which
+# must exceed the replication lag.
+QUIZ_REPLICA_DATABASE = os.getenv('QUIZ_REPLICA_DATABASE')
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': QUIZ_REPLICA_DATABASE or DATABASES['default']['NAME'],
+}
+DATABASE_ROUTERS = ['oper.db_routers.ReplicaRouter']
+QUIZ_READ_REPLICA = 'replica' if QUIZ_REPLICA_DATABASE else None
+QUIZ_REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# QUIZ_CACHE_BACKEND selects the backend: "locmem" is per process, "file" and
+# "db" are shared by every worker ("db" needs `python manage.py createcachetable`).
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'oper',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('QUIZ_CACHE_LOCATION', BASE_DIR / 'django_cache'),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('QUIZ_CACHE_BACKEND', 'locmem')],
+}
+
+# Seconds a quiz content snapshot is kept; invalidation does not depend on it.
+QUIZ_CONTENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Route the participant hot paths (quiz detail, progress, answer submission,
+# /me) to native async views; only worthwhile when served by an ASGI server.
+QUIZ_ASYNC_VIEWS = os.getenv('QUIZ_ASYNC_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+
+# Answer ingestion: "direct" records every submission in its own transaction;
+# "staged" validates it against the cached quiz content, appends it to the
+# PendingAnswer table and answers 202. `python manage.py flush_answers` then
+# moves staged answers into ParticipantAnswer, a batch of up to
+# QUIZ_INGESTION_BATCH_SIZE at a time and at most QUIZ_INGESTION_MAX_LATENCY
+# seconds after they were accepted.
+QUIZ_ANSWER_INGESTION = os.getenv('QUIZ_ANSWER_INGESTION', 'direct')
+QUIZ_INGESTION_BATCH_SIZE = 500
+QUIZ_INGESTION_MAX_LATENCY = 2
+
+# Entries of a quiz leaderboard, and seconds its cached top is kept. A
+# finalized score drops the cached top; the timeout bounds staleness after
+# changes made elsewhere (admin edits, deleted answers).
+QUIZ_LEADERBOARD_SIZE = 10
+QUIZ_LEADERBOARD_CACHE_TIMEOUT = 30
+
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
@@ -139,8 +214,10 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'quiz.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 20,
 }
 
 SIMPLE_JWT = {
@@ -148,4 +225,34 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
-print(os.getenv("DATABASE_URL"))
+# Requests are authenticated from the claims of their JWT (see
+# accounts.authentication); views that need the full user read it from a
+# per-process cache of AUTH_USER_CACHE_SIZE users, each kept at most
+# AUTH_USER_CACHE_TTL seconds.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 60
+
+# Where the session of each user (the jti and expiry of its refresh token)
+# is kept: "db" (UserToken table) or "cache" (the default cache, which must
+# be shared by all workers to enforce one session per user across them).
+AUTH_SESSION_STORE = os.getenv('AUTH_SESSION_STORE', 'db')
+
+# Password checks and hashes run on AUTH_HASHING_WORKERS processes (0:
+# inline, on the request thread) with at most AUTH_HASHING_QUEUE_SIZE jobs
+# waiting; beyond that logins and activations are answered 503 with a
+# Retry-After of AUTH_HASHING_RETRY_AFTER seconds (see accounts.hashing).
+AUTHENTICATION_BACKENDS = ['accounts.backends.HashingExecutorBackend']
+AUTH_HASHING_WORKERS = int(os.getenv('AUTH_HASHING_WORKERS', '0'))
+AUTH_HASHING_QUEUE_SIZE = int(os.getenv('AUTH_HASHING_QUEUE_SIZE', '256'))
+AUTH_HASHING_RETRY_AFTER = 1
+
+# Request metrics are exposed at /metrics in the Prometheus text format; set
+# MONITORING_METRICS_TOKEN to require it as a bearer token from the scraper.
+MONITORING_METRICS_TOKEN = os.getenv('MONITORING_METRICS_TOKEN')
+
+# Staff requests flagged with an X-Profile: 1 header or ?profile=1, and this
+# fraction of all requests, run under cProfile; profiles and SQL logs are
+# stored for the admin, the newest MONITORING_PROFILE_KEEP of them kept
+# (see monitoring.profiling).
+MONITORING_PROFILE_SAMPLE_RATE = float(os.getenv('MONITORING_PROFILE_SAMPLE_RATE', '0'))
+MONITORING_PROFILE_KEEP = 500
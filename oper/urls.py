@@ -26,6 +26,7 @@ urlpatterns = [
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
     path("api/auth/", include("accounts.urls")),
     path('api/', include('quiz.urls')),  # Scoped prefix for quiz app
+    path("metrics", include("monitoring.urls")),
 
     path("", RedirectView.as_view(url="/api/docs/", permanent=False)),  # Redirects / to Swagger UI
 ]
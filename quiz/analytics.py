@@ -0,0 +1,48 @@
+"""
+Answer distribution of a quiz for its creator.
+
+Question and choice texts come from the cached quiz content, answer counts
+from `ChoiceAnswerCount` with a single read on its quiz index, whatever the
+number of participants.
+"""
+from .cache import get_quiz_content
+from .models import ChoiceAnswerCount
+
+
+def _percent(part, whole):
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def quiz_analytics(quiz):
+    """Per-question answer counts, share of each choice and percent correct."""
+    content = get_quiz_content(quiz)
+    counts = dict(
+        ChoiceAnswerCount.objects.filter(quiz_id=quiz.pk).values_list('choice_id', 'answer_count')
+    )
+
+    questions = []
+    for question in content['questions']:
+        answers = sum(counts.get(choice['id'], 0) for choice in question['choices'])
+        correct = sum(counts.get(choice['id'], 0) for choice in question['choices'] if choice['is_correct'])
+        questions.append({
+            'id': question['id'],
+            'text': question['text'],
+            'answers': answers,
+            'percent_correct': _percent(correct, answers),
+            'choices': [
+                {
+                    'id': choice['id'],
+                    'text': choice['text'],
+                    'is_correct': choice['is_correct'],
+                    'answers': counts.get(choice['id'], 0),
+                    'percent': _percent(counts.get(choice['id'], 0), answers),
+                }
+                for choice in question['choices']
+            ],
+        })
+
+    return {
+        'id': quiz.pk,
+        'title': quiz.title,
+        'questions': questions,
+    }
@@ -0,0 +1,137 @@
+"""
+Native async variants of the participant hot paths, routed instead of the
+DRF views under ASGI when QUIZ_ASYNC_VIEWS is on.
+
+Reads go through the async ORM and async cache calls, so a request waiting
+on the database or cache holds no worker thread. Django's async ORM cannot
+run transactions: answer submission authenticates and rejects unknown
+quizzes, questions and callers on the event loop, then runs its write
+transaction (locked enrolment, insert, counters) in one worker thread.
+
+Responses, status codes and validators match the DRF views.
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import serializers
+from accounts.async_views import api_response, error_response, jwt_authenticated, parse_body
+from oper.db_routers import ais_pinned, replica_reads
+from .cache import aget_quiz_content, overlay_answers
+from .conditional import quiz_detail_validators, progress_validators, not_modified, with_validators
+from .enrolment import aget_enrolment, get_enrolment
+from .ingestion import staged_ingestion
+from .models import Quiz, ParticipantAnswer
+from .permissions import IsActivatedParticipant
+from .serializers import SubmitAnswerSerializer, StageAnswerSerializer
+from .views import progress_data
+
+NOT_FOUND = "Not found."
+
+
+@require_GET
+@jwt_authenticated
+async def quiz_detail(request, pk):
+    """Async `QuizViewSet.retrieve`."""
+    with replica_reads(not await ais_pinned(request.user.pk)):
+        return await _quiz_detail(request, pk)
+
+
+async def _quiz_detail(request, pk):
+    qp = await aget_enrolment(request, pk)
+    if qp is None:
+        return error_response(NOT_FOUND, 404)
+    content = await aget_quiz_content(qp.quiz)
+    etag, last_modified = quiz_detail_validators(qp, content)
+
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        answers = {
+            question_id: choice_id
+            async for question_id, choice_id in ParticipantAnswer.objects.filter(
+                quiz_id=qp.quiz_id,
+                participant_id=qp.participant_id,
+            ).values_list('question_id', 'selected_choice_id')
+        }
+        response = with_validators(api_response(overlay_answers(content, answers)), etag, last_modified)
+    return response
+
+
+@require_GET
+@jwt_authenticated
+async def quiz_progress(request, pk):
+    """Async `QuizViewSet.progress`."""
+    with replica_reads(not await ais_pinned(request.user.pk)):
+        return await _quiz_progress(request, pk)
+
+
+async def _quiz_progress(request, pk):
+    qp = await aget_enrolment(request, pk)
+    if qp is None:
+        return error_response(NOT_FOUND, 404)
+    if qp.accepted_at is None:
+        return error_response(IsActivatedParticipant.message, 403)
+    etag, last_modified = progress_validators(qp)
+
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = with_validators(api_response(progress_data(qp)), etag, last_modified)
+    return response
+
+
+@csrf_exempt
+@require_POST
+@jwt_authenticated
+async def submit_answer(request, quiz_id, question_id):
+    """Async `SubmitAnswerView`."""
+    try:
+        data = parse_body(request)
+    except ValueError as e:
+        return error_response(f"JSON parse error - {e}", 400)
+
+    qp = await aget_enrolment(request, quiz_id)
+    quiz = qp.quiz if qp else await Quiz.objects.filter(pk=quiz_id).afirst()
+    if quiz is None:
+        return error_response(NOT_FOUND, 404)
+    content = await aget_quiz_content(quiz)
+    if question_id not in content['choice_ids']:
+        return error_response(NOT_FOUND, 404)
+    if qp is None or qp.accepted_at is None:
+        return error_response(IsActivatedParticipant.message, 403)
+
+    return await sync_to_async(_record_answer)(request, quiz, question_id, content, data)
+
+
+def _record_answer(request, quiz, question_id, content, data):
+    """The writes of a submission (staged, or a locked transaction), run in a worker thread."""
+    context = {
+        'request': request,
+        'quiz_id': quiz.pk,
+        'question_id': question_id,
+        'content': content,
+    }
+    try:
+        if staged_ingestion():
+            serializer = StageAnswerSerializer(data=data, context=context)
+            if not serializer.is_valid():
+                return api_response(serializer.errors, status=400)
+            pending = serializer.save()
+            return api_response({
+                "message": "Answer accepted.",
+                "pending_id": pending.id
+            }, status=202)
+
+        serializer = SubmitAnswerSerializer(data=data, context=context)
+        with transaction.atomic():
+            # Lock the caller's enrolment until the answer is accounted for
+            get_enrolment(request, quiz.pk, lock=True)
+            if not serializer.is_valid():
+                return api_response(serializer.errors, status=400)
+            answer = serializer.save()
+    except serializers.ValidationError as e:
+        return api_response(e.detail, status=400)
+
+    return api_response({
+        "message": "Answer submitted successfully.",
+        "answer_id": answer.id
+    }, status=201)
@@ -0,0 +1,267 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Fixtures are built with bulk_create so that large quizzes are cheap to set
+up; the commands run inside `rolled_back()` so nothing they create is kept.
+"""
+import asyncio
+import importlib
+import io
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.urls import clear_url_caches
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import CustomUser
+from .cache import retire_quiz_content
+from .models import Quiz, Question, Choice, Participant, QuizParticipant, ChoiceAnswerCount
+
+# Transaction bookkeeping, not work done on behalf of the request
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def build_quiz(creator, questions=20, choices=4, title='Benchmark quiz'):
+    """Create a quiz whose first choice of every question is the correct one."""
+    quiz = Quiz.objects.create(title=title, creator=creator, question_count=questions)
+    question_objs = Question.objects.bulk_create(
+        Question(quiz=quiz, text=f'Question {i}') for i in range(questions)
+    )
+    choice_objs = Choice.objects.bulk_create(
+        Choice(question=question, text=f'Choice {j}', is_correct=(j == 0))
+        for question in question_objs
+        for j in range(choices)
+    )
+    # bulk_create bypasses the signals; ids may be reused after a rollback
+    ChoiceAnswerCount.objects.bulk_create(
+        ChoiceAnswerCount(quiz=quiz, question_id=choice.question_id, choice=choice)
+        for choice in choice_objs
+    )
+    # Not on commit: the fixtures of `rolled_back()` never commit
+    retire_quiz_content(quiz.pk)
+    return quiz
+
+
+def create_participants(count, prefix='bench'):
+    """Create `count` active participant users sharing one password hash."""
+    password = make_password(None)
+    users = CustomUser.objects.bulk_create(
+        CustomUser(
+            username=f'{prefix}-{i}',
+            email=f'{prefix}-{i}@example.com',
+            password=password,
+            user_type=CustomUser.PARTICIPANT,
+        )
+        for i in range(count)
+    )
+    Participant.objects.bulk_create(Participant(user=user) for user in users)
+    return list(
+        CustomUser.objects.filter(pk__in=[user.pk for user in users])
+                          .select_related('participant_profile')
+    )
+
+
+def enrol(quiz, users, accepted=True):
+    accepted_at = timezone.now() if accepted else None
+    QuizParticipant.objects.bulk_create(
+        QuizParticipant(
+            quiz=quiz,
+            participant=user.participant_profile,
+            invitation_token=None if accepted else uuid.uuid4(),
+            accepted_at=accepted_at,
+        )
+        for user in users
+    )
+
+
+@contextmanager
+def async_views(enabled=True):
+    """
+    Route the hot paths to the async (or DRF) views for the duration of
+    the block. URL modules read QUIZ_ASYNC_VIEWS when imported, so they
+    are reloaded on the way in and out.
+    """
+    def route(value):
+        settings.QUIZ_ASYNC_VIEWS = value
+        for name in ('accounts.urls', 'quiz.urls', settings.ROOT_URLCONF):
+            importlib.reload(importlib.import_module(name))
+        clear_url_caches()
+
+    previous = settings.QUIZ_ASYNC_VIEWS
+    route(enabled)
+    try:
+        yield
+    finally:
+        route(previous)
+
+
+def api_client():
+    """In-process API client; 'localhost' is always allowed while DEBUG is on."""
+    return APIClient(SERVER_NAME='localhost')
+
+
+def count_statements(queries):
+    """Queries captured by CaptureQueriesContext, minus transaction bookkeeping."""
+    return sum(
+        1 for query in queries
+        if not query['sql'].upper().startswith(TRANSACTION_STATEMENTS)
+    )
+
+
+def measure(func, *args, **kwargs):
+    """Call `func` once; return (result, statements issued, seconds)."""
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    return result, count_statements(ctx.captured_queries), elapsed
+
+
+def summarize(seconds):
+    """Latency summary in milliseconds."""
+    ordered = sorted(seconds)
+    if not ordered:
+        return {'count': 0}
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def wsgi_request(application, method, path, headers=None, body=b''):
+    """Issue one request straight to a WSGI application; return its status code."""
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    statuses = []
+    result = application(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_request(application, method, path, headers=None, body=b''):
+    """Issue one request straight to an ASGI application; return its status code."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ] + [
+            (name.lower().encode(), value.encode()) for name, value in (headers or {}).items()
+        ],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    disconnect = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            disconnect.set()
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def run_threaded(call, requests, concurrency):
+    """
+    Run `call(i)` for i in range(requests) on `concurrency` threads, like a
+    threaded WSGI server. Returns (results, latencies, wall-clock seconds).
+    """
+    def timed(i):
+        start = time.perf_counter()
+        result = call(i)
+        return result, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, range(requests)))
+    return [r for r, _ in outcomes], [t for _, t in outcomes], time.perf_counter() - start
+
+
+def run_concurrently(call, requests, concurrency):
+    """
+    Await `call(i)` for i in range(requests), at most `concurrency` at a
+    time on one event loop, like an ASGI server. Same return as `run_threaded`.
+    """
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(i):
+            async with semaphore:
+                start = time.perf_counter()
+                result = await call(i)
+                return result, time.perf_counter() - start
+
+        return await asyncio.gather(*(timed(i) for i in range(requests)))
+
+    start = time.perf_counter()
+    outcomes = asyncio.run(main())
+    return [r for r, _ in outcomes], [t for _, t in outcomes], time.perf_counter() - start
@@ -0,0 +1,48 @@
+"""
+Bulk insert helpers for the paths that write tens of thousands of rows at
+once (synthetic data, bulk invitations).
+
+`insert_rows` runs `executemany` on ready-made value tuples: at that scale,
+building model instances and compiling bulk_create statements costs far more
+than the inserts themselves. Values must be database-ready (see
+`db_value`), and no signal is sent.
+"""
+from itertools import islice
+from django.db import connection
+from django.db.models.constants import OnConflict
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def db_value(model, field_name, value):
+    """`value` prepared for `field_name` of `model` as `insert_rows` expects it."""
+    return model._meta.get_field(field_name).get_db_prep_save(value, connection)
+
+
+def insert_rows(model, fields, rows, chunk_size=5000, ignore_conflicts=False):
+    """
+    Insert tuples of database-ready values for `fields` of `model`,
+    bypassing model instances and the SQL compiler. With `ignore_conflicts`,
+    rows violating a unique constraint are skipped. Returns the number of
+    rows given.
+    """
+    quote = connection.ops.quote_name
+    model_fields = [model._meta.get_field(name) for name in fields]
+    on_conflict = OnConflict.IGNORE if ignore_conflicts else None
+    sql = '{insert} {table} ({columns}) VALUES ({placeholders}) {suffix}'.format(
+        insert=connection.ops.insert_statement(on_conflict=on_conflict),
+        table=quote(model._meta.db_table),
+        columns=', '.join(quote(field.column) for field in model_fields),
+        placeholders=', '.join(['%s'] * len(fields)),
+        suffix=connection.ops.on_conflict_suffix_sql(model_fields, on_conflict, None, None) or '',
+    )
+    count = 0
+    with connection.cursor() as cursor:
+        for chunk in chunked(rows, chunk_size):
+            cursor.executemany(sql, chunk)
+            count += len(chunk)
+    return count
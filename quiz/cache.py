@@ -0,0 +1,234 @@
+"""
+Versioned cache of quiz content (quiz, questions and choices).
+
+Each quiz has a version token stored in the cache; snapshots are stored under
+a key that includes that token and are never modified afterwards. Invalidating
+a quiz only replaces its token, so every process sharing the cache backend
+stops reading the old snapshot at once and the old entry simply expires.
+
+Per-participant data (selected answers) is never cached: it is overlaid on the
+snapshot at render time with `overlay_answers`.
+
+Snapshots are shared by every reader, so they are built from the primary
+database even inside `replica_reads()`: rows read from a lagging replica
+would be cached under the current version.
+
+Saving or deleting a Quiz, Question or Choice invalidates through the signals
+in `quiz.signals`. Code that bypasses model signals (`QuerySet.update`,
+`bulk_create`, raw SQL) must call `invalidate_quiz_content` itself.
+"""
+import threading
+import time
+import uuid
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from .models import Quiz, Question, Choice
+
+VERSION_KEY = 'quiz:content-version:{quiz_id}'
+# Bump SNAPSHOT_FORMAT whenever the snapshot layout changes
+SNAPSHOT_FORMAT = 2
+CONTENT_KEY = 'quiz:content:{format}:{quiz_id}:{version}'
+HITS_KEY = 'quiz:content-stats:hits'
+MISSES_KEY = 'quiz:content-stats:misses'
+
+# Hit/miss counts are kept in process and pushed to the shared cache at most
+# every STATS_FLUSH_INTERVAL seconds, so counting costs no cache round trip
+# on the hot path.
+STATS_FLUSH_INTERVAL = 5
+
+_stats_lock = threading.Lock()
+_pending = {HITS_KEY: 0, MISSES_KEY: 0}
+_last_flush = time.monotonic()
+
+
+def _tally(key):
+    """Count a hit or miss; return the counts to push when a flush is due."""
+    global _last_flush
+    with _stats_lock:
+        _pending[key] += 1
+        if time.monotonic() - _last_flush < STATS_FLUSH_INTERVAL:
+            return None
+        pending = dict(_pending)
+        _pending[HITS_KEY] = _pending[MISSES_KEY] = 0
+        _last_flush = time.monotonic()
+    return pending
+
+
+def _record(key):
+    pending = _tally(key)
+    if pending:
+        _flush(pending)
+
+
+def _flush(pending):
+    for key, delta in pending.items():
+        if not delta:
+            continue
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, delta, timeout=None)
+
+
+def flush_content_cache_stats():
+    """Push the counts accumulated by this process to the shared cache."""
+    global _last_flush
+    with _stats_lock:
+        pending = dict(_pending)
+        _pending[HITS_KEY] = _pending[MISSES_KEY] = 0
+        _last_flush = time.monotonic()
+    _flush(pending)
+
+
+def content_cache_stats():
+    """Hit/miss totals across every process sharing the cache backend."""
+    flush_content_cache_stats()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_content_cache_stats():
+    with _stats_lock:
+        _pending[HITS_KEY] = _pending[MISSES_KEY] = 0
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _get_version(quiz_id):
+    key = VERSION_KEY.format(quiz_id=quiz_id)
+    version = cache.get(key)
+    if version is None:
+        # add() so that concurrent first readers agree on one token
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_quiz_content(quiz_id):
+    """
+    Retire the current snapshot of a quiz for every process once the current
+    transaction commits. Retiring it earlier would let a concurrent reader,
+    who still sees the old rows, cache them under the new version.
+    """
+    transaction.on_commit(lambda: retire_quiz_content(quiz_id))
+
+
+def retire_quiz_content(quiz_id):
+    """
+    Retire the current snapshot of a quiz at once, whatever the transaction:
+    for rows that are never committed, such as rolled back fixtures.
+    """
+    cache.set(VERSION_KEY.format(quiz_id=quiz_id), uuid.uuid4().hex, timeout=None)
+
+
+def build_quiz_content(quiz):
+    """
+    Build the snapshot of a quiz from the primary database (two queries, one
+    more when `quiz` was loaded from elsewhere).
+    """
+    from .serializers import ChoiceSerializer
+
+    if quiz._state.db != DEFAULT_DB_ALIAS:
+        quiz = Quiz.objects.using(DEFAULT_DB_ALIAS).get(pk=quiz.pk)
+    prefetch_related_objects(
+        [quiz],
+        Prefetch(
+            'questions',
+            queryset=Question.objects.using(DEFAULT_DB_ALIAS).order_by('id').prefetch_related(
+                Prefetch('choices', queryset=Choice.objects.using(DEFAULT_DB_ALIAS).order_by('id'))
+            )
+        )
+    )
+    questions = []
+    choice_ids = {}
+    correct_choice_ids = set()
+    last_modified = quiz.updated_at
+    for question in quiz.questions.all():
+        last_modified = max([last_modified, question.updated_at]
+                            + [choice.updated_at for choice in question.choices.all()])
+        choices = [dict(data) for data in ChoiceSerializer(question.choices.all(), many=True).data]
+        questions.append({
+            'id': question.id,
+            'text': question.text,
+            'choices': choices,
+        })
+        choice_ids[question.id] = frozenset(choice['id'] for choice in choices)
+        correct_choice_ids.update(choice['id'] for choice in choices if choice['is_correct'])
+
+    return {
+        'quiz': {
+            'id': quiz.id,
+            'title': quiz.title,
+            'description': quiz.description,
+        },
+        'questions': questions,
+        # question id -> ids of its choices, for answer validation and scoring
+        'choice_ids': choice_ids,
+        'correct_choice_ids': frozenset(correct_choice_ids),
+        # Latest updated_at of the quiz, its questions and choices
+        'last_modified': last_modified,
+    }
+
+
+def get_quiz_content(quiz):
+    """
+    Return the cached snapshot of `quiz`, building it on a miss.
+
+    The returned dict is shared read-only data: use `overlay_answers`
+    rather than modifying it.
+    """
+    version = _get_version(quiz.pk)
+    key = CONTENT_KEY.format(format=SNAPSHOT_FORMAT, quiz_id=quiz.pk, version=version)
+    content = cache.get(key)
+    if content is not None:
+        _record(HITS_KEY)
+        return content
+
+    _record(MISSES_KEY)
+    content = build_quiz_content(quiz)
+    content['version'] = version
+    cache.set(key, content, timeout=settings.QUIZ_CONTENT_CACHE_TIMEOUT)
+    return content
+
+
+async def aget_quiz_content(quiz):
+    """
+    `get_quiz_content` for async views: a hit costs awaited cache round
+    trips only, a miss is built in a worker thread.
+    """
+    version = await cache.aget(VERSION_KEY.format(quiz_id=quiz.pk))
+    if version is not None:
+        key = CONTENT_KEY.format(format=SNAPSHOT_FORMAT, quiz_id=quiz.pk, version=version)
+        content = await cache.aget(key)
+        if content is not None:
+            pending = _tally(HITS_KEY)
+            if pending:
+                await sync_to_async(_flush)(pending)
+            return content
+    return await sync_to_async(get_quiz_content)(quiz)
+
+
+def overlay_answers(content, answers):
+    """
+    Render a snapshot for one participant.
+
+    `answers` maps question id -> selected choice id. The result has the same
+    shape as `QuizDetailSerializer` output.
+    """
+    return {
+        **content['quiz'],
+        'questions': [
+            {**question, 'selected_choice_id': answers.get(question['id'])}
+            for question in content['questions']
+        ],
+    }
@@ -0,0 +1,78 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the participant polling
+endpoints.
+
+Validators are derived from data the views load anyway: the caller's
+enrolment (answer counters, `updated_at` stamped on every answer) and the
+cached quiz content (version token, latest `updated_at`). Deletions leave
+no row behind to carry a newer `updated_at`, so adding or removing a
+question and removing a choice stamp `Quiz.updated_at` (see
+`quiz.counters`). A matching
+`If-None-Match` / `If-Modified-Since` is answered with 304 before anything
+is serialized.
+"""
+import hashlib
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def quiz_detail_validators(qp, content):
+    """(etag, last_modified) of a participant's view of a quiz."""
+    etag = make_etag('detail', content['version'], qp.answered_count, qp.updated_at)
+    return etag, max(content['last_modified'], qp.updated_at)
+
+
+def progress_validators(qp):
+    """(etag, last_modified) of a participant's progress in a quiz."""
+    etag = make_etag(
+        'progress',
+        qp.quiz.question_count,
+        qp.answered_count,
+        qp.correct_count,
+        qp.started_at,
+        qp.completed_at,
+        qp.score,
+        qp.updated_at,
+    )
+    return etag, max(qp.quiz.updated_at, qp.updated_at)
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 response if the client's copy is current, otherwise None."""
+    response = get_conditional_response(
+        getattr(request, '_request', request),
+        etag=etag,
+        last_modified=int(last_modified.timestamp()),
+    )
+    if response is not None:
+        _private(response)
+    return response
+
+
+def with_validators(response, etag, last_modified):
+    """Attach the validators to a freshly rendered response."""
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+    return _private(response)
+
+
+def _private(response):
+    # Per-user data: only the client may keep it, and must revalidate
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def respond_conditionally(request, etag, last_modified, render):
+    """
+    Return 304 if the client's copy is current, otherwise call `render()`
+    and attach the validators to its response.
+    """
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = with_validators(render(), etag, last_modified)
+    return response
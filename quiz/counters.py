@@ -0,0 +1,219 @@
+"""
+Denormalized counters: `Quiz.question_count`,
+`QuizParticipant.answered_count` / `correct_count` and
+`ChoiceAnswerCount.answer_count`.
+
+They are kept up to date with F() expressions by the signals in
+`quiz.signals` whenever a Question, Choice or ParticipantAnswer is created
+or deleted, a Choice's `is_correct` flag changes or an answer's selected
+choice changes, and by the answer submission paths in the same transaction
+as the answers. Paths that bypass model signals (`bulk_create`, `QuerySet.update`,
+raw SQL) must adjust them with the helpers below, or run
+`manage.py rebuild_counters` afterwards.
+"""
+from collections import Counter, defaultdict
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .leaderboard import invalidate_leaderboard
+from .models import Quiz, Question, Choice, QuizParticipant, ParticipantAnswer, ChoiceAnswerCount
+
+
+def adjust_question_count(quiz_id, delta):
+    # updated_at moves too: it is the Last-Modified of the quiz's conditional GETs
+    Quiz.objects.filter(pk=quiz_id).update(question_count=F('question_count') + delta, updated_at=timezone.now())
+
+
+def touch_quiz(quiz_id):
+    """Stamp a change of the quiz content that its own row does not record."""
+    Quiz.objects.filter(pk=quiz_id).update(updated_at=timezone.now())
+
+
+def adjust_answer_counts(participant_id, quiz_id, answered, correct):
+    """Add `answered`/`correct` (may be negative) to a participant's counters."""
+    QuizParticipant.objects.filter(participant_id=participant_id, quiz_id=quiz_id).update(
+        answered_count=F('answered_count') + answered,
+        correct_count=F('correct_count') + correct,
+        updated_at=timezone.now(),
+    )
+
+
+def discount_answers(answers):
+    """
+    Take a queryset of answers that is about to be deleted out of the
+    participants' counters, with a single UPDATE.
+    """
+    own = answers.filter(participant=OuterRef('participant'), quiz=OuterRef('quiz'))
+    QuizParticipant.objects.filter(Exists(own)).update(
+        answered_count=F('answered_count') - _count(own, 'participant'),
+        correct_count=F('correct_count') - _count(own.filter(selected_choice__is_correct=True), 'participant'),
+        updated_at=timezone.now(),
+    )
+
+
+def apply_answers(qp, answered, correct):
+    """
+    Account for `answered` new answers (`correct` of them right) of an
+    enrolment: bump its counters, stamp the start of the quiz on the first
+    answer and the completion and final score on the last one, in a single
+    UPDATE. A final score retires the cached leaderboard. `qp` must be
+    locked (select_for_update) with its quiz loaded; it is updated in place.
+    """
+    now = timezone.now()
+    qp.answered_count += answered
+    qp.correct_count += correct
+    changes = {
+        'answered_count': F('answered_count') + answered,
+        'correct_count': F('correct_count') + correct,
+        'updated_at': now,
+    }
+    if qp.started_at is None:
+        qp.started_at = changes['started_at'] = now
+
+    total_questions = qp.quiz.question_count
+    if total_questions and qp.answered_count >= total_questions:
+        qp.completed_at = changes['completed_at'] = now
+        qp.score = changes['score'] = (qp.correct_count / total_questions) * 100
+        invalidate_leaderboard(qp.quiz_id)
+
+    QuizParticipant.objects.filter(pk=qp.pk).update(**changes)
+    return qp
+
+
+def regrade_choice(choice_id, quiz_id, delta):
+    """
+    Move the answers to a choice whose `is_correct` flag changed into
+    (`delta` 1) or out of (`delta` -1) the correct counts, with a single
+    UPDATE, and re-score the completed enrolments among them.
+    """
+    own = ParticipantAnswer.objects.filter(
+        participant=OuterRef('participant'), quiz=OuterRef('quiz'), selected_choice_id=choice_id,
+    )
+    enrolments = QuizParticipant.objects.filter(Exists(own))
+    enrolments.update(
+        correct_count=F('correct_count') + delta * _count(own, 'participant'),
+        updated_at=timezone.now(),
+    )
+    _rescore(enrolments, quiz_id)
+
+
+def move_answer(answer, old_choice_id):
+    """
+    Account for `answer` now selecting another choice than `old_choice_id`:
+    adjust its enrolment's correct count and score and the per-choice counts.
+    """
+    correct = dict(
+        Choice.objects.filter(pk__in=[old_choice_id, answer.selected_choice_id]).values_list('pk', 'is_correct')
+    )
+    delta = int(correct.get(answer.selected_choice_id, False)) - int(correct.get(old_choice_id, False))
+    if delta:
+        adjust_answer_counts(answer.participant_id, answer.quiz_id, answered=0, correct=delta)
+        _rescore(QuizParticipant.objects.filter(participant_id=answer.participant_id, quiz_id=answer.quiz_id),
+                 answer.quiz_id)
+    discount_choice_answer(old_choice_id)
+    count_choice_answers([answer.selected_choice_id])
+
+
+def rescore_quiz(quiz_id):
+    """Settle every enrolment of a quiz after one of its questions was removed."""
+    _rescore(QuizParticipant.objects.filter(quiz_id=quiz_id), quiz_id)
+
+
+def _rescore(enrolments, quiz_id):
+    """
+    Recompute the final score of the completed `enrolments` from their
+    counters, and complete those that have answered every question, in a
+    single UPDATE.
+    """
+    total = Quiz.objects.filter(pk=quiz_id).values_list('question_count', flat=True).first()
+    if not total:
+        return
+    now = timezone.now()
+    settled = enrolments.filter(Q(score__isnull=False) | Q(answered_count__gte=total)).update(
+        score=F('correct_count') * 100.0 / total,
+        completed_at=Coalesce('completed_at', Value(now)),
+        updated_at=now,
+    )
+    if settled:
+        invalidate_leaderboard(quiz_id)
+
+
+def count_choice_answers(choice_ids):
+    """
+    Add new answers, given by their selected choice ids, to the per-choice
+    counts: one UPDATE per distinct number of answers to a choice, which is
+    a single UPDATE for a participant's answers.
+    """
+    by_delta = defaultdict(list)
+    for choice_id, delta in Counter(choice_ids).items():
+        by_delta[delta].append(choice_id)
+    for delta, ids in by_delta.items():
+        counts = ChoiceAnswerCount.objects.filter(choice_id__in=ids)
+        if counts.update(answer_count=F('answer_count') + delta) < len(ids):
+            # Choices bulk-created without their count row: count them from scratch
+            rebuild_choice_counts(choices=Choice.objects.filter(pk__in=ids))
+
+
+def discount_choice_answer(choice_id):
+    ChoiceAnswerCount.objects.filter(choice_id=choice_id).update(answer_count=F('answer_count') - 1)
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_by).annotate(n=Count('pk')).values('n')
+        ),
+        Value(0),
+    )
+
+
+def rebuild_counters(quiz_ids=None):
+    """
+    Recompute every counter from the source tables with one UPDATE per
+    counter table, and the per-choice counts with one GROUP BY. Restrict to
+    `quiz_ids` when given.
+    """
+    quizzes = Quiz.objects.all()
+    enrolments = QuizParticipant.objects.all()
+    if quiz_ids is not None:
+        quizzes = quizzes.filter(pk__in=quiz_ids)
+        enrolments = enrolments.filter(quiz_id__in=quiz_ids)
+
+    quizzes.update(
+        question_count=_count(Question.objects.filter(quiz=OuterRef('pk')), 'quiz'),
+    )
+
+    answers = ParticipantAnswer.objects.filter(
+        participant=OuterRef('participant'),
+        quiz=OuterRef('quiz'),
+    )
+    updated = enrolments.update(
+        answered_count=_count(answers, 'participant'),
+        correct_count=_count(answers.filter(selected_choice__is_correct=True), 'participant'),
+    )
+    rebuild_choice_counts(
+        Choice.objects.all() if quiz_ids is None else Choice.objects.filter(question__quiz_id__in=quiz_ids)
+    )
+    return updated
+
+
+def rebuild_choice_counts(choices, batch_size=1000):
+    """
+    Replace the count rows of `choices` (a Choice queryset), counted with
+    one GROUP BY over their answers.
+    """
+    counts = dict(
+        ParticipantAnswer.objects.filter(selected_choice__in=choices)
+        .order_by().values('selected_choice')
+        .annotate(n=Count('pk')).values_list('selected_choice', 'n')
+    )
+    ChoiceAnswerCount.objects.filter(choice__in=choices).delete()
+    ChoiceAnswerCount.objects.bulk_create(
+        (
+            ChoiceAnswerCount(quiz_id=quiz_id, question_id=question_id, choice_id=choice_id,
+                              answer_count=counts.get(choice_id, 0))
+            for choice_id, question_id, quiz_id in
+            choices.values_list('pk', 'question_id', 'question__quiz_id').iterator()
+        ),
+        batch_size=batch_size,
+    )
@@ -0,0 +1,91 @@
+"""
+Request-scoped resolution of the caller's enrolment (QuizParticipant).
+
+The permission class, the serializers and the views of this app all ask
+`get_enrolment` for the caller's enrolment in a quiz; the row is fetched
+once per request, with its participant and quiz, and memoized on the
+underlying HttpRequest. Async views use `aget_enrolment`, which shares the
+memo.
+"""
+from accounts.tokens import PARTICIPANT_CLAIM
+from .models import QuizParticipant
+
+_MISSING = object()
+
+
+def _memo(request):
+    # DRF's Request wraps the HttpRequest: store on the latter so that every
+    # layer sees the same memo whichever object it was handed.
+    http_request = getattr(request, '_request', request)
+    try:
+        return http_request._quiz_enrolments
+    except AttributeError:
+        http_request._quiz_enrolments = {}
+        return http_request._quiz_enrolments
+
+
+def _caller(request, quiz_id):
+    """(quiz id, user) of an enrolment lookup, or None if it cannot match."""
+    try:
+        quiz_id = int(quiz_id)
+    except (TypeError, ValueError):
+        return None
+    user = request.user
+    if not (user and user.is_authenticated):
+        return None
+    return quiz_id, user
+
+
+def _queryset(quiz_id, user):
+    # The participant id claim of the caller's token spares the user join
+    participant_id = getattr(user, PARTICIPANT_CLAIM, None)
+    if participant_id is not None:
+        caller = {'participant_id': participant_id}
+    else:
+        caller = {'participant__user_id': user.pk}
+    return QuizParticipant.objects.select_related('participant', 'quiz').filter(quiz_id=quiz_id, **caller)
+
+
+def get_enrolment(request, quiz_id, lock=False):
+    """
+    Return the caller's QuizParticipant for `quiz_id`, or None if the caller
+    is anonymous or not enrolled.
+
+    With `lock=True` the row is locked (select_for_update) until the end of
+    the current transaction; resolve with the lock first in views that need
+    it, an unlocked memo is re-fetched.
+    """
+    caller = _caller(request, quiz_id)
+    if caller is None:
+        return None
+    quiz_id, user = caller
+
+    memo = _memo(request)
+    qp, locked = memo.get(quiz_id, (_MISSING, False))
+    if qp is not _MISSING and (locked or not lock):
+        return qp
+
+    queryset = _queryset(quiz_id, user)
+    if lock:
+        queryset = queryset.select_for_update(of=('self',))
+    qp = queryset.first()
+    memo[quiz_id] = (qp, lock)
+    return qp
+
+
+async def aget_enrolment(request, quiz_id):
+    """
+    `get_enrolment` for async views. Never locks: the async ORM cannot run
+    transactions, so locked lookups happen in the worker thread that writes.
+    """
+    caller = _caller(request, quiz_id)
+    if caller is None:
+        return None
+    quiz_id, user = caller
+
+    memo = _memo(request)
+    qp, _ = memo.get(quiz_id, (_MISSING, False))
+    if qp is _MISSING:
+        qp = await _queryset(quiz_id, user).afirst()
+        memo[quiz_id] = (qp, False)
+    return qp
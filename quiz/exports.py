@@ -0,0 +1,91 @@
+"""
+Streaming exports of a quiz: one row per enrolment (`results`) or per
+answer (`answers`), as CSV or JSONL.
+
+Rows come from a single `values_list()` query, joined to the participant's
+email, and are read with `.iterator()` in chunks: memory stays flat however
+many rows a quiz has, and lines go out as soon as the first chunk is read.
+"""
+import csv
+from datetime import datetime
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import QuizParticipant, ParticipantAnswer
+
+CSV = 'csv'
+JSONL = 'jsonl'
+FORMATS = (CSV, JSONL)
+CONTENT_TYPES = {CSV: 'text/csv', JSONL: 'application/jsonl'}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+RESULTS = 'results'
+ANSWERS = 'answers'
+
+# Export name -> (model, {column: lookup}), columns in output order
+EXPORTS = {
+    RESULTS: (QuizParticipant, {
+        'email': 'participant__user__email',
+        'invited_at': 'invited_at',
+        'accepted_at': 'accepted_at',
+        'started_at': 'started_at',
+        'completed_at': 'completed_at',
+        'answered': 'answered_count',
+        'correct': 'correct_count',
+        'score': 'score',
+    }),
+    ANSWERS: (ParticipantAnswer, {
+        'email': 'participant__user__email',
+        'question_id': 'question_id',
+        'question': 'question__text',
+        'selected_choice_id': 'selected_choice_id',
+        'selected_choice': 'selected_choice__text',
+        'is_correct': 'selected_choice__is_correct',
+        'answered_at': 'answered_at',
+    }),
+}
+
+
+def export_columns(name):
+    return tuple(EXPORTS[name][1])
+
+
+def export_rows(quiz_id, name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Value tuples of export `name` for a quiz, in `export_columns` order."""
+    model, lookups = EXPORTS[name]
+    return model.objects.filter(quiz_id=quiz_id).order_by('pk') \
+                        .values_list(*lookups.values()).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object whose write() returns what it is given."""
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(columns, rows):
+    """CSV lines, header first, for tuples of values."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def jsonl_lines(columns, rows):
+    """One JSON object per line for tuples of values."""
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+def export_lines(quiz_id, name, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Lines of export `name` of a quiz in format `fmt`, produced lazily."""
+    write = csv_lines if fmt == CSV else jsonl_lines
+    return write(export_columns(name), export_rows(quiz_id, name, chunk_size))
@@ -0,0 +1,96 @@
+"""
+Staged (write-behind) answer ingestion, selected by QUIZ_ANSWER_INGESTION.
+
+A staged submission is validated against the cached quiz content and
+appended to `PendingAnswer` in a short autocommit insert, without touching
+the enrolment or any counter. `flush_pending` then moves the oldest staged
+answers into `ParticipantAnswer` with one bulk insert, and applies the
+counters, completion and score once per affected enrolment.
+
+Progress, leaderboards and analytics lag behind staged answers until they
+are flushed (QUIZ_INGESTION_MAX_LATENCY seconds at most while
+`manage.py flush_answers` runs).
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .counters import apply_answers, count_choice_answers
+from .models import QuizParticipant, ParticipantAnswer, PendingAnswer
+
+STAGED = 'staged'
+
+
+def staged_ingestion():
+    return settings.QUIZ_ANSWER_INGESTION == STAGED
+
+
+def flush_due(batch_size=None, max_latency=None):
+    """True once a full batch is staged or the oldest answer is due."""
+    batch_size = batch_size or settings.QUIZ_INGESTION_BATCH_SIZE
+    max_latency = settings.QUIZ_INGESTION_MAX_LATENCY if max_latency is None else max_latency
+
+    pending = PendingAnswer.objects.order_by('pk')
+    oldest = pending.values_list('created_at', flat=True).first()
+    if oldest is None:
+        return False
+    return oldest <= timezone.now() - timedelta(seconds=max_latency) or pending[batch_size - 1:].exists()
+
+
+def flush_pending(batch_size=None):
+    """
+    Move up to `batch_size` of the oldest staged answers into
+    ParticipantAnswer in one transaction. Answers to questions the
+    participant has meanwhile answered directly (batch submissions) are
+    dropped. Returns the number of staged answers consumed.
+    """
+    batch_size = batch_size or settings.QUIZ_INGESTION_BATCH_SIZE
+    with transaction.atomic():
+        # Concurrent flushers take disjoint batches where the backend can
+        pending = list(
+            PendingAnswer.objects.select_for_update(skip_locked=True)
+                                 .select_related('selected_choice')
+                                 .order_by('pk')[:batch_size]
+        )
+        if not pending:
+            return 0
+
+        recorded = set(
+            ParticipantAnswer.objects.filter(
+                participant_id__in={answer.participant_id for answer in pending},
+                question_id__in={answer.question_id for answer in pending},
+            ).values_list('participant_id', 'question_id')
+        )
+        to_create = [
+            ParticipantAnswer(
+                participant_id=answer.participant_id,
+                quiz_id=answer.quiz_id,
+                question_id=answer.question_id,
+                selected_choice_id=answer.selected_choice_id,
+                created_at=answer.created_at,
+            )
+            for answer in pending
+            if (answer.participant_id, answer.question_id) not in recorded
+        ]
+        ParticipantAnswer.objects.bulk_create(to_create)
+
+        # Counters, start, completion and score: one UPDATE per enrolment
+        tallies = defaultdict(lambda: [0, 0])
+        for answer in pending:
+            if (answer.participant_id, answer.question_id) not in recorded:
+                tally = tallies[answer.participant_id, answer.quiz_id]
+                tally[0] += 1
+                tally[1] += answer.selected_choice.is_correct
+        enrolments = QuizParticipant.objects.select_for_update().select_related('quiz').filter(
+            participant_id__in={participant_id for participant_id, _ in tallies},
+            quiz_id__in={quiz_id for _, quiz_id in tallies},
+        )
+        for qp in enrolments:
+            if (qp.participant_id, qp.quiz_id) in tallies:
+                answered, correct = tallies[qp.participant_id, qp.quiz_id]
+                apply_answers(qp, answered, correct)
+        count_choice_answers(answer.selected_choice_id for answer in to_create)
+
+        PendingAnswer.objects.filter(pk__in=[answer.pk for answer in pending]).delete()
+    return len(pending)
@@ -0,0 +1,201 @@
+"""
+Bulk invitations: invite a stream of email addresses to a quiz.
+
+Emails are read lazily from CSV or JSONL and processed in chunks, each in
+its own transaction with a constant number of statements: missing users
+(inactive participants without a usable password, username = lowercased
+email), their `Participant` profiles and the `QuizParticipant` rows with
+their invitation tokens are inserted with `insert_rows(ignore_conflicts=True)`,
+then read back, so concurrent or repeated invitations are safe.
+
+Emails are matched case-insensitively, against the input and existing
+users alike. Active users already have a password and cannot use an
+invitation token: they are enrolled directly, accepted and without a token.
+
+`invite_participants` yields one result per input email, in input order,
+for the caller to stream out (see `invitation_csv`).
+"""
+import csv
+import json
+import uuid
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from accounts.models import CustomUser
+from .bulk import chunked, db_value, insert_rows
+from .exports import CSV, JSONL, csv_lines
+from .models import Participant, QuizParticipant
+
+FORMATS = (CSV, JSONL)
+
+# Result statuses
+INVITED = 'invited'
+ALREADY_INVITED = 'already_invited'  # pending invitation, its token is repeated
+ACCEPTED = 'accepted'
+ENROLLED = 'enrolled'  # active user, enrolled and accepted without a token
+DUPLICATE = 'duplicate'  # repeated in the input
+INVALID = 'invalid'
+NOT_PARTICIPANT = 'not_participant'  # the email belongs to a creator
+USERNAME_TAKEN = 'username_taken'  # another account's username is the email
+
+RESULT_FIELDS = ('email', 'status', 'invitation_token')
+
+DEFAULT_CHUNK_SIZE = 2000
+USERNAME_MAX_LENGTH = CustomUser._meta.get_field('username').max_length
+
+
+def read_emails(lines, fmt=CSV):
+    """
+    Emails from an iterable of text lines. CSV: the "email" column when the
+    first row is a header naming one, else the first column. JSONL: objects
+    with an "email" key, or bare strings; undecodable lines are passed on
+    as they are, to be reported invalid.
+    """
+    if fmt == JSONL:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield line
+                continue
+            yield str(item.get('email', '')) if isinstance(item, dict) else str(item)
+        return
+
+    column = 0
+    for number, row in enumerate(csv.reader(lines)):
+        if not row:
+            continue
+        header = [cell.strip().lower() for cell in row]
+        if number == 0 and 'email' in header:
+            column = header.index('email')
+            continue
+        yield row[column] if column < len(row) else ''
+
+
+def _normalize(email):
+    email = CustomUser.objects.normalize_email(email.strip())
+    if len(email) > USERNAME_MAX_LENGTH:
+        return None
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return email
+
+
+def invite_participants(quiz, emails, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Invite `emails` to `quiz`; yields a result dict per email, in order."""
+    seen = set()
+    for chunk in chunked(emails, chunk_size):
+        yield from _invite_chunk(quiz, chunk, seen)
+
+
+def _invite_chunk(quiz, chunk, seen):
+    normalized = []
+    for raw in chunk:
+        email = _normalize(raw)
+        if email is None:
+            normalized.append((raw, INVALID))
+        elif email.lower() in seen:
+            normalized.append((email, DUPLICATE))
+        else:
+            seen.add(email.lower())
+            normalized.append((email, None))
+    keys = [email.lower() for email, status in normalized if status is None]
+
+    with transaction.atomic():
+        # (pk, user_type, is_active) by lowercased email
+        users = {}
+        for pk, key, user_type, is_active in (
+            CustomUser.objects.annotate(key=Lower('email')).filter(key__in=keys)
+                              .order_by('pk').values_list('pk', 'key', 'user_type', 'is_active')
+        ):
+            users.setdefault(key, (pk, user_type, is_active))
+
+        moment = timezone.now()
+        now = db_value(CustomUser, 'date_joined', moment)
+        missing = [key for key in keys if key not in users]
+        if missing:
+            password = make_password(None)
+            insert_rows(
+                CustomUser,
+                ('username', 'email', 'password', 'first_name', 'last_name', 'user_type',
+                 'is_active', 'is_staff', 'is_superuser', 'date_joined'),
+                (
+                    (key, key, password, '', '', CustomUser.PARTICIPANT, False, False, False, now)
+                    for key in missing
+                ),
+                ignore_conflicts=True,
+            )
+            # Read back by username: also finds users created concurrently. The
+            # email must match too: an unrelated account may have the username
+            for pk, key, user_type, is_active in (
+                CustomUser.objects.annotate(key=Lower('email')).filter(username__in=missing, key__in=missing)
+                                  .values_list('pk', 'key', 'user_type', 'is_active')
+            ):
+                users.setdefault(key, (pk, user_type, is_active))
+
+        participants = {pk: is_active for pk, user_type, is_active in users.values()
+                        if user_type == CustomUser.PARTICIPANT}
+        insert_rows(
+            Participant, ('user', 'created_at', 'updated_at'),
+            ((pk, now, now) for pk in participants),
+            ignore_conflicts=True,
+        )
+        profiles = dict(Participant.objects.filter(user_id__in=participants).values_list('user_id', 'pk'))
+        active = [participant_id for user_id, participant_id in profiles.items() if participants[user_id]]
+        if active:
+            # Pending invitations of users who have since been activated otherwise
+            QuizParticipant.objects.filter(quiz=quiz, participant_id__in=active, accepted_at__isnull=True) \
+                                   .update(invitation_token=None, accepted_at=moment, updated_at=moment)
+
+        tokens = {
+            participant_id: None if participants[user_id] else uuid.uuid4()
+            for user_id, participant_id in profiles.items()
+        }
+        accepted_at = db_value(QuizParticipant, 'accepted_at', moment)
+        insert_rows(
+            QuizParticipant,
+            ('quiz', 'participant', 'invitation_token', 'invited_at', 'accepted_at',
+             'answered_count', 'correct_count', 'created_at', 'updated_at'),
+            (
+                (quiz.pk, participant_id, db_value(QuizParticipant, 'invitation_token', token), now,
+                 None if token else accepted_at, 0, 0, now, now)
+                for participant_id, token in tokens.items()
+            ),
+            ignore_conflicts=True,
+        )
+        enrolments = {
+            participant_id: (token, accepted)
+            for participant_id, token, accepted in QuizParticipant.objects.filter(
+                quiz=quiz, participant_id__in=tokens
+            ).values_list('participant_id', 'invitation_token', 'accepted_at')
+        }
+
+    for email, status in normalized:
+        token = None
+        if status is None:
+            pk, user_type, _ = users.get(email.lower(), (None, None, None))
+            if pk is None:
+                status = USERNAME_TAKEN
+            elif user_type != CustomUser.PARTICIPANT:
+                status = NOT_PARTICIPANT
+            else:
+                participant_id = profiles[pk]
+                token, accepted = enrolments[participant_id]
+                if token is not None:
+                    status = INVITED if token == tokens[participant_id] else ALREADY_INVITED
+                else:
+                    status = ENROLLED if accepted == moment else ACCEPTED
+        yield {'email': email, 'status': status, 'invitation_token': str(token) if token else ''}
+
+
+def invitation_csv(results):
+    """CSV lines (header first) for a stream of invitation results."""
+    return csv_lines(RESULT_FIELDS, (tuple(result[field] for field in RESULT_FIELDS) for result in results))
@@ -0,0 +1,109 @@
+"""
+Per-quiz leaderboard of completed enrolments.
+
+Enrolments rank by final score, highest first, then by completion time,
+earliest first; enrolments equal on both share a rank (1, 2, 2, 4...).
+Both queries below walk the `qp_leaderboard_idx` index: the top is a short
+index range scan, the rank of an enrolment one COUNT over the entries ahead
+of it, whatever the number of participants.
+
+The top is cached for QUIZ_LEADERBOARD_CACHE_TIMEOUT seconds and dropped by
+`apply_answers` when a score is finalized.
+
+The top is shared by every reader, so it is built from the primary
+database even inside `replica_reads()`; the rank of the caller is not
+cached and may come from the replica.
+
+Other participants are shown by `display_name` only: usernames are the
+email addresses of invited participants, who often have no name on file and
+are then shown by their place in the top instead.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+from .models import QuizParticipant
+
+# Bump LEADERBOARD_FORMAT whenever the layout of the cached top changes
+LEADERBOARD_FORMAT = 3
+LEADERBOARD_KEY = 'quiz:leaderboard:{format}:{quiz_id}'
+UNNAMED = 'Participant #{position}'
+
+
+def display_name(first_name, last_name, position):
+    """
+    The first name and last initial of a participant, e.g. "Ada L.", or
+    "Participant #3" for the third entry of the top when it has no first name.
+    """
+    if not first_name:
+        return UNNAMED.format(position=position)
+    return f'{first_name} {last_name[0]}.' if last_name else first_name
+
+
+def _completed(quiz_id):
+    # The score is set together with completed_at, on the last answer
+    return QuizParticipant.objects.filter(quiz_id=quiz_id, score__isnull=False)
+
+
+def _ahead_of(score, completed_at):
+    return Q(score__gt=score) | Q(score=score, completed_at__lt=completed_at)
+
+
+def build_top(quiz_id):
+    """The top QUIZ_LEADERBOARD_SIZE entries and the number of completed enrolments (two queries)."""
+    completed = _completed(quiz_id).using(DEFAULT_DB_ALIAS)
+    rows = (
+        completed
+        .order_by('-score', 'completed_at', 'id')
+        .values_list('participant_id', 'participant__user__first_name', 'participant__user__last_name',
+                     'score', 'completed_at')
+        [:settings.QUIZ_LEADERBOARD_SIZE]
+    )
+    entries = []
+    for position, (participant_id, first_name, last_name, score, completed_at) in enumerate(rows, start=1):
+        previous = entries[-1] if entries else None
+        tied = previous and (previous['score'], previous['completed_at']) == (score, completed_at)
+        entries.append({
+            'rank': previous['rank'] if tied else position,
+            'participant_id': participant_id,
+            'name': display_name(first_name, last_name, position),
+            'score': score,
+            'completed_at': completed_at,
+        })
+    return {
+        'entries': entries,
+        'completed': completed.count() if len(entries) == settings.QUIZ_LEADERBOARD_SIZE else len(entries),
+    }
+
+
+def get_top(quiz_id):
+    """Return the cached top of a quiz, building it on a miss."""
+    key = LEADERBOARD_KEY.format(format=LEADERBOARD_FORMAT, quiz_id=quiz_id)
+    top = cache.get(key)
+    if top is None:
+        top = build_top(quiz_id)
+        cache.set(key, top, timeout=settings.QUIZ_LEADERBOARD_CACHE_TIMEOUT)
+    return top
+
+
+def get_rank(qp, top=None):
+    """
+    Rank of a completed enrolment, None if it has not completed. Free when
+    the enrolment is in `top`, one counting query otherwise.
+    """
+    if qp.score is None:
+        return None
+    for entry in (top or {}).get('entries', ()):
+        if entry['participant_id'] == qp.participant_id:
+            return entry['rank']
+    return _completed(qp.quiz_id).filter(_ahead_of(qp.score, qp.completed_at)).aggregate(
+        ahead=Count('pk')
+    )['ahead'] + 1
+
+
+def invalidate_leaderboard(quiz_id):
+    """
+    Drop the cached top of a quiz once the current transaction commits, so
+    that no reader caches it again before the new score is visible.
+    """
+    transaction.on_commit(lambda: cache.delete(LEADERBOARD_KEY.format(format=LEADERBOARD_FORMAT, quiz_id=quiz_id)))
@@ -0,0 +1,107 @@
+import json
+import logging
+import math
+import uuid
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from accounts.models import CustomUser
+from accounts.tokens import for_user
+from quiz.bench import (
+    async_views, build_quiz, create_participants, enrol, summarize,
+    wsgi_request, asgi_request, run_threaded, run_concurrently,
+)
+
+ENDPOINTS = ('detail', 'progress', 'me', 'submit')
+MODES = ('wsgi', 'asgi', 'asgi-async')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares concurrent-request throughput of the WSGI application (threads), '
+        'the ASGI application with the DRF views and the ASGI application with the '
+        'async views. Fixtures are committed so that every worker connection sees '
+        'them, and deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and mode.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once.')
+        parser.add_argument('--participants', type=int, default=50)
+        parser.add_argument('--questions', type=int, default=20)
+        parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, dest='endpoints')
+        parser.add_argument('--mode', action='append', choices=MODES, dest='modes')
+
+    def handle(self, *args, **options):
+        from oper import asgi, wsgi
+        self.applications = {'wsgi': wsgi.application, 'asgi': asgi.application}
+        prefix = f'bench-concurrency-{uuid.uuid4().hex[:8]}'
+        # 5xx responses (e.g. SQLite lock timeouts under concurrent writes) are
+        # counted in the report; log their tracebacks only when asked to
+        if options['verbosity'] < 2:
+            logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        try:
+            report = self.run(prefix, options)
+        finally:
+            CustomUser.objects.filter(username__startswith=prefix).delete()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, prefix, options):
+        creator = CustomUser.objects.create(username=f'{prefix}-creator', email=f'{prefix}-creator@example.com')
+        users = create_participants(options['participants'], prefix=prefix)
+        tokens = [
+            {'authorization': f'Bearer {for_user(user).access_token}'}
+            for user in users
+        ]
+        quiz = build_quiz(creator, options['questions'])
+        enrol(quiz, users)
+
+        report = {
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+        }
+        for mode in options['modes'] or MODES:
+            with async_views(mode == 'asgi-async'):
+                report[mode] = {
+                    endpoint: self.bench(mode, endpoint, creator, users, tokens, quiz, options)
+                    for endpoint in options['endpoints'] or ENDPOINTS
+                }
+        return report
+
+    def bench(self, mode, endpoint, creator, users, tokens, quiz, options):
+        count = options['requests']
+        if endpoint == 'submit':
+            # A fresh quiz per mode, large enough for one answer per (user, question)
+            quiz = build_quiz(creator, max(options['questions'], math.ceil(count / len(users))))
+            enrol(quiz, users)
+            questions = list(quiz.questions.prefetch_related('choices').order_by('id'))
+
+        def request(i):
+            headers = tokens[i % len(tokens)]
+            if endpoint == 'detail':
+                return 'GET', reverse('quiz-detail', args=[quiz.id]), headers, b''
+            if endpoint == 'progress':
+                return 'GET', reverse('quiz-progress', args=[quiz.id]), headers, b''
+            if endpoint == 'me':
+                return 'GET', reverse('me'), headers, b''
+            question = questions[i // len(users)]
+            body = json.dumps({'selected_choice': question.choices.all()[0].id}).encode()
+            return 'POST', reverse('submit-answer', args=[quiz.id, question.id]), headers, body
+
+        requests = [request(i) for i in range(count)]
+        if mode == 'wsgi':
+            application = self.applications['wsgi']
+            statuses, latencies, elapsed = run_threaded(
+                lambda i: wsgi_request(application, *requests[i]), count, options['concurrency']
+            )
+        else:
+            application = self.applications['asgi']
+            statuses, latencies, elapsed = run_concurrently(
+                lambda i: asgi_request(application, *requests[i]), count, options['concurrency']
+            )
+
+        return {
+            'throughput_rps': round(count / elapsed, 1),
+            'statuses': {str(code): n for code, n in sorted(Counter(statuses).items())},
+            'latency': summarize(latencies),
+        }
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from accounts.models import CustomUser, UserToken
+from accounts.sessions import STORES
+from quiz.bench import (
+    TRANSACTION_STATEMENTS, async_views, create_participants, summarize,
+    wsgi_request, asgi_request, run_threaded, run_concurrently,
+)
+
+PASSWORD = 'Bench-login-pass!1'
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+MODES = ('wsgi', 'asgi-async')
+EXECUTORS = ('inline', 'process')
+
+
+class StatementCounter:
+    """execute_wrapper counting reads and writes, across threads."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().upper()
+        if not statement.startswith(TRANSACTION_STATEMENTS):
+            with self.lock:
+                self.counts['writes' if statement.startswith(WRITES) else 'reads'] += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Login storm: concurrent logins through the WSGI application (threads) or '
+        'the ASGI application with the async views, hashing inline or on the '
+        'process pool, for each session store. Reports throughput, logins per '
+        'second per core and the reads and writes issued per login (WSGI only). '
+        'Fixtures are committed so that every worker connection sees them, and '
+        'deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=20, help='Logins in flight at once.')
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--store', action='append', choices=STORES, dest='stores')
+        parser.add_argument('--mode', action='append', choices=MODES, dest='modes')
+        parser.add_argument('--executor', action='append', choices=EXECUTORS, dest='executors')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processes of the process pool.')
+        parser.add_argument('--queue-size', type=int, default=256, help='Jobs waiting for the process pool.')
+        parser.add_argument(
+            '--hasher', choices=('md5', 'default'), default='md5',
+            help='Password hasher of the fixtures: md5 isolates the session writes, the default '
+                 'one measures hashing throughput.'
+        )
+
+    def handle(self, *args, **options):
+        from oper import asgi, wsgi
+        self.applications = {'wsgi': wsgi.application, 'asgi-async': asgi.application}
+        prefix = f'bench-login-{uuid.uuid4().hex[:8]}'
+        if options['verbosity'] < 2:
+            logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        hashers = {}
+        if options['hasher'] == 'md5':
+            hashers['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+        try:
+            with override_settings(**hashers):
+                report = self.run(prefix, options)
+        finally:
+            CustomUser.objects.filter(username__startswith=prefix).delete()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, prefix, options):
+        users = create_participants(options['users'], prefix=prefix)
+        CustomUser.objects.filter(pk__in=[user.pk for user in users]).update(password=make_password(PASSWORD))
+        url = reverse('login')
+        bodies = [json.dumps({'username': user.username, 'password': PASSWORD}).encode() for user in users]
+
+        report = {
+            'logins': options['logins'],
+            'concurrency': options['concurrency'],
+            'users': len(users),
+            'hasher': options['hasher'],
+            'cores': os.cpu_count(),
+        }
+        for mode in options['modes'] or MODES:
+            for executor in options['executors'] or EXECUTORS:
+                workers = options['workers'] if executor == 'process' else 0
+                for store in options['stores'] or STORES:
+                    UserToken.objects.filter(user__in=users).delete()
+                    with async_views(mode == 'asgi-async'), override_settings(
+                        AUTH_SESSION_STORE=store,
+                        AUTH_HASHING_WORKERS=workers,
+                        AUTH_HASHING_QUEUE_SIZE=options['queue_size'],
+                    ):
+                        report[f'{mode} {executor} {store}'] = self.storm(mode, url, bodies, options)
+        return report
+
+    def storm(self, mode, url, bodies, options):
+        count = options['logins']
+        application = self.applications[mode]
+        counter = StatementCounter()
+        if mode == 'wsgi':
+            def login(i):
+                with connection.execute_wrapper(counter):
+                    return wsgi_request(application, 'POST', url, body=bodies[i % len(bodies)])
+            statuses, latencies, elapsed = run_threaded(login, count, options['concurrency'])
+        else:
+            # The async views run their queries in other threads: not counted
+            statuses, latencies, elapsed = run_concurrently(
+                lambda i: asgi_request(application, 'POST', url, body=bodies[i % len(bodies)]),
+                count, options['concurrency']
+            )
+        result = {
+            'throughput_rps': round(count / elapsed, 1),
+            'per_core_rps': round(count / elapsed / os.cpu_count(), 1),
+            'statuses': {str(code): n for code, n in sorted(Counter(statuses).items())},
+            'latency': summarize(latencies),
+        }
+        if counter.counts:
+            result['per_login'] = {kind: round(n / count, 2) for kind, n in sorted(counter.counts.items())}
+        return result
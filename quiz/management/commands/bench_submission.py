@@ -0,0 +1,52 @@
+import json
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from accounts.models import CustomUser
+from quiz.bench import api_client, rolled_back, build_quiz, create_participants, enrol, measure, summarize
+
+
+class Command(BaseCommand):
+    help = 'Measures queries and latency per answer submission (nothing is kept).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--participants', type=int, default=20)
+        parser.add_argument('--questions', type=int, default=50)
+        parser.add_argument('--choices', type=int, default=4)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            report = self.run(options)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, options):
+        creator = CustomUser.objects.create(username='bench-creator', email='bench-creator@example.com')
+        quiz = build_quiz(creator, options['questions'], options['choices'])
+        users = create_participants(options['participants'])
+        enrol(quiz, users)
+        questions = list(quiz.questions.prefetch_related('choices').order_by('id'))
+
+        client = api_client()
+        latencies, statements, errors = [], [], 0
+        for user in users:
+            client.force_authenticate(user=user)
+            for question in questions:
+                url = reverse('submit-answer', args=[quiz.id, question.id])
+                choice = question.choices.all()[0]
+                response, queries, elapsed = measure(
+                    client.post, url, {'selected_choice': choice.id}, format='json'
+                )
+                if response.status_code != 201:
+                    errors += 1
+                latencies.append(elapsed)
+                statements.append(queries)
+
+        return {
+            'submissions': len(latencies),
+            'errors': errors,
+            'queries_per_submission': {
+                'min': min(statements),
+                'max': max(statements),
+                'mean': round(sum(statements) / len(statements), 2),
+            },
+            'latency': summarize(latencies),
+        }
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from quiz.exports import EXPORTS, FORMATS, CSV, DEFAULT_CHUNK_SIZE, export_lines
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = 'Writes the results (one row per participant) or raw answers of a quiz as CSV or JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('export', choices=tuple(EXPORTS))
+        parser.add_argument('--format', choices=FORMATS, default=CSV)
+        parser.add_argument('--output', '-o', default='-', help='Output file, "-" (default) for stdout.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if not Quiz.objects.filter(pk=options['quiz_id']).exists():
+            raise CommandError(f'Quiz {options["quiz_id"]} does not exist.')
+        lines = export_lines(options['quiz_id'], options['export'], options['format'], options['chunk_size'])
+
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            output.writelines(lines)
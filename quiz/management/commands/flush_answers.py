@@ -0,0 +1,39 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from quiz.ingestion import flush_due, flush_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves answers accepted in staged ingestion mode into ParticipantAnswer, '
+        'in batches, once a full batch is staged or the oldest answer reaches '
+        'the maximum latency. Runs until interrupted unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.QUIZ_INGESTION_BATCH_SIZE)
+        parser.add_argument('--max-latency', type=float, default=settings.QUIZ_INGESTION_MAX_LATENCY,
+                            help='Seconds a staged answer may wait for its batch.')
+        parser.add_argument('--poll', type=float, default=0.2, help='Seconds between checks while idle.')
+        parser.add_argument('--once', action='store_true', help='Flush everything staged now, then exit.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if options['once']:
+            total = 0
+            while flushed := flush_pending(batch_size):
+                total += flushed
+            self.stdout.write(self.style.SUCCESS(f'Flushed {total} staged answers.'))
+            return
+
+        try:
+            while True:
+                if flush_due(batch_size, options['max_latency']):
+                    flushed = flush_pending(batch_size)
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'Flushed {flushed} staged answers.')
+                else:
+                    time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            pass
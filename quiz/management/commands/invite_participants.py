@@ -0,0 +1,51 @@
+import sys
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from quiz.invitations import FORMATS, CSV, JSONL, DEFAULT_CHUNK_SIZE, invite_participants, read_emails, invitation_csv
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = (
+        'Invites the emails listed in a CSV or JSONL file to a quiz, creating missing '
+        'participants, and writes their invitation tokens as CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('input', help='CSV or JSONL file of emails, "-" for stdin.')
+        parser.add_argument('--output', '-o', default='-', help='CSV of invitation tokens, "-" (default) for stdout.')
+        parser.add_argument('--format', choices=FORMATS, help='Input format; guessed from the file name by default.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            quiz = Quiz.objects.get(pk=options['quiz_id'])
+        except Quiz.DoesNotExist:
+            raise CommandError(f'Quiz {options["quiz_id"]} does not exist.')
+        fmt = options['format'] or (JSONL if options['input'].endswith(('.jsonl', '.ndjson')) else CSV)
+
+        source = sys.stdin if options['input'] == '-' else open(options['input'], newline='', encoding='utf-8-sig')
+        output = None if options['output'] == '-' else open(options['output'], 'w', newline='', encoding='utf-8')
+        statuses = Counter()
+
+        def counted(results):
+            for result in results:
+                statuses[result['status']] += 1
+                yield result
+
+        try:
+            results = invite_participants(quiz, read_emails(source, fmt), options['chunk_size'])
+            for line in invitation_csv(counted(results)):
+                if output is None:
+                    self.stdout.write(line, ending='')
+                else:
+                    output.write(line)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if output is not None:
+                output.close()
+
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(statuses.items())) or 'no emails'
+        self.stderr.write(self.style.SUCCESS(f'Quiz {quiz.pk}: {summary}.'))
@@ -0,0 +1,324 @@
+import asyncio
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from accounts.models import CustomUser
+from quiz.bench import build_quiz, create_participants, enrol, summarize
+from quiz.models import QuizParticipant
+
+PASSWORD = 'Loadtest-pass!1'
+DRIVERS = ('threads', 'asyncio')
+# In flow order
+ENDPOINTS = ('participant-activate', 'login', 'quiz-detail', 'submit-answer', 'quiz-progress', 'token-refresh')
+# Status of a request that got no response (refused, reset, timed out)
+NO_RESPONSE = 0
+
+
+class ThreadingServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # Every virtual user may connect at once
+    request_queue_size = 1024
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def encode_request(host, method, path, token=None, data=None):
+    body = json.dumps(data).encode() if data is not None else b''
+    headers = {
+        'Host': host,
+        'Connection': 'close',
+        'Content-Type': 'application/json',
+        'Content-Length': str(len(body)),
+    }
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return headers, body
+
+
+def decode_body(status, body):
+    if status >= 400 or not body:
+        return None
+    return json.loads(body)
+
+
+class ThreadClient:
+    """Blocking HTTP client, one connection per request."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+
+    def request(self, method, path, token=None, data=None):
+        headers, body = encode_request(f'{self.host}:{self.port}', method, path, token, data)
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, decode_body(response.status, response.read())
+        finally:
+            connection.close()
+
+
+class AsyncClient:
+    """HTTP/1.1 client on asyncio streams, one connection per request."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+
+    async def request(self, method, path, token=None, data=None):
+        return await asyncio.wait_for(self._request(method, path, token, data), self.timeout)
+
+    async def _request(self, method, path, token, data):
+        headers, body = encode_request(f'{self.host}:{self.port}', method, path, token, data)
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            head = f'{method} {path} HTTP/1.1\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in headers.items())
+            writer.write(head.encode() + b'\r\n' + body)
+            await writer.drain()
+            # Connection: close, and Django always sets Content-Length: the body ends at EOF
+            raw = await reader.read()
+        finally:
+            writer.close()
+        if not raw:
+            raise ConnectionResetError('connection closed without a response')
+        head, _, body = raw.partition(b'\r\n\r\n')
+        status = int(head.split(b' ', 2)[1])
+        return status, decode_body(status, body)
+
+
+class Recorder:
+    """(status, seconds) of every request, per endpoint."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def add(self, endpoint, status, seconds):
+        with self.lock:
+            self.samples[endpoint].append((status, seconds))
+
+
+class Flow:
+    """
+    The journey of one invited participant: activate, log in, read the quiz,
+    answer its questions one by one, read the progress, refresh the token.
+    Written once as a generator of requests, so that both drivers run it:
+    each request yields (endpoint, method, path, token, data) and receives
+    the decoded response body, or None on an error, which ends the journey.
+    """
+
+    def __init__(self, username, invitation_token, quiz_id, answers):
+        self.username = username
+        self.invitation_token = invitation_token
+        self.quiz_id = quiz_id
+        self.answers = answers
+
+    def steps(self):
+        tokens = yield ('participant-activate', 'PATCH', reverse('participant-activate'), None, {
+            'token': self.invitation_token, 'password': PASSWORD,
+        })
+        if tokens is None:
+            return
+        tokens = yield ('login', 'POST', reverse('login'), None, {
+            'username': self.username, 'password': PASSWORD,
+        })
+        if tokens is None:
+            return
+        access = tokens['access']
+
+        quiz = yield ('quiz-detail', 'GET', reverse('quiz-detail', args=[self.quiz_id]), access, None)
+        if quiz is None:
+            return
+        for question in quiz['questions'][:self.answers]:
+            choice = random.choice(question['choices'])
+            answer = yield ('submit-answer', 'POST', reverse('submit-answer', args=[self.quiz_id, question['id']]),
+                            access, {'selected_choice': choice['id']})
+            if answer is None:
+                return
+
+        progress = yield ('quiz-progress', 'GET', reverse('quiz-progress', args=[self.quiz_id]), access, None)
+        if progress is None:
+            return
+        yield ('token-refresh', 'POST', reverse('token-refresh'), None, {'refresh': tokens['refresh']})
+
+    def run(self, client, recorder):
+        """Run the journey with a ThreadClient; True when every step succeeded."""
+        # The journey stops after a failed step: then the last response is None
+        steps = self.steps()
+        response = None
+        try:
+            while True:
+                endpoint, method, path, token, data = steps.send(response)
+                start = time.perf_counter()
+                try:
+                    status, response = client.request(method, path, token, data)
+                except OSError:
+                    status, response = NO_RESPONSE, None
+                recorder.add(endpoint, status, time.perf_counter() - start)
+        except StopIteration:
+            return response is not None
+
+    async def arun(self, client, recorder):
+        """`run` with an AsyncClient."""
+        steps = self.steps()
+        response = None
+        try:
+            while True:
+                endpoint, method, path, token, data = steps.send(response)
+                start = time.perf_counter()
+                try:
+                    status, response = await client.request(method, path, token, data)
+                except (OSError, asyncio.TimeoutError):
+                    status, response = NO_RESPONSE, None
+                recorder.add(endpoint, status, time.perf_counter() - start)
+        except StopIteration:
+            return response is not None
+
+
+class Command(BaseCommand):
+    help = (
+        'End-to-end load test: provisions quizzes and invited participants, then '
+        'runs each participant through the real flow (activate, login, quiz detail, '
+        'one answer per question, progress, token refresh) over HTTP, with '
+        '--concurrency virtual users at a time on threads or on an asyncio loop. '
+        'Targets --url, or a threaded WSGI server started in this process. Reports '
+        'throughput, latency percentiles and error rates per endpoint as JSON. '
+        'Fixtures are committed so that the server sees them, and deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Invited participants, one journey each.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Virtual users at once.')
+        parser.add_argument('--quizzes', type=int, default=1, help='Participants are spread over the quizzes.')
+        parser.add_argument('--questions', type=int, default=10)
+        parser.add_argument('--answers', type=int, help='Answers per participant (default: every question).')
+        parser.add_argument('--driver', choices=DRIVERS, default='threads')
+        parser.add_argument(
+            '--url',
+            help='Server to load, e.g. http://127.0.0.1:8000 for `uvicorn oper.asgi:application` '
+                 'sharing this database. By default a threaded WSGI server is started in this process.'
+        )
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for a response.')
+        parser.add_argument(
+            '--hasher', choices=('default', 'md5'), default='default',
+            help='md5 takes password hashing out of the picture (in-process server only).'
+        )
+
+    def handle(self, *args, **options):
+        prefix = f'loadtest-{uuid.uuid4().hex[:8]}'
+        if options['verbosity'] < 2:
+            logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        hashers = {}
+        if options['hasher'] == 'md5':
+            hashers['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+        try:
+            with override_settings(**hashers):
+                report = self.run(prefix, options)
+        finally:
+            # Quizzes go with their creator
+            CustomUser.objects.filter(username__startswith=prefix).delete()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def provision(self, prefix, options):
+        creator = CustomUser.objects.create(username=f'{prefix}-creator', email=f'{prefix}-creator@example.com')
+        quizzes = [
+            build_quiz(creator, questions=options['questions'], title=f'{prefix} quiz {i}')
+            for i in range(options['quizzes'])
+        ]
+        users = create_participants(options['users'], prefix=prefix)
+        CustomUser.objects.filter(pk__in=[user.pk for user in users]).update(is_active=False)
+        for i, quiz in enumerate(quizzes):
+            enrol(quiz, users[i::len(quizzes)], accepted=False)
+
+        answers = options['answers'] if options['answers'] is not None else options['questions']
+        usernames = {user.participant_profile.pk: user.username for user in users}
+        return [
+            Flow(usernames[participant_id], str(token), quiz_id, answers)
+            for participant_id, token, quiz_id in QuizParticipant.objects.filter(
+                participant_id__in=usernames
+            ).values_list('participant_id', 'invitation_token', 'quiz_id')
+        ]
+
+    def run(self, prefix, options):
+        flows = self.provision(prefix, options)
+        server = None
+        url = options['url']
+        if url is None:
+            from oper import wsgi
+            server = make_server('127.0.0.1', 0, wsgi.application, ThreadingServer, QuietHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            recorder = Recorder()
+            start = time.perf_counter()
+            completed = self.drive(flows, url, recorder, options)
+            elapsed = time.perf_counter() - start
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        endpoints = {}
+        for endpoint in ENDPOINTS:
+            samples = recorder.samples.get(endpoint, [])
+            errors = sum(1 for status, _ in samples if status == NO_RESPONSE or status >= 400)
+            statuses = defaultdict(int)
+            for status, _ in samples:
+                statuses[str(status)] += 1
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'throughput_rps': round(len(samples) / elapsed, 1),
+                'errors': errors,
+                'error_rate': round(errors / len(samples), 4) if samples else 0,
+                'statuses': dict(sorted(statuses.items())),
+                'latency': summarize([seconds for _, seconds in samples]),
+            }
+        requests = sum(endpoint['requests'] for endpoint in endpoints.values())
+        return {
+            'target': url if server is None else 'in-process wsgi',
+            'driver': options['driver'],
+            'users': len(flows),
+            'concurrency': options['concurrency'],
+            'hasher': options['hasher'],
+            'elapsed_s': round(elapsed, 3),
+            'journeys_completed': completed,
+            'requests': requests,
+            'throughput_rps': round(requests / elapsed, 1),
+            'endpoints': endpoints,
+        }
+
+    def drive(self, flows, url, recorder, options):
+        """Run every flow, `concurrency` at a time; the number that completed."""
+        concurrency = options['concurrency']
+        if options['driver'] == 'threads':
+            client = ThreadClient(url, options['timeout'])
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                return sum(executor.map(lambda flow: flow.run(client, recorder), flows))
+
+        async def main():
+            client = AsyncClient(url, options['timeout'])
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run(flow):
+                async with semaphore:
+                    return await flow.arun(client, recorder)
+            return sum(await asyncio.gather(*(run(flow) for flow in flows)))
+        return asyncio.run(main())
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from quiz.cache import content_cache_stats, reset_content_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Shows hit/miss counters of the quiz content cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them.')
+
+    def handle(self, *args, **options):
+        stats = content_cache_stats()
+        ratio = stats['hit_ratio']
+        self.stdout.write(
+            f"hits: {stats['hits']}  misses: {stats['misses']}  "
+            f"hit ratio: {ratio if ratio is not None else '-'}"
+        )
+        if options['reset']:
+            reset_content_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from quiz.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized question, answer and per-choice answer counters from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, nargs='*', dest='quiz_ids', help='Only rebuild these quiz ids.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_counters(options['quiz_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Counters rebuilt for {updated} quiz participants.'))
@@ -1,13 +1,35 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from accounts.models import CustomUser
 from quiz.models import Participant, Quiz, Question, Choice
+from quiz.seeding import SyntheticDataGenerator
 
 
 class Command(BaseCommand):
-    help = 'Seeds the database with a participant, quizzes, questions, and choices.'
+    help = (
+        'Seeds the database with a participant, quizzes, questions, and choices. '
+        'With --quizzes, generates synthetic data in bulk for load testing instead.'
+    )
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        synthetic = parser.add_argument_group('synthetic data')
+        synthetic.add_argument('--quizzes', type=int, default=0, help='Number of quizzes to generate.')
+        synthetic.add_argument('--creators', type=int, default=1)
+        synthetic.add_argument('--questions', type=int, default=10, help='Questions per quiz.')
+        synthetic.add_argument('--choices', type=int, default=4, help='Choices per question.')
+        synthetic.add_argument('--participants', type=int, default=100)
+        synthetic.add_argument('--enrolment-ratio', type=float, default=1.0,
+                               help='Fraction of the participants enrolled in each quiz.')
+        synthetic.add_argument('--answered-fraction', type=float, default=0.5,
+                               help='Fraction of the questions each enrolled participant answered.')
+        synthetic.add_argument('--seed', type=int, default=0, help='Random seed: same seed, same data.')
+        synthetic.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk insert.')
+        synthetic.add_argument('--prefix', default='synthetic', help='Prefix of generated usernames and titles.')
+        synthetic.add_argument('--password', help='Password of the generated accounts (unusable if omitted).')
+
+    def handle(self, *args, **options):
+        if options['quizzes']:
+            return self.generate(options)
         # Create participant user
         participant_user, _ = CustomUser.objects.get_or_create(
             email='participant@example.com',
@@ -55,3 +77,31 @@ class Command(BaseCommand):
         Choice.objects.get_or_create(question=q2, text='Jupiter', is_correct=False)
 
         self.stdout.write(self.style.SUCCESS('Database seeded with participant and quiz content.'))
+
+    def generate(self, options):
+        if CustomUser.objects.filter(username__startswith=f"{options['prefix']}-").exists():
+            raise CommandError(f"Synthetic users with prefix '{options['prefix']}' already exist, use another --prefix.")
+
+        try:
+            generator = SyntheticDataGenerator(
+                creators=options['creators'],
+                quizzes=options['quizzes'],
+                questions=options['questions'],
+                choices=options['choices'],
+                participants=options['participants'],
+                enrolment_ratio=options['enrolment_ratio'],
+                answered_fraction=options['answered_fraction'],
+                seed=options['seed'],
+                chunk_size=options['chunk_size'],
+                prefix=options['prefix'],
+                password=options['password'],
+                log=self.stdout.write if options['verbosity'] > 1 else None,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        stats = generator.run()
+        self.stdout.write(self.style.SUCCESS(
+            'Generated {users} users, {quizzes} quizzes, {questions} questions, {choices} choices, '
+            '{enrolments} enrolments and {answers} answers in {seconds}s.'.format(**stats)
+        ))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, group_by):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(n=Count('pk')).values('n')),
+        Value(0),
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Quiz = apps.get_model('quiz', 'Quiz')
+    Question = apps.get_model('quiz', 'Question')
+    QuizParticipant = apps.get_model('quiz', 'QuizParticipant')
+    ParticipantAnswer = apps.get_model('quiz', 'ParticipantAnswer')
+
+    Quiz.objects.update(
+        question_count=count(Question.objects.filter(quiz=OuterRef('pk')), 'quiz')
+    )
+    answers = ParticipantAnswer.objects.filter(
+        participant=OuterRef('participant'), quiz=OuterRef('quiz')
+    )
+    QuizParticipant.objects.update(
+        answered_count=count(answers, 'participant'),
+        correct_count=count(answers.filter(selected_choice__is_correct=True), 'participant'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quizparticipant',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quizparticipant',
+            name='correct_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
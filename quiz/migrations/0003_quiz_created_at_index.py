@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['created_at', 'id'], name='quiz_created_at_id_idx'),
+        ),
+    ]
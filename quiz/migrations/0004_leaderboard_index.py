@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_quiz_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizparticipant',
+            index=models.Index(fields=['quiz', '-score', 'completed_at'], name='qp_leaderboard_idx'),
+        ),
+    ]
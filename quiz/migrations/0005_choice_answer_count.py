@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_choice_counts(apps, schema_editor):
+    Choice = apps.get_model('quiz', 'Choice')
+    ChoiceAnswerCount = apps.get_model('quiz', 'ChoiceAnswerCount')
+    ParticipantAnswer = apps.get_model('quiz', 'ParticipantAnswer')
+
+    counts = dict(
+        ParticipantAnswer.objects.order_by().values('selected_choice')
+        .annotate(n=Count('pk')).values_list('selected_choice', 'n')
+    )
+    ChoiceAnswerCount.objects.bulk_create(
+        (
+            ChoiceAnswerCount(quiz_id=quiz_id, question_id=question_id, choice_id=choice_id,
+                              answer_count=counts.get(choice_id, 0))
+            for choice_id, question_id, quiz_id in
+            Choice.objects.values_list('pk', 'question_id', 'question__quiz_id').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_leaderboard_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChoiceAnswerCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+                ('choice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='answer_count', to='quiz.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='quiz.question')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='choice_answer_counts', to='quiz.quiz')),
+            ],
+        ),
+        migrations.RunPython(populate_choice_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_pending_answer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participantanswer',
+            index=models.Index(fields=['participant', 'quiz', 'selected_choice', 'question'], name='pa_enrolment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizparticipant',
+            index=models.Index(fields=['quiz', 'started_at', 'completed_at', 'score'], name='qp_quiz_stats_idx'),
+        ),
+    ]
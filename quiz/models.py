@@ -30,6 +30,9 @@ class QuizParticipant(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     score = models.FloatField(null=True, blank=True)
+    # Maintained by quiz.counters, rebuild with `manage.py rebuild_counters`
+    answered_count = models.PositiveIntegerField(default=0, editable=False)
+    correct_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,6 +46,12 @@ class QuizParticipant(models.Model):
 
     class Meta:
         unique_together = ('participant', 'quiz')
+        indexes = [
+            # Leaderboard: top scores of a quiz and rank counting
+            models.Index(fields=['quiz', '-score', 'completed_at'], name='qp_leaderboard_idx'),
+            # Admin statistics per quiz, read from the index alone
+            models.Index(fields=['quiz', 'started_at', 'completed_at', 'score'], name='qp_quiz_stats_idx'),
+        ]
 
     def __str__(self):
         return f"{self.participant.user.email} in {self.quiz.title}"
@@ -56,6 +65,8 @@ class Quiz(models.Model):
         on_delete=models.CASCADE,
         related_name="created_quizzes"
     )
+    # Maintained by quiz.counters, rebuild with `manage.py rebuild_counters`
+    question_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -68,6 +79,10 @@ class Quiz(models.Model):
 
     class Meta:
         verbose_name_plural = "Quizzes"
+        indexes = [
+            # Keyset pagination of the quiz list
+            models.Index(fields=['created_at', 'id'], name='quiz_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -109,3 +124,35 @@ class ParticipantAnswer(models.Model):
 
     class Meta:
         unique_together = ("participant", "question")
+        indexes = [
+            # An enrolment's answers (answer map, scoring), read from the index alone
+            models.Index(fields=['participant', 'quiz', 'selected_choice', 'question'], name='pa_enrolment_idx'),
+        ]
+
+
+# Answers per choice, for creator analytics. Maintained by quiz.counters,
+# rebuild with `manage.py rebuild_counters`
+class ChoiceAnswerCount(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='choice_answer_counts')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    choice = models.OneToOneField(Choice, on_delete=models.CASCADE, related_name='answer_count')
+    answer_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.choice}: {self.answer_count}"
+
+
+# Answers accepted in staged ingestion mode (QUIZ_ANSWER_INGESTION), waiting
+# for `manage.py flush_answers` to move them into ParticipantAnswer
+class PendingAnswer(models.Model):
+    participant = models.ForeignKey(Participant, on_delete=models.CASCADE)
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    selected_choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("participant", "question")
+
+    def __str__(self):
+        return f"Pending answer of participant {self.participant_id} to question {self.question_id}"
@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination, newest first. Pages are read with an index range scan
+    on (created_at, id) whatever their position, unlike offset pagination.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
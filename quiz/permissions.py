@@ -1,21 +1,33 @@
 from rest_framework import permissions
-from quiz.models import QuizParticipant
+from accounts.models import CustomUser
+from quiz.enrolment import get_enrolment
+from quiz.models import Quiz, QuizParticipant
 
 
 class IsActivatedParticipant(permissions.BasePermission):
     message = "You are not allowed to answer this quiz."
 
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated)
+
+    def has_object_permission(self, request, view, obj):
+        # obj is the caller's enrolment itself, a Quiz, or one of its children
+        if isinstance(obj, QuizParticipant):
+            qp = obj
+        else:
+            quiz_id = obj.pk if isinstance(obj, Quiz) else obj.quiz_id
+            qp = get_enrolment(request, quiz_id)
+
+        return qp is not None and qp.accepted_at is not None
+
+
+class IsQuizCreator(permissions.BasePermission):
+    message = "Only the creator of this quiz can manage it."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.user_type == CustomUser.CREATOR)
+
     def has_object_permission(self, request, view, obj):
-        participant = getattr(request.user, 'participant_profile', None)
-        if not participant:
-            return False
-
-        try:
-            qp = QuizParticipant.objects.get(
-                quiz=obj.quiz,
-                participant=request.user.participant_profile
-            )
-        except QuizParticipant.DoesNotExist:
-            return False
-
-        return qp.accepted_at is not None
+        # obj is a Quiz
+        return obj.creator_id == request.user.pk
@@ -0,0 +1,190 @@
+"""
+Synthetic data generation for load testing and profiling.
+
+Everything is inserted in chunks inside one transaction, and the
+denormalized counters are computed in memory while generating, so no signal
+or per-row query runs. The same seed always yields the same data.
+
+The two big tables (QuizParticipant and ParticipantAnswer) are written with
+`quiz.bulk.insert_rows`: at millions of rows, building model instances and
+compiling bulk_create statements costs far more than the inserts themselves.
+"""
+import random
+import time
+from collections import Counter
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import CustomUser
+from .bulk import chunked, insert_rows
+from .cache import invalidate_quiz_content
+from .models import (
+    Participant, Quiz, Question, Choice, QuizParticipant, ParticipantAnswer, ChoiceAnswerCount
+)
+
+
+class SyntheticDataGenerator:
+    """
+    Generates `creators` creators owning `quizzes` quizzes of `questions`
+    questions with `choices` choices each (the first one correct), and
+    `participants` participants. Each quiz enrols `enrolment_ratio` of the
+    participants, who answered `answered_fraction` of its questions.
+
+    Usernames are `<prefix>-creator-<n>` and `<prefix>-participant-<n>`;
+    participants are active, accepted and use `password` if given.
+    """
+
+    def __init__(self, creators=1, quizzes=1, questions=10, choices=4, participants=100,
+                 enrolment_ratio=1.0, answered_fraction=0.5, seed=0, chunk_size=5000,
+                 prefix='synthetic', password=None, log=None):
+        if not 0 <= enrolment_ratio <= 1 or not 0 <= answered_fraction <= 1:
+            raise ValueError('enrolment_ratio and answered_fraction must be between 0 and 1.')
+        if creators < 1 or choices < 1:
+            raise ValueError('At least one creator and one choice per question are needed.')
+        self.creators = creators
+        self.quizzes = quizzes
+        self.questions = questions
+        self.choices = choices
+        self.participants = participants
+        self.enrolment_ratio = enrolment_ratio
+        self.answered_fraction = answered_fraction
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.password = password
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+        self.log = log or (lambda message: None)
+        self.stats = dict.fromkeys(
+            ['users', 'quizzes', 'questions', 'choices', 'enrolments', 'answers'], 0
+        )
+
+    def bulk_create(self, model, objs):
+        created = []
+        for chunk in chunked(objs, self.chunk_size):
+            created += model.objects.bulk_create(chunk)
+        return created
+
+    def insert_rows(self, model, fields, rows):
+        return insert_rows(model, fields, rows, self.chunk_size)
+
+    def create_users(self, kind, count, user_type, password):
+        users = self.bulk_create(CustomUser, (
+            CustomUser(
+                username=f'{self.prefix}-{kind}-{i}',
+                email=f'{self.prefix}-{kind}-{i}@example.com',
+                password=password,
+                user_type=user_type,
+                date_joined=self.now,
+            )
+            for i in range(count)
+        ))
+        self.stats['users'] += len(users)
+        return users
+
+    def run(self):
+        start = time.perf_counter()
+        with transaction.atomic():
+            self.generate()
+        self.stats['seconds'] = round(time.perf_counter() - start, 2)
+        return self.stats
+
+    def generate(self):
+        # One hash shared by every synthetic account
+        password = make_password(self.password)
+        creators = self.create_users('creator', self.creators, CustomUser.CREATOR, password)
+        users = self.create_users('participant', self.participants, CustomUser.PARTICIPANT, password)
+        participant_ids = [
+            participant.pk for participant in
+            self.bulk_create(Participant, (Participant(user=user) for user in users))
+        ]
+        self.log(f'{len(creators)} creators and {len(participant_ids)} participants created.')
+
+        now = self.db_now = connection.ops.adapt_datetimefield_value(self.now)
+        enrolled_per_quiz = round(self.enrolment_ratio * len(participant_ids))
+        answered_per_enrolment = round(self.answered_fraction * self.questions)
+        for n in range(self.quizzes):
+            quiz = Quiz.objects.create(
+                title=f'{self.prefix} quiz {n}',
+                description='Synthetic quiz.',
+                creator=creators[n % len(creators)],
+                question_count=self.questions,
+            )
+            question_ids = [
+                question.pk for question in self.bulk_create(Question, (
+                    Question(quiz=quiz, text=f'Question {i}') for i in range(self.questions)
+                ))
+            ]
+            # Choices of a question in creation order; the first one is correct
+            choice_ids = {question_id: [] for question_id in question_ids}
+            for choice in self.bulk_create(Choice, (
+                Choice(question_id=question_id, text=f'Choice {j}', is_correct=(j == 0))
+                for question_id in question_ids
+                for j in range(self.choices)
+            )):
+                choice_ids[choice.question_id].append(choice.pk)
+            invalidate_quiz_content(quiz.pk)
+
+            enrolled = self.rng.sample(participant_ids, enrolled_per_quiz)
+            answer_sheets = {
+                participant_id: [
+                    (question_id, self.rng.choice(choice_ids[question_id]))
+                    for question_id in self.rng.sample(question_ids, answered_per_enrolment)
+                ]
+                for participant_id in enrolled
+            }
+            self.stats['enrolments'] += self.insert_rows(
+                QuizParticipant, self.ENROLMENT_FIELDS,
+                (
+                    self.enrolment(quiz, participant_id, sheet, choice_ids)
+                    for participant_id, sheet in answer_sheets.items()
+                )
+            )
+            self.stats['answers'] += self.insert_rows(
+                ParticipantAnswer,
+                ('participant', 'quiz', 'question', 'selected_choice',
+                 'answered_at', 'created_at', 'updated_at'),
+                (
+                    (participant_id, quiz.pk, question_id, choice_id, now, now, now)
+                    for participant_id, sheet in answer_sheets.items()
+                    for question_id, choice_id in sheet
+                )
+            )
+            answer_counts = Counter(
+                choice_id for sheet in answer_sheets.values() for _, choice_id in sheet
+            )
+            self.bulk_create(ChoiceAnswerCount, (
+                ChoiceAnswerCount(quiz=quiz, question_id=question_id, choice_id=choice_id,
+                                  answer_count=answer_counts[choice_id])
+                for question_id, ids in choice_ids.items()
+                for choice_id in ids
+            ))
+            self.stats['quizzes'] += 1
+            self.stats['questions'] += len(question_ids)
+            self.stats['choices'] += len(question_ids) * self.choices
+            self.log(f'Quiz {n + 1}/{self.quizzes} created.')
+
+    ENROLMENT_FIELDS = (
+        'quiz', 'participant', 'invitation_token', 'invited_at', 'accepted_at',
+        'started_at', 'completed_at', 'score', 'answered_count', 'correct_count',
+        'created_at', 'updated_at',
+    )
+
+    def enrolment(self, quiz, participant_id, sheet, choice_ids):
+        """Row of ENROLMENT_FIELDS with counters and timestamps matching `sheet`."""
+        now = self.db_now
+        correct = sum(1 for question_id, choice_id in sheet if choice_id == choice_ids[question_id][0])
+        completed = bool(sheet) and len(sheet) >= self.questions
+        return (
+            quiz.pk,
+            participant_id,
+            None,
+            now,
+            now,
+            now if sheet else None,
+            now if completed else None,
+            (correct / self.questions) * 100 if completed else None,
+            len(sheet),
+            correct,
+            now,
+            now,
+        )
@@ -1,25 +1,20 @@
-from django.utils import timezone
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from .counters import apply_answers, count_choice_answers
+from .enrolment import get_enrolment
 from .models import (
     Quiz,
     Question,
     Choice,
     ParticipantAnswer,
-    Participant,
-    QuizParticipant
+    PendingAnswer,
 )
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Quiz
-        fields = '__all__'
-
-
-class QuestionSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Choice
-        fields = '__all__'
+        fields = ['id', 'title', 'description', 'question_count', 'created_at', 'updated_at']
 
 
 class ChoiceSerializer(serializers.ModelSerializer):
@@ -30,23 +25,20 @@ class ChoiceSerializer(serializers.ModelSerializer):
 
 class QuestionSerializer(serializers.ModelSerializer):
     choices = ChoiceSerializer(many=True, read_only=True)
-    selected_choice_id = serializers.SerializerMethodField()
+    # The caller's answer, from `overlay_answers`
+    selected_choice_id = serializers.IntegerField(read_only=True, allow_null=True)
 
     class Meta:
         model = Question
         fields = ['id', 'text', 'choices', 'selected_choice_id']
 
-    def get_selected_choice_id(self, question):
-        user = self.context['request'].user
-        try:
-            participant = user.participant_profile
-            answer = question.participantanswer_set.get(participant=participant)
-            return answer.selected_choice_id
-        except ParticipantAnswer.DoesNotExist:
-            return None
-
 
 class QuizDetailSerializer(serializers.ModelSerializer):
+    """
+    Describes the quiz detail response for the API schema. The response
+    itself is a cached content snapshot rendered by `overlay_answers`, so
+    this serializer never reads the database.
+    """
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -54,95 +46,171 @@ class QuizDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'questions']
 
 
-class SubmitAnswerSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ParticipantAnswer
-        fields = ['selected_choice']
+class SubmitAnswerSerializer(serializers.Serializer):
+    """
+    Records one answer. Expects `request`, `quiz_id`, `question_id` and the
+    quiz `content` snapshot in its context; the caller's enrolment comes from
+    `get_enrolment`, which the view resolves (and locks) first, running
+    validation and save() in a single transaction.
+    """
+    selected_choice = serializers.IntegerField()
 
     def validate(self, data):
-        user = self.context['request'].user
-        question = self.context.get('question')
-        quiz = question.quiz
-        
-        try:
-            participant = user.participant_profile
-        except Participant.DoesNotExist:
-            raise serializers.ValidationError("Participant profile not found.")
-
-        # Check that user is assigned to this quiz
-        is_participant = QuizParticipant.objects.filter(
-            quiz=quiz, participant=participant
-        ).exists()
-
-        if not is_participant:
-            raise serializers.ValidationError("You are not allowed to answer this quiz.")
-        
-        # Check if participant has already answered this question
-        if ParticipantAnswer.objects.filter(
-            participant=participant,
-            quiz=quiz,
-            question=question
-        ).exists():
-            raise serializers.ValidationError("You have already answered this question.")
-
-        # Check if selected choice belongs to the question
-        selected_choice_id = data.get('selected_choice').id
-        if not question.choices.filter(pk=selected_choice_id).exists():
-            raise serializers.ValidationError("Selected choice is not valid for this question.")
-
-        # Store for use in create()
-        self.context.update({
-            'quiz': quiz,
-            'question': question,
-            'participant': participant,
-        })
-
-        return data
+        # Membership is checked against the cached quiz content: no query
+        choice_id = data['selected_choice']
+        content = self.context['content']
+        if choice_id in content['choice_ids'][self.context['question_id']]:
+            return data
+
+        # Error path only: tell an unknown id from a choice of another question
+        if not Choice.objects.filter(pk=choice_id).exists():
+            raise serializers.ValidationError(
+                {"selected_choice": [f'Invalid pk "{choice_id}" - object does not exist.']}
+            )
+        raise serializers.ValidationError("Selected choice is not valid for this question.")
 
     def create(self, validated_data):
-        participant = self.context['participant']
-        quiz = self.context['quiz']
-        question = self.context['question']
-
-        # 1) Mark quiz start if this is their first answer
-        qp, _ = QuizParticipant.objects.get_or_create(
-            quiz=quiz,
-            participant=participant,
-        )
-        if qp.started_at is None:
-            qp.started_at = timezone.now()
-            qp.save(update_fields=['started_at'])
-
-        # 2) Create or update the participant’s answer
-        answer = ParticipantAnswer.objects.create(
-            participant=participant,
-            quiz=quiz,
-            question=question,
-            selected_choice=validated_data['selected_choice'],
+        qp = get_enrolment(self.context['request'], self.context['quiz_id'], lock=True)
+        content = self.context['content']
+        choice_id = validated_data['selected_choice']
+
+        answer = ParticipantAnswer(
+            participant_id=qp.participant_id,
+            quiz_id=qp.quiz_id,
+            question_id=self.context['question_id'],
+            selected_choice_id=choice_id,
         )
+        # Counters are applied below together with start/completion
+        answer._counted = True
+        try:
+            # The unique (participant, question) constraint detects duplicates
+            with transaction.atomic():
+                answer.save(force_insert=True)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"non_field_errors": ["You have already answered this question."]}
+            )
 
-        # 3) Check if participant has answered all questions
-        total_questions = quiz.questions.count()
-        answered_count = ParticipantAnswer.objects.filter(
-            participant=participant,
-            quiz=quiz,
-        ).count()
-
-        if answered_count >= total_questions:
-            # 4) Compute and store final score
-            correct_count = ParticipantAnswer.objects.filter(
-                participant=participant,
-                quiz=quiz,
-                selected_choice__is_correct=True
-            ).count()
-            qp.completed_at = timezone.now()
-            qp.score = (correct_count / total_questions) * 100
-
-        qp.save(update_fields=['started_at', 'completed_at', 'score'])
-        
+        apply_answers(qp, answered=1, correct=int(choice_id in content['correct_choice_ids']))
+        count_choice_answers([choice_id])
         return answer
 
 
+class StageAnswerSerializer(SubmitAnswerSerializer):
+    """
+    Staged ingestion (see `quiz.ingestion`): validates like
+    `SubmitAnswerSerializer` and appends the answer to PendingAnswer in a
+    single insert, without locking the enrolment or touching counters.
+    """
+    ALREADY_ANSWERED = {"non_field_errors": ["You have already answered this question."]}
+
+    def create(self, validated_data):
+        qp = get_enrolment(self.context['request'], self.context['quiz_id'])
+        question_id = self.context['question_id']
+        if ParticipantAnswer.objects.filter(participant_id=qp.participant_id, question_id=question_id).exists():
+            raise serializers.ValidationError(self.ALREADY_ANSWERED)
+        try:
+            # The unique (participant, question) constraint detects staged duplicates
+            with transaction.atomic():
+                return PendingAnswer.objects.create(
+                    participant_id=qp.participant_id,
+                    quiz_id=qp.quiz_id,
+                    question_id=question_id,
+                    selected_choice_id=validated_data['selected_choice'],
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(self.ALREADY_ANSWERED)
+
+
+class AnswerItemSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    selected_choice = serializers.IntegerField()
+
+
+class SubmitAnswerBatchSerializer(serializers.Serializer):
+    """
+    Records several answers of one quiz at once, with partial-failure
+    semantics: every item is checked on its own and the valid ones are
+    stored even when others are rejected. Same context as
+    `SubmitAnswerSerializer`, minus `question_id`.
+
+    save() returns one result per item, in request order.
+    """
+    MAX_ANSWERS = 1000
+
+    answers = AnswerItemSerializer(many=True, allow_empty=False, max_length=MAX_ANSWERS)
+
+    def create(self, validated_data):
+        qp = get_enrolment(self.context['request'], self.context['quiz_id'], lock=True)
+        content = self.context['content']
+        choice_ids = content['choice_ids']
+        items = validated_data['answers']
+
+        # Set-based checks: one query for earlier answers, and one more
+        # on the error path to tell unknown choices from misplaced ones
+        already_answered = set(
+            ParticipantAnswer.objects.filter(
+                participant_id=qp.participant_id,
+                quiz_id=qp.quiz_id,
+                question_id__in={item['question'] for item in items},
+            ).values_list('question_id', flat=True)
+        )
+        misplaced = {
+            item['selected_choice'] for item in items
+            if item['selected_choice'] not in choice_ids.get(item['question'], ())
+        }
+        existing_choices = set(
+            Choice.objects.filter(pk__in=misplaced).values_list('pk', flat=True)
+        ) if misplaced else set()
+
+        results, to_create = [], []
+        for item in items:
+            question_id, choice_id = item['question'], item['selected_choice']
+            if question_id not in choice_ids:
+                error = "Question not found in this quiz."
+            elif question_id in already_answered:
+                error = "You have already answered this question."
+            elif choice_id not in choice_ids[question_id]:
+                error = (
+                    "Selected choice is not valid for this question."
+                    if choice_id in existing_choices
+                    else f'Invalid pk "{choice_id}" - object does not exist.'
+                )
+            else:
+                error = None
+                already_answered.add(question_id)
+                to_create.append(ParticipantAnswer(
+                    participant_id=qp.participant_id,
+                    quiz_id=qp.quiz_id,
+                    question_id=question_id,
+                    selected_choice_id=choice_id,
+                ))
+
+            result = {"question": question_id, "selected_choice": choice_id}
+            if error:
+                result.update(status="error", errors=[error])
+            else:
+                result.update(status="created", answer_id=None)
+            results.append(result)
+
+        if to_create:
+            # The enrolment is locked, so no concurrent submission can insert
+            # the same questions between the check above and this insert.
+            created = iter(ParticipantAnswer.objects.bulk_create(to_create))
+            for result in results:
+                if result['status'] == 'created':
+                    result['answer_id'] = next(created).id
+
+            correct = sum(
+                1 for answer in to_create
+                if answer.selected_choice_id in content['correct_choice_ids']
+            )
+            apply_answers(qp, answered=len(to_create), correct=correct)
+            count_choice_answers(answer.selected_choice_id for answer in to_create)
+
+        return results
+
+
 class QuizProgressSerializer(serializers.Serializer):
     """
     Serializer for the quiz progress endpoint.
@@ -154,3 +222,54 @@ class QuizProgressSerializer(serializers.Serializer):
     percent_complete = serializers.FloatField()
     current_score = serializers.FloatField()
     final_score = serializers.FloatField()
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    # Display name only, never the username or email
+    name = serializers.CharField()
+    is_me = serializers.BooleanField()
+    score = serializers.FloatField()
+    completed_at = serializers.DateTimeField()
+
+
+class LeaderboardRankSerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    score = serializers.FloatField()
+    completed_at = serializers.DateTimeField()
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    """
+    Serializer for the quiz leaderboard endpoint. `me` is null until the
+    caller completes the quiz.
+    """
+    completed = serializers.IntegerField()
+    top = LeaderboardEntrySerializer(many=True)
+    me = LeaderboardRankSerializer(allow_null=True)
+
+
+class ChoiceAnalyticsSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    text = serializers.CharField()
+    is_correct = serializers.BooleanField()
+    answers = serializers.IntegerField()
+    percent = serializers.FloatField()
+
+
+class QuestionAnalyticsSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    text = serializers.CharField()
+    answers = serializers.IntegerField()
+    percent_correct = serializers.FloatField()
+    choices = ChoiceAnalyticsSerializer(many=True)
+
+
+class QuizAnalyticsSerializer(serializers.Serializer):
+    """
+    Serializer for the quiz analytics endpoint: answer distribution per
+    question, for the quiz creator.
+    """
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    questions = QuestionAnalyticsSerializer(many=True)
@@ -0,0 +1,140 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from .cache import invalidate_quiz_content
+from .counters import (
+    adjust_question_count,
+    adjust_answer_counts,
+    discount_answers,
+    count_choice_answers,
+    discount_choice_answer,
+    regrade_choice,
+    move_answer,
+    touch_quiz,
+    rescore_quiz,
+)
+from .models import Quiz, Question, Choice, ParticipantAnswer, ChoiceAnswerCount
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_quiz(sender, instance, **kwargs):
+    invalidate_quiz_content(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question(sender, instance, **kwargs):
+    invalidate_quiz_content(instance.quiz_id)
+
+
+def _quiz_id(choice):
+    if Choice.question.is_cached(choice):
+        return choice.question.quiz_id
+    return Question.objects.filter(pk=choice.question_id) \
+                   .values_list('quiz_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def invalidate_choice(sender, instance, **kwargs):
+    quiz_id = _quiz_id(instance)
+    # None when the question is being deleted too: its own signal handles it
+    if quiz_id is not None:
+        invalidate_quiz_content(quiz_id)
+
+
+
+def _deleted_via(origin, *models):
+    """True if the deletion that triggered a signal started from `models`."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
+
+
+@receiver(post_save, sender=Question)
+def count_question_added(sender, instance, created, **kwargs):
+    if created:
+        adjust_question_count(instance.quiz_id, 1)
+
+
+@receiver(pre_delete, sender=Question)
+def count_question_removed(sender, instance, origin=None, **kwargs):
+    # Counters of a quiz being deleted (by itself or with its creator) go away with it
+    if not _deleted_via(origin, Question):
+        return
+    adjust_question_count(instance.quiz_id, -1)
+    discount_answers(ParticipantAnswer.objects.filter(question=instance))
+    # Scores count one question less; some enrolments are now complete
+    rescore_quiz(instance.quiz_id)
+
+
+@receiver(post_save, sender=Choice)
+def count_choice_added(sender, instance, created, **kwargs):
+    if created:
+        ChoiceAnswerCount.objects.create(
+            quiz_id=_quiz_id(instance), question_id=instance.question_id, choice=instance
+        )
+
+
+def _saved_value(sender, instance, field, update_fields):
+    """The stored value of `field` before an update of `instance`, None on insert."""
+    if instance._state.adding or (update_fields is not None and field not in update_fields):
+        return None
+    return sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(pre_save, sender=Choice)
+def remember_correctness(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._was_correct = _saved_value(sender, instance, 'is_correct', update_fields)
+
+
+@receiver(post_save, sender=Choice)
+def count_choice_regraded(sender, instance, created, **kwargs):
+    was_correct = instance.__dict__.pop('_was_correct', None)
+    if was_correct is not None and was_correct != instance.is_correct:
+        regrade_choice(instance.pk, _quiz_id(instance), 1 if instance.is_correct else -1)
+
+
+@receiver(pre_delete, sender=Choice)
+def count_choice_removed(sender, instance, origin=None, **kwargs):
+    # Cascades from the question, quiz or creator are discounted above
+    if not _deleted_via(origin, Choice):
+        return
+    discount_answers(ParticipantAnswer.objects.filter(selected_choice=instance))
+    # The latest updated_at of what remains may be older than the client's copy
+    touch_quiz(_quiz_id(instance))
+
+
+@receiver(post_save, sender=ParticipantAnswer)
+def count_answer_added(sender, instance, created, **kwargs):
+    # The submission path sets `_counted` and accounts for the answer itself
+    if created and not getattr(instance, '_counted', False):
+        adjust_answer_counts(
+            instance.participant_id,
+            instance.quiz_id,
+            answered=1,
+            correct=int(instance.selected_choice.is_correct),
+        )
+        count_choice_answers([instance.selected_choice_id])
+
+
+@receiver(pre_save, sender=ParticipantAnswer)
+def remember_selected_choice(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._old_choice_id = _saved_value(sender, instance, 'selected_choice', update_fields)
+
+
+@receiver(post_save, sender=ParticipantAnswer)
+def count_answer_changed(sender, instance, created, **kwargs):
+    old_choice_id = instance.__dict__.pop('_old_choice_id', None)
+    if old_choice_id is not None and old_choice_id != instance.selected_choice_id:
+        move_answer(instance, old_choice_id)
+
+
+@receiver(pre_delete, sender=ParticipantAnswer)
+def count_answer_removed(sender, instance, origin=None, **kwargs):
+    # Cascades from a question or choice are discounted in one UPDATE above
+    if _deleted_via(origin, ParticipantAnswer):
+        discount_answers(ParticipantAnswer.objects.filter(pk=instance.pk))
+    # Per-choice counts of a deleted quiz, question or choice go away with it;
+    # answers deleted with their participant are discounted one by one
+    if not _deleted_via(origin, Quiz, Question, Choice):
+        discount_choice_answer(instance.selected_choice_id)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from accounts.models import CustomUser
@@ -8,6 +9,9 @@ class BaseQuizTestCase(APITestCase):
     Common setup for all quiz/participant tests.
     """
     def setUp(self):
+        # quiz content snapshots must not leak between tests
+        cache.clear()
+
         # create a participant user (inactive by default)
         self.user = CustomUser.objects.create_user(
             username='participant1',
@@ -0,0 +1,63 @@
+"""
+Query-plan checks for tests: capture the statements a block issues and ask
+the database how it runs them.
+
+Only SQLite is supported (`EXPLAIN QUERY PLAN`); on other backends the
+checks are skipped.
+"""
+import re
+from contextlib import contextmanager
+from django.db import connection
+
+# "SCAN t" reads the whole table; "SCAN t USING [COVERING] INDEX i" reads a
+# whole index, which is no better on a large table
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$')
+_EXPLAINED = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def explain(sql, params=()):
+    """The plan of a statement, one detail line per step."""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(sql, params=(), allowed=()):
+    """Tables the statement reads in full, except `allowed` ones."""
+    # Scans of subqueries and CTEs read rows already narrowed down
+    tables = set(connection.introspection.table_names()) - set(allowed)
+    scans = []
+    for detail in explain(sql, params):
+        match = _FULL_SCAN.match(detail)
+        if match and match.group(1) in tables:
+            scans.append(detail)
+    return scans
+
+
+@contextmanager
+def captured_statements():
+    """Collect the (sql, params) of the data statements the block issues."""
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(_EXPLAINED):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield statements
+
+
+class QueryPlanMixin:
+    """TestCase mixin: `assertNoFullScans()` around the block under test."""
+
+    @contextmanager
+    def assertNoFullScans(self, allowed=()):
+        if connection.vendor != 'sqlite':
+            self.skipTest('query plans are only checked on SQLite')
+        with captured_statements() as statements:
+            yield statements
+        self.assertTrue(statements, 'no statement was issued')
+        for sql, params in statements:
+            scans = full_scans(sql, params, allowed)
+            self.assertFalse(scans, f'{sql}\nscans: {scans}')
@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import CustomUser
+from quiz.bench import build_quiz, create_participants, enrol
+from quiz.models import Quiz, QuizParticipant
+
+
+class QuizAdminTests(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass'
+        )
+        self.client.force_login(self.admin)
+        self.users = create_participants(6, prefix='admin-p')
+
+    def add_quiz(self, participants):
+        quiz = build_quiz(self.admin, questions=4, title=f'Quiz {Quiz.objects.count()}')
+        enrol(quiz, self.users[:participants])
+        return quiz
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    # Test if the changelist statistics cost no query per quiz
+    def test_changelist_queries_do_not_grow_with_quizzes(self):
+        url = reverse('admin:quiz_quiz_changelist')
+        self.add_quiz(participants=1)
+        few, _ = self.count_queries(url)
+        for participants in range(2, 7):
+            self.add_quiz(participants=participants)
+        many, _ = self.count_queries(url)
+        self.assertEqual(few, many)
+
+    # Test if the annotated statistics are right and sortable
+    def test_changelist_statistics(self):
+        quiz = self.add_quiz(participants=3)
+        self.add_quiz(participants=1)
+        now = timezone.now()
+        enrolments = list(QuizParticipant.objects.filter(quiz=quiz).order_by('id'))
+        QuizParticipant.objects.filter(pk=enrolments[0].pk).update(started_at=now, completed_at=now, score=50)
+        QuizParticipant.objects.filter(pk=enrolments[1].pk).update(started_at=now, completed_at=now, score=100)
+        QuizParticipant.objects.filter(pk=enrolments[2].pk).update(started_at=now)
+
+        _, response = self.count_queries(reverse('admin:quiz_quiz_changelist') + '?o=-3')
+        rows = list(response.context['cl'].result_list)
+        self.assertEqual(rows[0], quiz)
+        self.assertEqual(
+            (rows[0].participant_total, rows[0].started_total, rows[0].completed_total, rows[0].average_score_value),
+            (3, 3, 2, 75.0)
+        )
+        self.assertEqual(rows[1].participant_total, 1)
+        self.assertIsNone(rows[1].average_score_value)
+
+    # Test if the participant inline costs at most the autocomplete label lookup per row
+    def test_change_page_queries_per_participant(self):
+        url = reverse('admin:quiz_quiz_change', args=[self.add_quiz(participants=1).pk])
+        self.client.get(url)  # content types are cached from the first page on
+        few, _ = self.count_queries(url)
+        quiz = self.add_quiz(participants=6)
+        QuizParticipant.objects.filter(quiz=quiz).update(answered_count=1)
+        many, response = self.count_queries(reverse('admin:quiz_quiz_change', args=[quiz.pk]))
+        self.assertEqual(many - few, 5)
+        self.assertContains(response, '25.00 %', count=6)
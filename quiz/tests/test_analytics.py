@@ -0,0 +1,102 @@
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from accounts.models import CustomUser
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Question, Choice, ParticipantAnswer, ChoiceAnswerCount
+
+
+class AnalyticsTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.creator = CustomUser.objects.create_user(
+            username='creator1', email='creator@example.com', password='creatorpass'
+        )
+        self.quiz.creator = self.creator
+        self.quiz.save()
+        self.url = reverse('quiz-analytics', args=[self.quiz.id])
+        self.question2 = Question.objects.create(quiz=self.quiz, text='Second question')
+        self.choice2_yes = Choice.objects.create(question=self.question2, text='Yes', is_correct=True)
+        self.choice2_no = Choice.objects.create(question=self.question2, text='No', is_correct=False)
+
+    def counts(self):
+        return dict(ChoiceAnswerCount.objects.values_list('choice_id', 'answer_count'))
+
+    def answer(self, question, choice, participant=None):
+        return ParticipantAnswer.objects.create(
+            participant=participant or self.participant, quiz=self.quiz,
+            question=question, selected_choice=choice,
+        )
+
+    # Test if the creator gets the distribution of the answers
+    def test_distribution(self):
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.answer_url, {'selected_choice': self.choice_no.id}, format='json')
+        self.client.post(
+            reverse('quiz-answers', args=[self.quiz.id]),
+            {'answers': [{'question': self.question2.id, 'selected_choice': self.choice2_yes.id}]},
+            format='json'
+        )
+
+        self.client.force_authenticate(user=self.creator)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second = response.data['questions']
+        self.assertEqual((first['answers'], first['percent_correct']), (1, 0))
+        self.assertEqual(
+            [(choice['text'], choice['answers'], choice['percent']) for choice in first['choices']],
+            [('Yes', 0, 0), ('No', 1, 100.0)]
+        )
+        self.assertEqual((second['answers'], second['percent_correct']), (1, 100.0))
+
+    # Test if analytics are read with a fixed number of queries
+    def test_query_count(self):
+        self.client.force_authenticate(user=self.creator)
+        self.client.get(self.url)  # warm the content cache
+        # quiz + counts
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    # Test if participants and other creators are refused
+    def test_forbidden(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        other = CustomUser.objects.create_user(username='creator2', email='c2@example.com', password='x')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    # Test if counts follow answers created and deleted outside the API
+    def test_counts_follow_changes(self):
+        answer = self.answer(self.question, self.choice_yes)
+        self.answer(self.question2, self.choice2_yes)
+        self.assertEqual(self.counts()[self.choice_yes.id], 1)
+
+        answer.delete()
+        self.assertEqual(self.counts()[self.choice_yes.id], 0)
+
+        self.user.delete()
+        self.assertEqual(self.counts()[self.choice2_yes.id], 0)
+
+        self.choice2_no.delete()
+        self.assertNotIn(self.choice2_no.id, self.counts())
+
+    # Test if choices bulk-created without their count row are counted
+    def test_bulk_created_choice(self):
+        question = Question.objects.create(quiz=self.quiz, text='Third question')
+        choice = Choice.objects.bulk_create([Choice(question=question, text='Bulk', is_correct=True)])[0]
+        self.answer(question, choice)
+        self.assertEqual(self.counts()[choice.id], 1)
+
+    # Test if the rebuild command recomputes drifted counts
+    def test_rebuild(self):
+        self.answer(self.question, self.choice_yes)
+        ChoiceAnswerCount.objects.update(answer_count=5)
+        ChoiceAnswerCount.objects.filter(choice=self.choice2_no).delete()
+
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.counts(), {
+            self.choice_yes.id: 1, self.choice_no.id: 0, self.choice2_yes.id: 0, self.choice2_no.id: 0,
+        })
@@ -214,3 +214,21 @@ class AnswerSubmissionTests(BaseQuizTestCase):
         qp = QuizParticipant.objects.get(pk=self.qp.pk)
         self.assertIsNone(qp.completed_at)
         self.assertIsNone(qp.score)
+
+    # Test if a submission costs a fixed number of queries
+    def test_submit_query_count(self):
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('quiz-detail', args=[self.quiz.id]))  # warm the content cache
+
+        # enrolment, insert, counters and choice count updates + two savepoint pairs
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                self.answer_url,
+                {'selected_choice': self.choice_yes.id},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        qp = QuizParticipant.objects.get(pk=self.qp.pk)
+        self.assertEqual((qp.answered_count, qp.correct_count), (1, 1))
+        self.assertEqual(qp.score, 100)
@@ -0,0 +1,114 @@
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from rest_framework import status
+from accounts.tokens import for_user
+from quiz.bench import async_views
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import QuizParticipant, ParticipantAnswer, PendingAnswer
+
+
+class AsyncViewTests(BaseQuizTestCase):
+    """The async views answer exactly like the DRF views they replace."""
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.user.refresh_from_db()
+        self.auth = {'authorization': f'Bearer {for_user(self.user).access_token}'}
+        self.detail_url = reverse('quiz-detail', args=[self.quiz.id])
+        self.progress_url = reverse('quiz-progress', args=[self.quiz.id])
+
+    def sync_get(self, url, **headers):
+        return self.client.get(url, headers={**self.auth, **headers})
+
+    async def async_get(self, url, **headers):
+        with async_views():
+            return await self.async_client.get(url, headers={**self.auth, **headers})
+
+    async def async_post(self, url, data, headers=None):
+        with async_views():
+            return await self.async_client.post(
+                url, data, content_type='application/json', headers=self.auth if headers is None else headers
+            )
+
+    async def assert_same(self, url):
+        expected = await sync_to_async(self.sync_get)(url)
+        response = await self.async_get(url)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response.get('ETag'), expected.get('ETag'))
+        self.assertEqual(response.get('Cache-Control'), expected.get('Cache-Control'))
+        return response
+
+    # Test if the async routes replace the DRF ones when enabled
+    def test_routing(self):
+        with async_views():
+            from quiz import async_views as views
+            response = self.client.get(self.detail_url, headers=self.auth)
+            self.assertEqual(response.resolver_match.func, views.quiz_detail)
+        response = self.client.get(self.detail_url, headers=self.auth)
+        self.assertNotEqual(response.resolver_match.func, views.quiz_detail)
+
+    # Test if quiz detail, progress and /me match the DRF views
+    async def test_reads_match(self):
+        await ParticipantAnswer.objects.acreate(
+            participant=self.participant, quiz=self.quiz,
+            question=self.question, selected_choice=self.choice_yes,
+        )
+        detail = await self.assert_same(self.detail_url)
+        self.assertEqual(detail.json()['questions'][0]['selected_choice_id'], self.choice_yes.id)
+        progress = await self.assert_same(self.progress_url)
+        self.assertEqual(progress.json()['answered'], 1)
+        await self.assert_same(reverse('me'))
+
+    # Test if a current ETag is answered with 304
+    async def test_not_modified(self):
+        etag = (await self.async_get(self.progress_url))['ETag']
+        response = await self.async_get(self.progress_url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    # Test if errors match: no token, unknown quiz, not activated
+    async def test_errors_match(self):
+        response = await self.async_post(self.answer_url, {'selected_choice': self.choice_yes.id}, headers={})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+        await self.assert_same(reverse('quiz-progress', args=[self.quiz.id + 999]))
+        await QuizParticipant.objects.filter(pk=self.qp.pk).aupdate(accepted_at=None)
+        await self.assert_same(self.progress_url)
+        response = await self.async_post(self.answer_url, {'selected_choice': self.choice_yes.id})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # Test if submission records the answer and its counters once
+    async def test_submit(self):
+        response = await self.async_post(self.answer_url, {'selected_choice': self.choice_yes.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        answer = await ParticipantAnswer.objects.aget(participant=self.participant, question=self.question)
+        self.assertEqual(response.json()['answer_id'], answer.id)
+        qp = await QuizParticipant.objects.aget(pk=self.qp.pk)
+        self.assertEqual((qp.answered_count, qp.correct_count, qp.score), (1, 1, 100))
+
+        response = await self.async_post(self.answer_url, {'selected_choice': self.choice_yes.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('already answered', str(response.json()).lower())
+
+    # Test if invalid submissions are rejected like the DRF view does
+    async def test_submit_invalid(self):
+        response = await self.async_post(self.answer_url, {'selected_choice': 99999})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('does not exist', str(response.json()).lower())
+
+        response = await self.async_post(
+            reverse('submit-answer', args=[self.quiz.id, self.question.id + 999]),
+            {'selected_choice': self.choice_yes.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test if staged ingestion is honoured by the async submission too
+    async def test_submit_staged(self):
+        with self.settings(QUIZ_ANSWER_INGESTION='staged'):
+            response = await self.async_post(self.answer_url, {'selected_choice': self.choice_yes.id})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        pending = await PendingAnswer.objects.aget(participant=self.participant, question=self.question)
+        self.assertEqual(response.json()['pending_id'], pending.id)
+        self.assertFalse(await ParticipantAnswer.objects.aexists())
@@ -0,0 +1,94 @@
+from django.urls import reverse
+from rest_framework import status
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Question, Choice, QuizParticipant, ParticipantAnswer
+
+
+class BatchSubmissionTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.batch_url = reverse('quiz-answers', args=[self.quiz.id])
+        self.question2 = Question.objects.create(quiz=self.quiz, text='Second question')
+        self.choice2_yes = Choice.objects.create(question=self.question2, text='Yes', is_correct=True)
+        self.choice2_no = Choice.objects.create(question=self.question2, text='No', is_correct=False)
+
+    def submit(self, *pairs):
+        return self.client.post(
+            self.batch_url,
+            {'answers': [{'question': q, 'selected_choice': c} for q, c in pairs]},
+            format='json'
+        )
+
+    # Test if batch submission before activation is forbidden
+    def test_batch_before_activation_forbidden(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.submit((self.question.id, self.choice_yes.id))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # Test if a full batch completes the quiz and scores it once
+    def test_batch_completes_quiz(self):
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        response = self.submit(
+            (self.question.id, self.choice_yes.id),
+            (self.question2.id, self.choice2_no.id),
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        answer_ids = [result['answer_id'] for result in response.data['results']]
+        self.assertEqual(
+            sorted(answer_ids),
+            sorted(ParticipantAnswer.objects.values_list('id', flat=True))
+        )
+
+        qp = QuizParticipant.objects.get(pk=self.qp.pk)
+        self.assertIsNotNone(qp.started_at)
+        self.assertIsNotNone(qp.completed_at)
+        self.assertEqual(qp.score, 50)
+        self.assertEqual((qp.answered_count, qp.correct_count), (2, 1))
+
+    # Test if invalid items are reported while valid ones are stored
+    def test_batch_partial_failure(self):
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+
+        response = self.submit(
+            (self.question.id, self.choice_no.id),        # already answered
+            (self.question2.id, self.choice_yes.id),      # choice of another question
+            (self.question2.id, 99999),                   # unknown choice
+            (self.question.id + 999, self.choice_yes.id), # question of another quiz
+            (self.question2.id, self.choice2_yes.id),     # valid
+            (self.question2.id, self.choice2_no.id),      # duplicate within the batch
+        )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 5))
+        errors = [' '.join(result.get('errors', [])).lower() for result in response.data['results']]
+        self.assertIn('already answered', errors[0])
+        self.assertIn('not valid for this question', errors[1])
+        self.assertIn('does not exist', errors[2])
+        self.assertIn('not found', errors[3])
+        self.assertEqual(errors[4], '')
+        self.assertIn('already answered', errors[5])
+
+        qp = QuizParticipant.objects.get(pk=self.qp.pk)
+        self.assertEqual((qp.answered_count, qp.correct_count), (2, 2))
+        self.assertEqual(qp.score, 100)
+
+    # Test if a batch where every item fails is rejected
+    def test_batch_all_failed(self):
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        response = self.submit((self.question.id, 99999))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ParticipantAnswer.objects.exists())
+
+    # Test if a malformed or empty batch is rejected
+    def test_batch_malformed(self):
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.batch_url, {'answers': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.batch_url, {'answers': [{'question': 'x'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,21 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from quiz.tests.base import BaseQuizTestCase
+
+
+# The benchmark client targets localhost, allowed in development only
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchTests(BaseQuizTestCase):
+
+    def bench_submission(self, questions):
+        out = StringIO()
+        call_command('bench_submission', '--participants', '2', '--questions', str(questions), stdout=out)
+        return json.loads(out.getvalue())
+
+    # Test if a second run, reusing the rolled back ids, is not served the first run's quiz content
+    def test_runs_do_not_share_content(self):
+        self.assertEqual(self.bench_submission(3)['errors'], 0)
+        report = self.bench_submission(6)
+        self.assertEqual((report['submissions'], report['errors']), (12, 0))
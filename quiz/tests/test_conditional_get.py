@@ -0,0 +1,114 @@
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from quiz.tests.base import BaseQuizTestCase
+from quiz.cache import invalidate_quiz_content
+from quiz.models import Quiz, Question, Choice, QuizParticipant
+
+
+class ConditionalGetTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.detail_url = reverse('quiz-detail', args=[self.quiz.id])
+        self.progress_url = reverse('quiz-progress', args=[self.quiz.id])
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def revalidate_date(self, url, last_modified):
+        return self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    def backdate(self):
+        """Move every update stamp an hour back, so a change within the second shows."""
+        past = timezone.now() - timedelta(hours=1)
+        for model in (Quiz, Question, Choice, QuizParticipant):
+            model.objects.update(updated_at=past)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_quiz_content(self.quiz.pk)
+
+    # Test if an unchanged detail is answered with 304 from the enrolment query alone
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.revalidate(self.detail_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    # Test if answering or editing the quiz changes the detail ETag
+    def test_detail_modified(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+        response = self.revalidate(self.detail_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['questions'][0]['selected_choice_id'], self.choice_yes.id)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.create(question=self.question, text='Maybe')
+        response = self.revalidate(self.detail_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['questions'][0]['choices']), 3)
+
+    # Test if progress is revalidated against the enrolment counters
+    def test_progress_conditional(self):
+        etag = self.client.get(self.progress_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.revalidate(self.progress_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+        response = self.revalidate(self.progress_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['answered'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+    # Test if deleting a question or a choice moves the detail Last-Modified
+    def test_detail_modified_since_deletion(self):
+        question = Question.objects.create(quiz=self.quiz, text='Second question')
+        choice = Choice.objects.create(question=question, text='Maybe')
+        Choice.objects.create(question=question, text='Never')
+        self.backdate()
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+        response = self.revalidate_date(self.detail_url, last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            choice.delete()
+        response = self.revalidate_date(self.detail_url, last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.backdate()
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+        with self.captureOnCommitCallbacks(execute=True):
+            question.delete()
+        response = self.revalidate_date(self.detail_url, last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['questions']), 1)
+
+    # Test if adding or deleting a question moves the progress Last-Modified
+    def test_progress_modified_since_question_change(self):
+        self.backdate()
+        last_modified = self.client.get(self.progress_url)['Last-Modified']
+        response = self.revalidate_date(self.progress_url, last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        question = Question.objects.create(quiz=self.quiz, text='Second question')
+        response = self.revalidate_date(self.progress_url, last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_questions'], 2)
+
+        self.backdate()
+        last_modified = self.client.get(self.progress_url)['Last-Modified']
+        question.delete()
+        response = self.revalidate_date(self.progress_url, last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_questions'], 1)
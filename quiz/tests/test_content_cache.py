@@ -0,0 +1,108 @@
+import threading
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+from accounts.models import CustomUser
+from quiz.tests.base import BaseQuizTestCase
+from quiz.cache import content_cache_stats, get_quiz_content, reset_content_cache_stats
+from quiz.models import Quiz, Question, Choice
+
+
+class ContentCacheTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.detail_url = reverse('quiz-detail', args=[self.quiz.id])
+
+    def question_texts(self):
+        return [q['text'] for q in self.client.get(self.detail_url).data['questions']]
+
+    # Test if a second read is served from the same snapshot
+    def test_snapshot_is_reused(self):
+        first = get_quiz_content(self.quiz)
+        with self.assertNumQueries(0):
+            second = get_quiz_content(self.quiz)
+        self.assertEqual(first, second)
+
+    # Test if saving a question retires the snapshot
+    def test_question_changes_invalidate(self):
+        self.assertEqual(self.question_texts(), ['Are we in the Matrix?'])
+        self.question.text = 'Is this real life?'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save()
+            Question.objects.create(quiz=self.quiz, text='Second question')
+        self.assertEqual(self.question_texts(), ['Is this real life?', 'Second question'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.delete()
+        self.assertEqual(self.question_texts(), ['Second question'])
+
+    # Test if adding or deleting a choice retires the snapshot
+    def test_choice_changes_invalidate(self):
+        version = get_quiz_content(self.quiz)['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.create(question=self.question, text='Maybe')
+        self.assertNotEqual(get_quiz_content(self.quiz)['version'], version)
+
+        version = get_quiz_content(self.quiz)['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.choice_no.delete()
+        content = get_quiz_content(self.quiz)
+        self.assertNotEqual(content['version'], version)
+        self.assertNotIn(self.choice_no.id, content['choice_ids'][self.question.id])
+
+    # Test if quiz fields are part of the snapshot
+    def test_quiz_changes_invalidate(self):
+        self.client.get(self.detail_url)
+        self.quiz.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.save()
+        self.assertEqual(self.client.get(self.detail_url).data['title'], 'Renamed')
+
+    # Test if hits and misses are counted
+    def test_stats(self):
+        reset_content_cache_stats()
+        get_quiz_content(self.quiz)
+        get_quiz_content(self.quiz)
+        get_quiz_content(self.quiz)
+        stats = content_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+
+
+class ContentCacheCommitTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        creator = CustomUser.objects.create_user(username='creator', email='creator@example.com')
+        self.quiz = Quiz.objects.create(title='Reality check quiz', creator=creator)
+        self.question = Question.objects.create(quiz=self.quiz, text='Are we in the Matrix?')
+
+    def read_in_thread(self, quiz):
+        """Question texts served to another worker, on its own connection."""
+        texts = []
+
+        def read():
+            try:
+                content = get_quiz_content(quiz)
+                texts.extend(question['text'] for question in content['questions'])
+            finally:
+                connection.close()
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        return texts
+
+    # Test if a reader during the writing transaction keeps the old snapshot
+    # and the new content is served once the transaction commits
+    def test_invalidated_on_commit(self):
+        get_quiz_content(self.quiz)
+        with transaction.atomic():
+            self.question.text = 'Is this real life?'
+            self.question.save()
+            # The old rows are all that other connections can read until the commit
+            self.assertEqual(self.read_in_thread(self.quiz), ['Are we in the Matrix?'])
+        self.assertEqual(self.read_in_thread(Quiz.objects.get(pk=self.quiz.pk)), ['Is this real life?'])
@@ -0,0 +1,50 @@
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from quiz.tests.base import BaseQuizTestCase
+from quiz.enrolment import get_enrolment
+from quiz.models import Quiz
+
+
+class EnrolmentTests(BaseQuizTestCase):
+
+    def request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    # Test if the enrolment is fetched once per request
+    def test_enrolment_is_memoized(self):
+        request = self.request(self.user)
+        with self.assertNumQueries(1):
+            qp = get_enrolment(request, self.quiz.id)
+            self.assertEqual(get_enrolment(request, str(self.quiz.id)), qp)
+            self.assertEqual(qp.participant, self.participant)
+            self.assertEqual(qp.quiz, self.quiz)
+
+    # Test if missing enrolments are memoized too
+    def test_missing_enrolment(self):
+        other = Quiz.objects.create(title='Other', creator=self.user)
+        request = self.request(self.user)
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_enrolment(request, other.id))
+            self.assertIsNone(get_enrolment(request, other.id))
+        self.assertIsNone(get_enrolment(request, 'not-a-pk'))
+
+    # Test if a locked lookup is not served from an unlocked memo
+    def test_lock_refetches(self):
+        request = self.request(self.user)
+        get_enrolment(request, self.quiz.id)
+        with self.assertNumQueries(1):
+            get_enrolment(request, self.quiz.id, lock=True)
+            get_enrolment(request, self.quiz.id)
+
+    # Test if progress requires authentication and activation
+    def test_progress_permissions(self):
+        url = reverse('quiz-progress', args=[self.quiz.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,73 @@
+import csv
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from accounts.models import CustomUser
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Quiz
+
+
+class ExportTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.creator = CustomUser.objects.create_user(
+            username='creator1', email='creator@example.com', password='creatorpass'
+        )
+        # update(): save() would write back the stale question_count
+        Quiz.objects.filter(pk=self.quiz.pk).update(creator=self.creator)
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+        self.client.force_authenticate(user=self.creator)
+
+    def url(self, export, fmt):
+        return reverse('quiz-export', args=[self.quiz.id, export, fmt])
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    # Test if results are streamed as CSV, one row per participant
+    def test_results_csv(self):
+        response = self.client.get(self.url('results', 'csv'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('quiz-%d-results.csv' % self.quiz.id, response['Content-Disposition'])
+        rows = list(csv.DictReader(self.content(response).splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            (rows[0]['email'], rows[0]['answered'], rows[0]['correct'], rows[0]['score']),
+            ('participant@example.com', '1', '1', '100.0')
+        )
+        self.assertTrue(rows[0]['completed_at'].startswith(str(self.qp.invited_at.year)))
+
+    # Test if raw answers are streamed as JSONL, one object per answer
+    def test_answers_jsonl(self):
+        response = self.client.get(self.url('answers', 'jsonl'))
+        self.assertEqual(response['Content-Type'], 'application/jsonl')
+        [answer] = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(answer['email'], 'participant@example.com')
+        self.assertEqual((answer['question_id'], answer['selected_choice']), (self.question.id, 'Yes'))
+        self.assertIs(answer['is_correct'], True)
+
+    # Test if the export is read with one query, whatever its size
+    def test_query_count(self):
+        with self.assertNumQueries(2):  # quiz + rows
+            self.content(self.client.get(self.url('answers', 'csv')))
+
+    # Test if only the quiz creator can export
+    def test_creator_only(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url('results', 'csv')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.creator)
+        response = self.client.get(reverse('quiz-export', args=[self.quiz.id + 999, 'results', 'csv']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test if the command writes the same export
+    def test_command(self):
+        out = StringIO()
+        call_command('export_quiz', self.quiz.id, 'answers', stdout=out)
+        rows = list(csv.DictReader(out.getvalue().splitlines()))
+        self.assertEqual([(row['email'], row['is_correct']) for row in rows], [('participant@example.com', 'True')])
@@ -0,0 +1,87 @@
+import time
+from unittest import mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from accounts import hashing
+from quiz.bench import async_views
+from quiz.tests.base import BaseQuizTestCase
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class Busy:
+    def submit(self, fn, *args):
+        raise hashing.HashingBusy()
+
+
+class HashingTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.credentials = {'username': 'participant1', 'password': 'newpass'}
+
+    def login(self):
+        return self.client.post(reverse('login'), self.credentials, format='json')
+
+    # Test if login and activation hash on the worker processes when configured
+    @override_settings(AUTH_HASHING_WORKERS=1, PASSWORD_HASHERS=FAST_HASHERS)
+    def test_process_pool(self):
+        self.assertEqual(self.activate(password='newpass').status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('md5$'))
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.credentials['password'] = 'wrong'
+        self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNotNone(hashing.get_executor())
+
+    # Test if a full queue refuses new jobs until one completes
+    def test_bounded_queue(self):
+        executor = hashing.HashingExecutor(workers=1, queue_size=0)
+        try:
+            running = executor.submit(time.sleep, 0.5)
+            with self.assertRaises(hashing.HashingBusy):
+                executor.submit(time.sleep, 0)
+            running.result()
+            time.sleep(0.1)  # the slot is released by a callback
+            executor.submit(time.sleep, 0).result()
+        finally:
+            executor.shutdown()
+
+    # Test if a saturated executor answers 503 with Retry-After
+    def test_busy(self):
+        self.activate(password='newpass')
+        with mock.patch('accounts.hashing.get_executor', return_value=Busy()):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    # Test if the async login and activation answer like the DRF views
+    async def test_async_views(self):
+        with async_views():
+            response = await self.async_client.patch(
+                reverse('participant-activate'), {'token': str(self.qp.invitation_token), 'password': 'newpass'},
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['user']['email'], 'participant@example.com')
+
+            login = reverse('login')
+            response = await self.async_client.post(login, self.credentials, content_type='application/json')
+            self.assertEqual(set(response.json()), {'access', 'refresh', 'user'})
+            response = await self.async_client.post(login, {'username': 'participant1', 'password': 'x'},
+                                                    content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response.json(), {'detail': 'Invalid username or password.'})
+
+            with mock.patch('accounts.hashing.get_executor', return_value=Busy()):
+                response = await self.async_client.post(login, self.credentials, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], '1')
+
+    # Test if unknown users are rejected after hashing once
+    def test_unknown_user(self):
+        self.credentials['username'] = 'nobody'
+        with mock.patch('accounts.hashing.hashers.make_password', wraps=hashing.hashers.make_password) as hashed:
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+        hashed.assert_called_once()
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from quiz.ingestion import flush_due, flush_pending
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Question, Choice, QuizParticipant, ParticipantAnswer, PendingAnswer, ChoiceAnswerCount
+
+
+@override_settings(QUIZ_ANSWER_INGESTION='staged', QUIZ_INGESTION_BATCH_SIZE=2, QUIZ_INGESTION_MAX_LATENCY=60)
+class StagedIngestionTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.question2 = Question.objects.create(quiz=self.quiz, text='Second question')
+        self.choice2_yes = Choice.objects.create(question=self.question2, text='Yes', is_correct=True)
+        self.choice2_no = Choice.objects.create(question=self.question2, text='No', is_correct=False)
+        self.answer2_url = reverse('submit-answer', args=[self.quiz.id, self.question2.id])
+
+    def submit(self, url, choice):
+        return self.client.post(url, {'selected_choice': choice.id}, format='json')
+
+    def qp_state(self):
+        qp = QuizParticipant.objects.get(pk=self.qp.pk)
+        return qp.answered_count, qp.correct_count, qp.score
+
+    # Test if a staged submission is accepted without recording the answer yet
+    def test_submit_is_staged(self):
+        self.client.get(reverse('quiz-detail', args=[self.quiz.id]))  # warm the content cache
+
+        # enrolment, duplicate check and insert + one savepoint pair
+        with self.assertNumQueries(5):
+            response = self.submit(self.answer_url, self.choice_yes)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['pending_id'], PendingAnswer.objects.get().id)
+        self.assertFalse(ParticipantAnswer.objects.exists())
+        self.assertEqual(self.qp_state(), (0, 0, None))
+
+    # Test if duplicates are rejected whether staged or already recorded
+    def test_duplicates_rejected(self):
+        self.submit(self.answer_url, self.choice_yes)
+        response = self.submit(self.answer_url, self.choice_no)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('already answered', str(response.data).lower())
+
+        flush_pending()
+        response = self.submit(self.answer_url, self.choice_no)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(PendingAnswer.objects.count(), 0)
+
+    # Test if invalid choices are rejected before staging
+    def test_invalid_choice_rejected(self):
+        response = self.submit(self.answer_url, self.choice2_yes)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PendingAnswer.objects.exists())
+
+    # Test if a flush records the answers, counters, completion and score at once
+    def test_flush(self):
+        self.submit(self.answer_url, self.choice_yes)
+        self.submit(self.answer2_url, self.choice2_no)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_pending(), 2)
+        self.assertEqual(
+            set(ParticipantAnswer.objects.values_list('question_id', 'selected_choice_id')),
+            {(self.question.id, self.choice_yes.id), (self.question2.id, self.choice2_no.id)},
+        )
+        self.assertEqual(self.qp_state(), (2, 1, 50.0))
+        self.assertIsNotNone(QuizParticipant.objects.get(pk=self.qp.pk).completed_at)
+        self.assertEqual(ChoiceAnswerCount.objects.get(choice=self.choice2_no).answer_count, 1)
+        self.assertFalse(PendingAnswer.objects.exists())
+        self.assertEqual(flush_pending(), 0)
+
+    # Test if answers recorded directly in the meantime are not recorded twice
+    def test_flush_drops_recorded(self):
+        self.submit(self.answer_url, self.choice_yes)
+        ParticipantAnswer.objects.create(
+            participant=self.participant, quiz=self.quiz, question=self.question, selected_choice=self.choice_no
+        )
+        self.assertEqual(flush_pending(), 1)
+        self.assertEqual(ParticipantAnswer.objects.get().selected_choice, self.choice_no)
+        self.assertEqual(self.qp_state()[:2], (1, 0))
+
+    # Test if a flush is due on a full batch or on the oldest answer's age
+    def test_flush_due(self):
+        self.assertFalse(flush_due())
+        self.submit(self.answer_url, self.choice_yes)
+        self.assertFalse(flush_due())
+        self.assertTrue(flush_due(max_latency=0))
+        self.submit(self.answer2_url, self.choice2_yes)
+        self.assertTrue(flush_due())
+
+        PendingAnswer.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertTrue(flush_due(batch_size=10))
+
+    # Test if the command flushes everything staged
+    def test_flush_command(self):
+        self.submit(self.answer_url, self.choice_yes)
+        self.submit(self.answer2_url, self.choice2_yes)
+        out = StringIO()
+        call_command('flush_answers', '--once', '--batch-size', '1', stdout=out)
+        self.assertIn('Flushed 2', out.getvalue())
+        self.assertEqual(ParticipantAnswer.objects.count(), 2)
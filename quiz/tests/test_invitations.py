@@ -0,0 +1,160 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from accounts.models import CustomUser
+from quiz.invitations import invite_participants, read_emails, JSONL
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Participant, QuizParticipant
+
+
+class InvitationTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.creator = CustomUser.objects.create_user(
+            username='creator1', email='creator@example.com', password='creatorpass'
+        )
+        self.quiz.creator = self.creator
+        self.quiz.save()
+        self.url = reverse('quiz-invitations', args=[self.quiz.id])
+
+    def results(self, response):
+        return list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+
+    # Test if CSV and JSONL inputs are read, with or without a header
+    def test_read_emails(self):
+        self.assertEqual(list(read_emails(['name,email', 'Ann,ann@example.com', '', 'Bob,bob@example.com'])),
+                         ['ann@example.com', 'bob@example.com'])
+        self.assertEqual(list(read_emails(['ann@example.com', 'bob@example.com'])),
+                         ['ann@example.com', 'bob@example.com'])
+        self.assertEqual(list(read_emails(['{"email": "ann@example.com"}', '"bob@example.com"', '{oops'], JSONL)),
+                         ['ann@example.com', 'bob@example.com', '{oops'])
+
+    # Test if new, existing, repeated and invalid emails get one result each, in order
+    def test_statuses(self):
+        self.activate(password='newpass')  # participant@example.com accepted
+        existing = CustomUser.objects.create_user(
+            username='known', email='known@example.com', user_type=CustomUser.PARTICIPANT, is_active=False
+        )
+        emails = [
+            'new@example.com', 'known@example.com', 'participant@example.com',
+            'creator@example.com', 'NEW@EXAMPLE.com', 'not-an-email', 'new@example.com',
+        ]
+        results = list(invite_participants(self.quiz, emails, chunk_size=3))
+        self.assertEqual(
+            [(result['email'], result['status']) for result in results],
+            [
+                ('new@example.com', 'invited'), ('known@example.com', 'invited'),
+                ('participant@example.com', 'accepted'), ('creator@example.com', 'not_participant'),
+                ('NEW@example.com', 'duplicate'), ('not-an-email', 'invalid'), ('new@example.com', 'duplicate'),
+            ]
+        )
+        new = CustomUser.objects.get(email='new@example.com')
+        self.assertEqual((new.username, new.user_type, new.is_active, new.has_usable_password()),
+                         ('new@example.com', CustomUser.PARTICIPANT, False, False))
+        qp = QuizParticipant.objects.get(quiz=self.quiz, participant__user=existing)
+        self.assertEqual(str(qp.invitation_token), results[1]['invitation_token'])
+        self.assertEqual(results[2]['invitation_token'], '')
+
+        again = list(invite_participants(self.quiz, ['known@example.com']))
+        self.assertEqual(again[0]['status'], 'already_invited')
+        self.assertEqual(again[0]['invitation_token'], results[1]['invitation_token'])
+
+    # Test if emails match existing users whatever their case
+    def test_case_insensitive(self):
+        existing = CustomUser.objects.create_user(
+            username='mixed', email='Mixed.Case@Example.com', user_type=CustomUser.PARTICIPANT, is_active=False
+        )
+        results = list(invite_participants(self.quiz, ['mixed.case@example.com', 'Fresh@example.com']))
+        self.assertEqual([result['status'] for result in results], ['invited', 'invited'])
+        self.assertTrue(QuizParticipant.objects.filter(quiz=self.quiz, participant__user=existing).exists())
+        self.assertEqual(CustomUser.objects.get(email__iexact='fresh@example.com').username, 'fresh@example.com')
+
+        again = list(invite_participants(self.quiz, ['FRESH@EXAMPLE.COM']))
+        self.assertEqual(again[0]['status'], 'already_invited')
+
+    # Test if an unrelated account whose username is an invitee's email is never enrolled instead
+    def test_username_taken(self):
+        other = CustomUser.objects.create_user(
+            username='taken@example.com', email='someone.else@example.com', user_type=CustomUser.PARTICIPANT
+        )
+        results = list(invite_participants(self.quiz, ['Taken@example.com']))
+        self.assertEqual((results[0]['status'], results[0]['invitation_token']), ('username_taken', ''))
+        self.assertFalse(QuizParticipant.objects.filter(quiz=self.quiz, participant__user=other).exists())
+
+    # Test if active users are enrolled without a token, and can use the quiz at once
+    def test_active_users_enrolled(self):
+        active = CustomUser.objects.create_user(
+            username='active', email='active@example.com', password='activepass', user_type=CustomUser.PARTICIPANT
+        )
+        # Invited before they were activated through another quiz
+        self.user.is_active = True
+        self.user.save()
+
+        results = list(invite_participants(self.quiz, ['active@example.com', 'participant@example.com']))
+        self.assertEqual([(result['status'], result['invitation_token']) for result in results],
+                         [('enrolled', ''), ('enrolled', '')])
+        for user in (active, self.user):
+            qp = QuizParticipant.objects.get(quiz=self.quiz, participant__user=user)
+            self.assertIsNone(qp.invitation_token)
+            self.assertIsNotNone(qp.accepted_at)
+
+        self.client.force_authenticate(user=active)
+        response = self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        again = list(invite_participants(self.quiz, ['active@example.com']))
+        self.assertEqual(again[0]['status'], 'accepted')
+
+    # Test if an emitted token activates the invited participant
+    def test_token_activates(self):
+        token = next(invite_participants(self.quiz, ['new@example.com']))['invitation_token']
+        response = self.activate(token=token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['email'], 'new@example.com')
+
+    # Test if each chunk costs a fixed number of queries, however large
+    def test_query_count(self):
+        emails = [f'user{i}@example.com' for i in range(50)]
+        # lookup, insert and read back of users, profiles and enrolments + savepoints
+        with self.assertNumQueries(9):
+            list(invite_participants(self.quiz, emails))
+        with self.assertNumQueries(7):
+            list(invite_participants(self.quiz, emails))
+        self.assertEqual(Participant.objects.filter(user__email__startswith='user').count(), 50)
+
+    # Test if the endpoint streams tokens back, for the quiz creator only
+    def test_endpoint(self):
+        body = b'email\r\nann@example.com\r\nbob@example.com\r\n'
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.creator)
+        response = self.client.post(self.url, body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual([row['status'] for row in self.results(response)], ['invited', 'invited'])
+
+        upload = SimpleUploadedFile('emails.jsonl', b'{"email": "ann@example.com"}\n{"email": "cy@example.com"}\n')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual([row['status'] for row in self.results(response)], ['already_invited', 'invited'])
+
+    # Test if the command invites a file of emails and writes the tokens
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'emails.csv')
+            target = os.path.join(directory, 'tokens.csv')
+            with open(source, 'w') as f:
+                f.write('email\nann@example.com\nbob@example.com\n')
+            err = StringIO()
+            call_command('invite_participants', self.quiz.id, source, '--output', target, stderr=err)
+            with open(target) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([row['email'] for row in rows], ['ann@example.com', 'bob@example.com'])
+        self.assertTrue(all(row['invitation_token'] for row in rows))
+        self.assertIn('2 invited', err.getvalue())
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from accounts.models import CustomUser
+from quiz.bench import create_participants, enrol
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Quiz, QuizParticipant
+
+
+@override_settings(QUIZ_LEADERBOARD_SIZE=3)
+class LeaderboardTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('quiz-leaderboard', args=[self.quiz.id])
+        self.others = create_participants(5, prefix='board')
+        for i, user in enumerate(self.others):
+            CustomUser.objects.filter(pk=user.pk).update(first_name=f'Player{i}', last_name='Smith')
+        enrol(self.quiz, self.others)
+        self.now = timezone.now()
+
+    def finish(self, user, score, minutes):
+        completed_at = self.now + timedelta(minutes=minutes)
+        QuizParticipant.objects.filter(quiz=self.quiz, participant__user=user).update(
+            score=score, completed_at=completed_at
+        )
+
+    # Test if entries rank by score, then completion time, ties sharing a rank
+    def test_top_order_and_ties(self):
+        a, b, c, d, e = self.others
+        self.finish(a, 50, minutes=1)
+        self.finish(b, 100, minutes=3)
+        self.finish(c, 100, minutes=2)
+        self.finish(d, 100, minutes=2)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['completed'], 4)
+        self.assertEqual(
+            [(entry['rank'], entry['name']) for entry in response.data['top']],
+            [(1, 'Player2 S.'), (1, 'Player3 S.'), (3, 'Player1 S.')]
+        )
+        self.assertIsNone(response.data['me'])
+
+    # Test if the caller's rank is counted when they are not in the top
+    def test_rank_of_caller_outside_top(self):
+        for i, user in enumerate(self.others):
+            self.finish(user, 100 - i, minutes=i)
+        self.finish(self.user, 90, minutes=0)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['top']), 3)
+        self.assertEqual(response.data['completed'], 6)
+        self.assertEqual(response.data['me']['rank'], 6)
+        self.assertEqual(response.data['me']['score'], 90)
+
+    # Test if a cached top costs no query, the caller's rank one outside the top
+    def test_cached_top_queries(self):
+        for user in self.others[:3]:
+            self.finish(user, 100, minutes=0)
+        self.finish(self.user, 50, minutes=1)
+        self.client.get(self.url)
+        # enrolment + rank
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['me']['rank'], 4)
+
+        # In the top: the rank is read from it
+        self.finish(self.user, 100, minutes=0)
+        cache.clear()
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    # Test if completing the quiz drops the cached top
+    def test_completion_invalidates_top(self):
+        self.assertEqual(self.client.get(self.url).data['top'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [(entry['name'], entry['is_me']) for entry in response.data['top']], [('Participant #1', True)]
+        )
+        self.assertEqual(response.data['me']['rank'], 1)
+
+    # Test if entries never show usernames or emails, and flag the caller's own
+    def test_entries_do_not_identify(self):
+        a, b = self.others[:2]
+        CustomUser.objects.filter(pk=b.pk).update(first_name='')
+        self.finish(a, 100, minutes=1)
+        self.finish(b, 90, minutes=1)
+        self.finish(self.user, 80, minutes=1)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [(entry['name'], entry['is_me']) for entry in response.data['top']],
+            [('Player0 S.', False), ('Participant #2', False), ('Participant #3', True)]
+        )
+        self.assertNotIn(b'@', response.content)
+        for user in (a, b, self.user):
+            self.assertNotIn(user.username.encode(), response.content)
+
+    # Test if participants without a first name are told apart by their place, even when tied
+    def test_unnamed_participants(self):
+        a, b = self.others[:2]
+        CustomUser.objects.filter(pk__in=[a.pk, b.pk]).update(first_name='', last_name='')
+        self.finish(a, 100, minutes=1)
+        self.finish(b, 100, minutes=1)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [(entry['rank'], entry['name']) for entry in response.data['top']],
+            [(1, 'Participant #1'), (1, 'Participant #2')]
+        )
+        self.assertNotIn(b'@', response.content)
+
+    # Test if the leaderboard of a quiz the user is not in is not found
+    def test_leaderboard_other_quiz(self):
+        other = Quiz.objects.create(title='Other', creator=self.user)
+        response = self.client.get(reverse('quiz-leaderboard', args=[other.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
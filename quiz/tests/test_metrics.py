@@ -0,0 +1,83 @@
+import re
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from accounts.models import CustomUser
+from accounts.tokens import for_user
+from monitoring import metrics
+from monitoring.views import CONTENT_TYPE
+from quiz.bench import async_views
+from quiz.tests.base import BaseQuizTestCase
+
+
+def sample(text, name):
+    """The value of the sample `name` (with its labels) in a /metrics page."""
+    match = re.search(r'^' + re.escape(name) + r' (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+class RequestMetricsTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.user.refresh_from_db()
+        self.auth = {'authorization': f'Bearer {for_user(self.user).access_token}'}
+        self.detail_url = reverse('quiz-detail', args=[self.quiz.id])
+        metrics.reset()
+
+    def scrape(self, **headers):
+        response = self.client.get(reverse('metrics'), headers=headers)
+        return response, response.content.decode()
+
+    # Test if requests are aggregated per route name into Prometheus histograms
+    def test_histograms_by_route(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.detail_url, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.get(self.detail_url, headers=self.auth)
+        self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json', headers=self.auth)
+
+        response, text = self.scrape()
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        self.assertEqual(sample(text, 'quiz_http_requests_total{route="quiz-detail",method="GET",status="200"}'), 2)
+        self.assertEqual(sample(text, 'quiz_http_requests_total{route="submit-answer",method="POST",status="201"}'), 1)
+        self.assertEqual(sample(text, 'quiz_http_request_duration_seconds_count{route="quiz-detail"}'), 2)
+        self.assertEqual(sample(text, 'quiz_http_request_db_queries_bucket{route="quiz-detail",le="+Inf"}'), 2)
+        self.assertGreaterEqual(
+            sample(text, 'quiz_http_request_db_queries_sum{route="quiz-detail"}'), len(ctx.captured_queries)
+        )
+        self.assertGreater(sample(text, 'quiz_http_response_size_bytes_sum{route="quiz-detail"}'), 0)
+        self.assertGreater(sample(text, 'quiz_http_request_render_seconds_sum{route="quiz-detail"}'), 0)
+
+    # Test if only staff get the Server-Timing header
+    def test_server_timing_for_staff(self):
+        response = self.client.get(self.detail_url, headers=self.auth)
+        self.assertNotIn('Server-Timing', response)
+
+        staff = CustomUser.objects.create_user(username='staff', email='staff@example.com', is_staff=True)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('quiz-list'), headers={
+                'authorization': f'Bearer {for_user(staff).access_token}'
+            })
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', timing)
+        self.assertRegex(timing, r'render;dur=\d+\.\d, total;dur=\d+\.\d$')
+
+    # Test if the queries of async views, run in other threads, are counted
+    async def test_async_views(self):
+        with async_views():
+            response = await self.async_client.get(self.detail_url, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        text = metrics.expose()
+        self.assertEqual(sample(text, 'quiz_http_request_duration_seconds_count{route="quiz-detail"}'), 1)
+        self.assertGreater(sample(text, 'quiz_http_request_db_queries_sum{route="quiz-detail"}'), 0)
+
+    # Test if the endpoint requires the configured scraper token
+    @override_settings(MONITORING_METRICS_TOKEN='scrape-me')
+    def test_token(self):
+        self.assertEqual(self.scrape()[0].status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.scrape(authorization='Bearer scrape-me')[0].status_code, status.HTTP_200_OK)
@@ -0,0 +1,335 @@
+"""
+Query-count and latency regression suite for every API route.
+
+Each route is exercised against a small and a large data set; its query
+count must equal the budget below for both, i.e. it must not grow with data
+size. Wall-clock timings are written as JSON to the path in the
+QUIZ_PERF_REPORT environment variable, when set, for trend comparison.
+
+Run only this suite with `python manage.py test --tag performance`.
+"""
+import json
+import os
+import platform
+import time
+from types import SimpleNamespace
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import CustomUser
+from accounts.tokens import for_user
+from quiz.bench import build_quiz, create_participants, enrol, summarize
+from quiz.counters import rebuild_counters
+from quiz.models import Quiz, QuizParticipant, ParticipantAnswer
+
+PASSWORD = 'Perf-suite-pass!1'
+REPEAT = 5
+# Password hashing dominates these: a couple of samples is enough
+SLOW_REPEAT = 2
+
+# Queries per request with a warm quiz content cache, authenticated from
+# the claims of the token. Transaction savepoints (the test case wraps each
+# test in a transaction) are included.
+BUDGETS = {
+    'quiz-list': 1,
+    'quiz-detail': 2,
+    'quiz-detail-not-modified': 1,
+    'quiz-progress': 1,
+    'quiz-leaderboard': 1,
+    'quiz-analytics': 2,
+    'quiz-invitations': 10,
+    'quiz-export': 2,
+    'quiz-answers': 7,
+    'submit-answer': 8,
+    'participant-activate': 4,
+    'login': 3,
+    'token-refresh': 2,
+    'me': 0,
+}
+
+SIZES = {
+    'small': dict(questions=1, participants=1, answered=0, quizzes=1, invitations=SLOW_REPEAT),
+    'large': dict(questions=300, participants=2000, answered=5, quizzes=250, invitations=SLOW_REPEAT),
+}
+
+
+def build_data_set(name, questions, participants, answered, quizzes, invitations):
+    """
+    A quiz with `questions` questions taken by `participants` participants
+    who answered `answered` questions each, plus the measured participant,
+    who is enrolled in `quizzes` quizzes and has answered nothing yet, and
+    `invitations` pending invitations.
+    """
+    creator = CustomUser.objects.create(username=f'{name}-creator', email=f'{name}-creator@example.com')
+    quiz = build_quiz(creator, questions=questions, choices=4, title=f'{name} quiz')
+    question_list = list(quiz.questions.prefetch_related('choices').order_by('id'))
+
+    others = create_participants(participants, prefix=f'{name}-p')
+    enrol(quiz, others)
+    ParticipantAnswer.objects.bulk_create(
+        ParticipantAnswer(
+            participant=user.participant_profile,
+            quiz=quiz,
+            question=question,
+            selected_choice=question.choices.all()[i % 4],
+        )
+        for i, user in enumerate(others)
+        for question in question_list[:answered]
+    )
+
+    user = create_participants(1, prefix=f'{name}-me')[0]
+    user.password = make_password(PASSWORD)
+    user.save(update_fields=['password'])
+    enrol(quiz, [user])
+    extra = Quiz.objects.bulk_create(
+        Quiz(title=f'{name} extra {i}', creator=creator) for i in range(quizzes - 1)
+    )
+    for other_quiz in extra:
+        enrol(other_quiz, [user])
+
+    invited = create_participants(invitations, prefix=f'{name}-invited')
+    CustomUser.objects.filter(pk__in=[u.pk for u in invited]).update(is_active=False)
+    enrol(quiz, invited, accepted=False)
+
+    rebuild_counters([quiz.pk])
+    return SimpleNamespace(
+        name=name,
+        quiz=quiz,
+        # (question id, id of its correct choice): plain data survives the
+        # per-test deep copy of setUpTestData, prefetched querysets do not
+        questions=[(question.id, question.choices.all()[0].id) for question in question_list],
+        user=user,
+        tokens=[
+            str(token) for token in QuizParticipant.objects.filter(
+                participant__user__in=invited
+            ).values_list('invitation_token', flat=True)
+        ],
+    )
+
+
+@tag('performance')
+class QueryBudgetTests(APITestCase):
+    """Query budgets and timings of every route in quiz/urls.py and accounts/urls.py."""
+
+    timings = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data_sets = {
+            name: build_data_set(name, **size) for name, size in SIZES.items()
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        path = os.environ.get('QUIZ_PERF_REPORT')
+        if not path:
+            return
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'sizes': SIZES,
+            'endpoints': cls.timings,
+        }
+        with open(path, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+    def authenticate(self, data):
+        token = for_user(data.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def measure(self, route, data, request, repeat=REPEAT, expected_status=status.HTTP_200_OK):
+        """
+        Issue `request(i)` `repeat` times; each must hit exactly the budget
+        of `route`. Records the latencies under the data set's name.
+        """
+        latencies = []
+        for i in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = request(i)
+                latencies.append(time.perf_counter() - start)
+            self.assertEqual(response.status_code, expected_status, (route, data.name, response.content))
+            self.assertEqual(
+                len(ctx.captured_queries), BUDGETS[route],
+                f'{route} on the {data.name} data set issued:\n'
+                + '\n'.join(query['sql'] for query in ctx.captured_queries)
+            )
+        self.timings.setdefault(route, {'queries': BUDGETS[route]})[data.name] = summarize(latencies)
+        return response
+
+    def for_each_data_set(self, check):
+        for data in self.data_sets.values():
+            with self.subTest(data_set=data.name):
+                check(data)
+
+    def warm(self, data):
+        """Prime the quiz content cache, as in steady state."""
+        self.authenticate(data)
+        self.client.get(reverse('quiz-detail', args=[data.quiz.id]))
+
+    def test_quiz_list(self):
+        def check(data):
+            self.authenticate(data)
+            url = reverse('quiz-list')
+            response = self.measure('quiz-list', data, lambda i: self.client.get(url))
+            self.assertTrue(response.data['results'])
+        self.for_each_data_set(check)
+
+    def test_quiz_detail(self):
+        def check(data):
+            self.warm(data)
+            url = reverse('quiz-detail', args=[data.quiz.id])
+            response = self.measure('quiz-detail', data, lambda i: self.client.get(url))
+            self.assertEqual(len(response.data['questions']), len(data.questions))
+
+            etag = response['ETag']
+            self.measure(
+                'quiz-detail-not-modified', data,
+                lambda i: self.client.get(url, HTTP_IF_NONE_MATCH=etag),
+                expected_status=status.HTTP_304_NOT_MODIFIED,
+            )
+        self.for_each_data_set(check)
+
+    def test_quiz_progress(self):
+        def check(data):
+            self.authenticate(data)
+            url = reverse('quiz-progress', args=[data.quiz.id])
+            self.measure('quiz-progress', data, lambda i: self.client.get(url))
+        self.for_each_data_set(check)
+
+    def test_quiz_leaderboard(self):
+        def check(data):
+            self.authenticate(data)
+            url = reverse('quiz-leaderboard', args=[data.quiz.id])
+            self.client.get(url)  # cache the top
+            self.measure('quiz-leaderboard', data, lambda i: self.client.get(url))
+        self.for_each_data_set(check)
+
+    def test_quiz_analytics(self):
+        def check(data):
+            token = for_user(data.quiz.creator).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            url = reverse('quiz-analytics', args=[data.quiz.id])
+            self.client.get(url)  # warm the content cache
+            response = self.measure('quiz-analytics', data, lambda i: self.client.get(url))
+            self.assertEqual(len(response.data['questions']), len(data.questions))
+        self.for_each_data_set(check)
+
+    def test_quiz_invitations(self):
+        def check(data):
+            token = for_user(data.quiz.creator).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            url = reverse('quiz-invitations', args=[data.quiz.id])
+
+            def invite(i):
+                # New users, profiles and enrolments for a chunk of emails
+                emails = '\n'.join(f'{data.name}-new-{i}-{n}@example.com' for n in range(20))
+                response = self.client.post(url, emails.encode(), content_type='text/csv')
+                if not response.streaming:
+                    return response
+                # The invitations are made while the response streams
+                content = b''.join(response.streaming_content)
+                return SimpleNamespace(status_code=response.status_code, content=content)
+            response = self.measure('quiz-invitations', data, invite)
+            self.assertEqual(len(response.content.decode().splitlines()), 21)
+        self.for_each_data_set(check)
+
+    def test_quiz_export(self):
+        def check(data):
+            token = for_user(data.quiz.creator).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            def export(i):
+                response = self.client.get(reverse('quiz-export', args=[data.quiz.id, 'results', 'csv']))
+                if not response.streaming:
+                    return response
+                # The rows are read while the response streams
+                content = b''.join(response.streaming_content)
+                return SimpleNamespace(status_code=response.status_code, content=content)
+            response = self.measure('quiz-export', data, export)
+            self.assertEqual(len(response.content.decode().splitlines()), data.quiz.quizparticipant_set.count() + 1)
+        self.for_each_data_set(check)
+
+    def test_submit_answer(self):
+        def check(data):
+            self.warm(data)
+
+            def submit(i):
+                question_id, choice_id = data.questions[-1 - i]
+                return self.client.post(
+                    reverse('submit-answer', args=[data.quiz.id, question_id]),
+                    {'selected_choice': choice_id},
+                    format='json'
+                )
+            repeat = min(REPEAT, len(data.questions))
+            self.measure('submit-answer', data, submit, repeat=repeat,
+                         expected_status=status.HTTP_201_CREATED)
+        self.for_each_data_set(check)
+
+    def test_batch_answers(self):
+        def check(data):
+            self.warm(data)
+            url = reverse('quiz-answers', args=[data.quiz.id])
+            # Up to 100 answers: SQLite splits larger inserts in several
+            # statements, so the budget depends on the batch size
+            batch = data.questions[:100]
+
+            def submit(i):
+                return self.client.post(url, {'answers': [
+                    {'question': question_id, 'selected_choice': choice_id}
+                    for question_id, choice_id in batch
+                ]}, format='json')
+            self.measure('quiz-answers', data, submit, repeat=1,
+                         expected_status=status.HTTP_201_CREATED)
+        self.for_each_data_set(check)
+
+    def test_activate(self):
+        def check(data):
+            url = reverse('participant-activate')
+            self.measure(
+                'participant-activate', data,
+                lambda i: self.client.patch(url, {'token': data.tokens[i], 'password': PASSWORD}, format='json'),
+                repeat=SLOW_REPEAT,
+            )
+        self.for_each_data_set(check)
+
+    def test_login(self):
+        def check(data):
+            url = reverse('login')
+            credentials = {'username': data.user.username, 'password': PASSWORD}
+            self.client.post(url, credentials, format='json')  # the user already has a session
+            self.measure(
+                'login', data,
+                lambda i: self.client.post(url, credentials, format='json'),
+                repeat=SLOW_REPEAT,
+            )
+        self.for_each_data_set(check)
+
+    def test_token_refresh(self):
+        def check(data):
+            url = reverse('token-refresh')
+            session = {'refresh': str(for_user(data.user))}
+
+            def refresh(i):
+                # Each refresh rotates the session: send the token it returned
+                response = self.client.post(url, session, format='json')
+                session['refresh'] = response.data.get('refresh')
+                return response
+            refresh(0)  # the user already has a session
+            self.measure('token-refresh', data, refresh)
+        self.for_each_data_set(check)
+
+    def test_me(self):
+        def check(data):
+            self.authenticate(data)
+            url = reverse('me')
+            self.client.get(url)  # the full user is cached
+            self.measure('me', data, lambda i: self.client.get(url))
+        self.for_each_data_set(check)
@@ -0,0 +1,105 @@
+import marshal
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from accounts.models import CustomUser
+from accounts.tokens import for_user
+from monitoring.models import RequestProfile
+from quiz.bench import async_views
+from quiz.tests.base import BaseQuizTestCase
+
+
+class ProfilingTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.user.refresh_from_db()
+        self.staff = CustomUser.objects.create_superuser(
+            username='staff', email='staff@example.com', password='staffpass'
+        )
+        self.list_url = reverse('quiz-list')
+
+    def get(self, user, url=None, **headers):
+        token = for_user(user).access_token
+        return self.client.get(url or self.list_url, headers={'authorization': f'Bearer {token}', **headers})
+
+    # Test if a staff user's flagged request is profiled with its SQL log
+    def test_staff_request(self):
+        response = self.get(self.staff, **{'x-profile': '1', 'x-request-id': 'req-42'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Profile-Id'], 'req-42')
+
+        profile = RequestProfile.objects.get(request_id='req-42')
+        self.assertEqual((profile.route, profile.status_code, profile.user), ('quiz-list', 200, self.staff))
+        self.assertFalse(profile.sampled)
+        self.assertIn('cumulative', profile.stats)
+        self.assertEqual(profile.query_count, len(profile.statements))
+        self.assertTrue(any('quiz_quiz' in statement['sql'] for statement in profile.statements))
+        self.assertTrue(marshal.loads(bytes(profile.profile)))
+
+        self.get(self.staff, url=self.list_url + '?profile=1')
+        self.assertEqual(RequestProfile.objects.count(), 2)
+
+    # Test if flagged requests of other users and unflagged ones never start the profiler
+    def test_not_profiled(self):
+        with mock.patch('monitoring.profiling.Run') as run:
+            response = self.get(self.user, **{'x-profile': '1'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('X-Profile-Id', response)
+            # A forged staff claim fails the signature check
+            token = for_user(self.user).access_token
+            token['is_staff'] = True
+            forged = str(token)[:-4] + 'AAAA'
+            self.client.get(self.list_url, headers={'authorization': f'Bearer {forged}', 'x-profile': '1'})
+            self.client.get(self.list_url + '?profile=1')
+            self.get(self.staff)
+        run.assert_not_called()
+        self.assertFalse(RequestProfile.objects.exists())
+
+    # Test if a staff user signed in to the admin can profile its pages
+    def test_staff_session(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('admin:quiz_quiz_changelist'), headers={'x-profile': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile = RequestProfile.objects.get(request_id=response['X-Profile-Id'])
+        self.assertEqual(profile.user, self.staff)
+
+    # Test if the sampling rate profiles any caller's requests, keeping the newest
+    @override_settings(MONITORING_PROFILE_SAMPLE_RATE=1.0, MONITORING_PROFILE_KEEP=2)
+    def test_sampling(self):
+        for _ in range(3):
+            self.get(self.user)
+        profiles = list(RequestProfile.objects.order_by('pk'))
+        self.assertEqual(len(profiles), 2)
+        self.assertTrue(all(profile.sampled and profile.user == self.user for profile in profiles))
+
+    # Test if the admin lists profiles and serves them for download
+    def test_admin(self):
+        request_id = self.get(self.staff, **{'x-profile': '1'})['X-Profile-Id']
+        profile = RequestProfile.objects.get(request_id=request_id)
+        self.client.credentials()
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse('admin:monitoring_requestprofile_changelist'))
+        self.assertContains(response, f'{request_id}.prof')
+        response = self.client.get(reverse('admin:monitoring_requestprofile_change', args=[profile.pk]))
+        self.assertContains(response, 'quiz_quiz')
+        response = self.client.get(reverse('admin:monitoring_requestprofile_download', args=[profile.pk]))
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{request_id}.prof"')
+        self.assertEqual(marshal.loads(response.content), marshal.loads(bytes(profile.profile)))
+
+    # Test if async views are profiled with the SQL they run in worker threads
+    @override_settings(MONITORING_PROFILE_SAMPLE_RATE=1.0)
+    async def test_async_views(self):
+        token = await sync_to_async(for_user)(self.user)
+        with async_views():
+            response = await self.async_client.get(
+                reverse('quiz-detail', args=[self.quiz.id]), headers={'authorization': f'Bearer {token.access_token}'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile = await RequestProfile.objects.aget(request_id=response['X-Profile-Id'])
+        self.assertEqual(profile.route, 'quiz-detail')
+        self.assertGreater(profile.query_count, 0)
@@ -0,0 +1,138 @@
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Quiz, Question, Choice, QuizParticipant, ParticipantAnswer, ChoiceAnswerCount
+
+
+class ProgressTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.progress_url = reverse('quiz-progress', args=[self.quiz.id])
+        self.question2 = Question.objects.create(quiz=self.quiz, text='Second question')
+        self.choice2_yes = Choice.objects.create(question=self.question2, text='Yes', is_correct=True)
+        self.choice2_no = Choice.objects.create(question=self.question2, text='No', is_correct=False)
+
+    def answer(self, question, choice):
+        return ParticipantAnswer.objects.create(
+            participant=self.participant, quiz=self.quiz, question=question, selected_choice=choice
+        )
+
+    def counters(self):
+        qp = QuizParticipant.objects.select_related('quiz').get(pk=self.qp.pk)
+        return qp.quiz.question_count, qp.answered_count, qp.correct_count
+
+    # Test if progress is served by a single query
+    def test_progress_single_query(self):
+        self.answer(self.question, self.choice_yes)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.progress_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_questions'], 2)
+        self.assertEqual(response.data['answered'], 1)
+        self.assertEqual(response.data['percent_complete'], 50.0)
+        self.assertEqual(response.data['current_score'], 50.0)
+
+    # Test if progress for a quiz the user is not in is not found
+    def test_progress_other_quiz(self):
+        other = Quiz.objects.create(title='Other', creator=self.user)
+        response = self.client.get(reverse('quiz-progress', args=[other.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test if counters follow answers and questions being added and removed
+    def test_counters_follow_changes(self):
+        self.assertEqual(self.counters(), (2, 0, 0))
+        self.answer(self.question, self.choice_yes)
+        answer = self.answer(self.question2, self.choice2_no)
+        self.assertEqual(self.counters(), (2, 2, 1))
+
+        answer.delete()
+        self.assertEqual(self.counters(), (2, 1, 1))
+
+        self.question.delete()
+        self.assertEqual(self.counters(), (1, 0, 0))
+
+    # Test if deleting a selected choice discounts the answers to it
+    def test_counters_follow_choice_deletion(self):
+        self.answer(self.question, self.choice_yes)
+        self.choice_yes.delete()
+        self.assertEqual(self.counters(), (2, 0, 0))
+
+    # Test if changing which choice is correct recounts and re-scores the answers to it
+    def test_counters_follow_correct_choice_change(self):
+        # Through the API, which completes the enrolment with its score
+        for question, choice in ((self.question, self.choice_no), (self.question2, self.choice2_yes)):
+            self.client.post(reverse('submit-answer', args=[self.quiz.id, question.id]),
+                             {'selected_choice': choice.id}, format='json')
+        self.assertEqual(self.counters(), (2, 2, 1))
+        self.assertEqual(QuizParticipant.objects.get(pk=self.qp.pk).score, 50.0)
+
+        self.choice_no.is_correct = True
+        self.choice_no.save()
+        self.assertEqual(self.counters(), (2, 2, 2))
+        self.assertEqual(QuizParticipant.objects.get(pk=self.qp.pk).score, 100.0)
+
+        self.choice2_yes.is_correct = False
+        self.choice2_yes.save(update_fields=['is_correct'])
+        self.assertEqual(self.counters(), (2, 2, 1))
+        self.assertEqual(QuizParticipant.objects.get(pk=self.qp.pk).score, 50.0)
+
+    # Test if changing the selected choice of an answer moves it between choices
+    def test_counters_follow_selected_choice_change(self):
+        answer = self.answer(self.question, self.choice_no)
+        self.assertEqual(self.counters(), (2, 1, 0))
+
+        answer.selected_choice = self.choice_yes
+        answer.save()
+        self.assertEqual(self.counters(), (2, 1, 1))
+        self.assertEqual(
+            dict(ChoiceAnswerCount.objects.filter(question=self.question).values_list('choice', 'answer_count')),
+            {self.choice_yes.id: 1, self.choice_no.id: 0},
+        )
+
+    def submit(self, question, choice):
+        return self.client.post(reverse('submit-answer', args=[self.quiz.id, question.id]),
+                                {'selected_choice': choice.id}, format='json')
+
+    # Test if deleting the only unanswered question completes the enrolment with its score
+    def test_question_deletion_completes(self):
+        self.submit(self.question, self.choice_yes)
+        self.assertIsNone(QuizParticipant.objects.get(pk=self.qp.pk).completed_at)
+
+        self.question2.delete()
+        qp = QuizParticipant.objects.get(pk=self.qp.pk)
+        self.assertIsNotNone(qp.completed_at)
+        self.assertEqual((qp.answered_count, qp.score), (1, 100.0))
+
+    # Test if deleting an answered question re-scores a completed enrolment
+    def test_question_deletion_rescores(self):
+        self.submit(self.question, self.choice_yes)
+        self.submit(self.question2, self.choice2_no)
+        completed_at = QuizParticipant.objects.get(pk=self.qp.pk).completed_at
+        self.assertEqual(QuizParticipant.objects.get(pk=self.qp.pk).score, 50.0)
+
+        self.question2.delete()
+        qp = QuizParticipant.objects.get(pk=self.qp.pk)
+        self.assertEqual((qp.answered_count, qp.correct_count, qp.score), (1, 1, 100.0))
+        self.assertEqual(qp.completed_at, completed_at)
+
+    # Test if deleting the creator deletes the quiz without discounting answers twice
+    def test_creator_deletion(self):
+        self.answer(self.question, self.choice_yes)
+        self.answer(self.question2, self.choice2_yes)
+        self.user.delete()
+        self.assertFalse(Quiz.objects.filter(pk=self.quiz.pk).exists())
+
+    # Test if the rebuild command recomputes drifted counters
+    def test_rebuild_counters(self):
+        self.answer(self.question, self.choice_yes)
+        self.answer(self.question2, self.choice2_yes)
+        Quiz.objects.update(question_count=0)
+        QuizParticipant.objects.update(answered_count=7, correct_count=7)
+
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.counters(), (2, 2, 2))
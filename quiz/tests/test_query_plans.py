@@ -0,0 +1,86 @@
+"""
+Query-plan regression checks: the statements of the hot paths must be
+answered from indexes on the large data set, with no full table scan.
+
+Run with the performance suite: `python manage.py test --tag performance`.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import tag
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import CustomUser
+from accounts.tokens import for_user
+from quiz.counters import rebuild_counters
+from quiz.tests.plans import QueryPlanMixin
+from quiz.tests.test_performance import SIZES, build_data_set
+
+
+@tag('performance')
+class QueryPlanTests(QueryPlanMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_data_set('plans', **SIZES['large'])
+        cls.admin = CustomUser.objects.create_superuser(
+            username='plans-admin', email='plans-admin@example.com', password='adminpass'
+        )
+        # Table statistics, as a production database has them
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        # Quiz ids repeat across test classes: no snapshot of another class's quiz
+        cache.clear()
+        token = for_user(self.data.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Steady state: the quiz content is cached
+        self.client.get(reverse('quiz-detail', args=[self.data.quiz.id]))
+
+    # Test if the quiz detail looks up the enrolment and its answers by index
+    def test_quiz_detail(self):
+        with self.assertNoFullScans():
+            response = self.client.get(reverse('quiz-detail', args=[self.data.quiz.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # Test if progress reads the enrolment by index
+    def test_quiz_progress(self):
+        with self.assertNoFullScans():
+            response = self.client.get(reverse('quiz-progress', args=[self.data.quiz.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # Test if submitting an answer checks and updates the counters by index
+    def test_submit_answer(self):
+        question_id, choice_id = self.data.questions[-1]
+        with self.assertNoFullScans():
+            response = self.client.post(
+                reverse('submit-answer', args=[self.data.quiz.id, question_id]),
+                {'selected_choice': choice_id}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    # Test if a batch of answers is checked against earlier ones by index
+    def test_batch_answers(self):
+        answers = [
+            {'question': question_id, 'selected_choice': choice_id}
+            for question_id, choice_id in self.data.questions[:20]
+        ]
+        with self.assertNoFullScans():
+            response = self.client.post(
+                reverse('quiz-answers', args=[self.data.quiz.id]), {'answers': answers}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    # Test if the admin statistics of each listed quiz come from indexes
+    def test_admin_changelist(self):
+        self.client.force_login(self.admin)
+        # The changelist pages through every quiz: quiz_quiz is read in full
+        with self.assertNoFullScans(allowed=('quiz_quiz',)):
+            response = self.client.get(reverse('admin:quiz_quiz_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+    # Test if rebuilding the counters of a quiz reads only its rows
+    def test_rebuild_counters(self):
+        with self.assertNoFullScans():
+            rebuild_counters([self.data.quiz.pk])
@@ -0,0 +1,66 @@
+from django.urls import reverse
+from rest_framework import status
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Question, Choice, ParticipantAnswer
+
+
+class QuizDetailTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.activate(password='newpass')
+        self.client.force_authenticate(user=self.user)
+        self.detail_url = reverse('quiz-detail', args=[self.quiz.id])
+
+    def add_questions(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                question = Question.objects.create(quiz=self.quiz, text=f'Question {i}')
+                Choice.objects.create(question=question, text='Right', is_correct=True)
+                Choice.objects.create(question=question, text='Wrong', is_correct=False)
+                if i % 2:
+                    ParticipantAnswer.objects.create(
+                        participant=self.participant,
+                        quiz=self.quiz,
+                        question=question,
+                        selected_choice=question.choices.first(),
+                    )
+
+    def count_detail_queries(self):
+        # cold cache: quiz, questions, choices, answers
+        with self.assertNumQueries(4):
+            self.client.get(self.detail_url)
+        # warm cache: quiz, answers
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    # Test if detail returns nested questions, choices and the selected choice
+    def test_detail_includes_selected_choice(self):
+        ParticipantAnswer.objects.create(
+            participant=self.participant,
+            quiz=self.quiz,
+            question=self.question,
+            selected_choice=self.choice_no,
+        )
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        question = response.data['questions'][0]
+        self.assertEqual(question['selected_choice_id'], self.choice_no.id)
+        self.assertEqual(
+            [choice['id'] for choice in question['choices']],
+            [self.choice_yes.id, self.choice_no.id]
+        )
+
+    # Test if unanswered questions report no selected choice
+    def test_detail_unanswered_question(self):
+        response = self.client.get(self.detail_url)
+        self.assertIsNone(response.data['questions'][0]['selected_choice_id'])
+
+    # Test if the number of queries does not grow with the quiz size
+    def test_detail_query_count_independent_of_quiz_size(self):
+        self.count_detail_queries()
+        self.add_questions(50)
+        response = self.count_detail_queries()
+        self.assertEqual(len(response.data['questions']), 51)
@@ -0,0 +1,57 @@
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from quiz.tests.base import BaseQuizTestCase
+from quiz.models import Quiz, QuizParticipant
+
+
+class QuizListTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('quiz-list')
+
+    def enrol_in(self, count):
+        now = timezone.now()
+        quizzes = Quiz.objects.bulk_create(
+            Quiz(title=f'Quiz {i}', creator=self.user, created_at=now + timedelta(minutes=i))
+            for i in range(count)
+        )
+        QuizParticipant.objects.bulk_create(
+            QuizParticipant(quiz=quiz, participant=self.participant) for quiz in quizzes
+        )
+        return quizzes
+
+    # Test if the list exposes the slim field set only
+    def test_list_fields(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quiz = response.data['results'][0]
+        self.assertEqual(
+            set(quiz),
+            {'id', 'title', 'description', 'question_count', 'created_at', 'updated_at'}
+        )
+        self.assertEqual(quiz['question_count'], 1)
+
+    # Test if only the caller's quizzes are listed
+    def test_list_only_enrolled(self):
+        Quiz.objects.create(title='Not mine', creator=self.user)
+        response = self.client.get(self.list_url)
+        self.assertEqual([q['id'] for q in response.data['results']], [self.quiz.id])
+
+    # Test if cursor pages walk every quiz once, newest first, at constant cost
+    def test_list_cursor_pages(self):
+        quizzes = self.enrol_in(45)
+        expected = [quiz.id for quiz in reversed(quizzes)] + [self.quiz.id]
+
+        seen = []
+        url = f'{self.list_url}?page_size=10'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [quiz['id'] for quiz in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, expected)
@@ -0,0 +1,118 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from accounts.models import CustomUser
+from quiz.bench import async_views
+from quiz.models import Quiz, Question, Choice, QuizParticipant, ParticipantAnswer
+from quiz.tests.base import BaseQuizTestCase
+from quiz.tests.replicas import sync_replica
+
+
+@override_settings(QUIZ_READ_REPLICA='replica')
+class ReplicaRoutingTests(BaseQuizTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        super().setUp()
+        self.progress_url = reverse('quiz-progress', args=[self.quiz.id])
+        self.detail_url = reverse('quiz-detail', args=[self.quiz.id])
+
+    def sign_in(self):
+        """Activate the participant on the primary, then let the replica catch up."""
+        access = self.activate(password='newpass').data['access']
+        self.auth = {'authorization': f'Bearer {access}'}
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        sync_replica()
+        self.unpin()
+
+    def unpin(self):
+        # Pins live in the cache: clearing it ends them
+        cache.clear()
+
+    def lag(self):
+        """A write the replica has not received yet."""
+        Quiz.objects.filter(pk=self.quiz.pk).update(title='Renamed on the primary')
+
+    # Test if the read-only quiz views read the replica only
+    def test_reads_from_replica(self):
+        self.sign_in()
+        self.lag()
+        with CaptureQueriesContext(connections['default']) as primary:
+            response = self.client.get(reverse('quiz-list'))
+            self.assertEqual(self.client.get(self.progress_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['title'], 'Reality check quiz')
+        self.assertEqual(len(primary.captured_queries), 0)
+
+        with override_settings(QUIZ_READ_REPLICA=None):
+            response = self.client.get(reverse('quiz-list'))
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed on the primary')
+
+    # Test if a participant reads their answer right after submitting it
+    def test_submission_pins_to_primary(self):
+        self.sign_in()
+        response = self.client.post(self.answer_url, {'selected_choice': self.choice_yes.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(self.progress_url).data['answered'], 1)
+
+        # Once the pin expires, reads go back to the (here, lagging) replica
+        self.unpin()
+        self.assertEqual(self.client.get(self.progress_url).data['answered'], 0)
+
+    # Test if activation pins the new user, whose enrolment the replica still shows pending
+    def test_activation_pins_to_primary(self):
+        sync_replica()
+        access = self.activate(password='newpass').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get(self.progress_url).status_code, status.HTTP_200_OK)
+        self.unpin()
+        self.assertEqual(self.client.get(self.progress_url).status_code, status.HTTP_403_FORBIDDEN)
+
+    # Test if the shared quiz content and leaderboard top are built from the primary
+    def test_shared_caches_built_from_primary(self):
+        self.sign_in()
+        self.lag()
+        QuizParticipant.objects.filter(pk=self.qp.pk).update(score=100, completed_at=timezone.now())
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['title'], 'Renamed on the primary')
+        response = self.client.get(reverse('quiz-leaderboard', args=[self.quiz.id]))
+        self.assertEqual(response.data['completed'], 1)
+        # The caller's own rank still comes from the lagging replica
+        self.assertIsNone(response.data['me'])
+
+    # Test if the admin statistics read the replica
+    def test_admin_changelist(self):
+        admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass'
+        )
+        self.client.force_login(admin)
+        sync_replica()
+        self.lag()
+        response = self.client.get(reverse('admin:quiz_quiz_changelist'))
+        self.assertContains(response, 'Reality check quiz')
+        self.assertNotContains(response, 'Renamed on the primary')
+
+    # Test if the async views read the replica and pin after a submission
+    async def test_async_views(self):
+        question = await Question.objects.acreate(quiz=self.quiz, text='Second question')
+        choice = await Choice.objects.acreate(question=question, text='Yes', is_correct=True)
+        await sync_to_async(self.sign_in)()
+        # An answer the replica has not received yet
+        await ParticipantAnswer.objects.acreate(
+            participant=self.participant, quiz=self.quiz, question=question, selected_choice=choice
+        )
+        with async_views():
+            response = await self.async_client.get(self.detail_url, headers=self.auth)
+            self.assertIsNone(response.json()['questions'][1]['selected_choice_id'])
+
+            response = await self.async_client.post(
+                self.answer_url, {'selected_choice': self.choice_yes.id},
+                content_type='application/json', headers=self.auth
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = await self.async_client.get(self.progress_url, headers=self.auth)
+            self.assertEqual(response.json()['answered'], 2)
@@ -0,0 +1,78 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from quiz.counters import rebuild_counters
+from quiz.models import Quiz, QuizParticipant, ParticipantAnswer, ChoiceAnswerCount
+from quiz.seeding import SyntheticDataGenerator
+
+
+class SyntheticDataTests(TestCase):
+
+    def generate(self, **kwargs):
+        options = dict(quizzes=2, questions=4, choices=3, participants=10,
+                       enrolment_ratio=0.5, answered_fraction=1.0, seed=3)
+        options.update(kwargs)
+        return SyntheticDataGenerator(**options).run()
+
+    def enrolments(self):
+        return list(
+            QuizParticipant.objects.order_by('id').values_list(
+                'participant__user__username', 'answered_count', 'correct_count', 'score'
+            )
+        )
+
+    # Test if the requested volumes are generated
+    def test_volumes(self):
+        stats = self.generate()
+        self.assertEqual(stats['users'], 11)
+        self.assertEqual(stats['enrolments'], 10)
+        self.assertEqual(stats['answers'], 40)
+        self.assertEqual(QuizParticipant.objects.count(), 10)
+        self.assertEqual(ParticipantAnswer.objects.count(), 40)
+        self.assertEqual(list(Quiz.objects.values_list('question_count', flat=True)), [4, 4])
+
+    # Test if the precomputed counters match the generated answers
+    def test_counters_match_answers(self):
+        self.generate(answered_fraction=0.5)
+        generated = self.enrolments()
+        choice_counts = sorted(ChoiceAnswerCount.objects.values_list('choice_id', 'answer_count'))
+        rebuild_counters()
+        self.assertEqual(
+            [row[:3] for row in generated],
+            [row[:3] for row in self.enrolments()]
+        )
+        self.assertEqual(
+            choice_counts,
+            sorted(ChoiceAnswerCount.objects.values_list('choice_id', 'answer_count'))
+        )
+        completed = QuizParticipant.objects.filter(completed_at__isnull=False)
+        self.assertFalse(completed.exists())
+
+    # Test if every enrolment that answered everything has a final score
+    def test_completed_enrolments_are_scored(self):
+        self.generate()
+        for username, answered, correct, score in self.enrolments():
+            self.assertEqual(answered, 4)
+            self.assertEqual(score, correct / 4 * 100)
+
+    # Test if the same seed yields the same data
+    def test_seed_is_deterministic(self):
+        def answers(prefix):
+            return list(
+                ParticipantAnswer.objects.filter(participant__user__username__startswith=prefix)
+                .order_by('id')
+                .values_list('participant__user__username', 'question__text', 'selected_choice__text')
+            )
+        self.generate(prefix='a')
+        self.generate(prefix='b')
+        self.assertEqual(
+            [(user[2:], question, choice) for user, question, choice in answers('a-')],
+            [(user[2:], question, choice) for user, question, choice in answers('b-')]
+        )
+
+    # Test if the command refuses to reuse a prefix
+    def test_command_rejects_existing_prefix(self):
+        call_command('seed_database', quizzes=1, participants=2, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('seed_database', quizzes=1, participants=2, stdout=StringIO())
@@ -0,0 +1,98 @@
+import threading
+from unittest import mock
+from django.core.cache import cache, caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserToken
+from accounts.sessions import CacheSessions
+from accounts.tokens import for_user
+from quiz.tests.base import BaseQuizTestCase
+
+
+class SessionTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first = self.activate(password='newpass').data
+
+    def login(self):
+        response = self.client.post(reverse('login'), {'username': 'participant1', 'password': 'newpass'},
+                                    format='json')
+        return response.data
+
+    def refresh(self, token):
+        return self.client.post(reverse('token-refresh'), {'refresh': token}, format='json')
+
+    def check_one_session(self):
+        response = self.refresh(self.first['refresh'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Refreshing rotates the session: the token it replaced is spent
+        self.assertEqual(self.refresh(self.first['refresh']).status_code, status.HTTP_401_UNAUTHORIZED)
+        current = response.data['refresh']
+
+        # A newer login ends the session
+        second = self.login()
+        response = self.refresh(current)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['detail'], 'Session ended by a newer login.')
+        self.assertEqual(self.refresh(second['refresh']).status_code, status.HTTP_200_OK)
+
+    # Test if only the refresh token last issued to a user can be refreshed
+    def test_one_session(self):
+        self.check_one_session()
+
+    # Test if a session is stored as the jti and expiry of its refresh token
+    def test_stored(self):
+        refresh = RefreshToken(self.login()['refresh'])
+        session = UserToken.objects.get(user=self.user)
+        self.assertEqual(session.jti, refresh['jti'])
+        self.assertEqual(int(session.expires_at.timestamp()), refresh['exp'])
+
+    # Test if a user without a recorded session can refresh, starting one
+    def test_no_session(self):
+        UserToken.objects.all().delete()
+        self.user.refresh_from_db()
+        legacy = str(for_user(self.user))
+        self.assertEqual(self.refresh(legacy).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh(legacy).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # Test if the cache store enforces the same rule, without writing UserToken rows
+    @override_settings(AUTH_SESSION_STORE='cache')
+    def test_cache_store(self):
+        UserToken.objects.all().delete()
+        self.first = self.login()
+        self.check_one_session()
+        self.assertFalse(UserToken.objects.exists())
+
+    # Test if concurrent refreshes of one token in the cache store rotate it once
+    def test_cache_store_concurrent_rotation(self):
+        store = CacheSessions()
+        old = for_user(self.user)
+        store.start(self.user.pk, old)
+        news = [for_user(self.user) for _ in range(2)]
+        results = [None, None]
+        # Both refreshes read the session before either writes it
+        both_read = threading.Barrier(2)
+        # Each thread has its own cache connection: patch their class
+        backend = type(caches['default'])
+        get = backend.get
+
+        def gated_get(self, *args, **kwargs):
+            value = get(self, *args, **kwargs)
+            both_read.wait(timeout=5)
+            return value
+
+        def rotate(i):
+            results[i] = store.rotate(self.user.pk, old, news[i])
+
+        with mock.patch.object(backend, 'get', gated_get):
+            threads = [threading.Thread(target=rotate, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sorted(results), [False, True])
+        winner = news[results.index(True)]
+        self.assertEqual(cache.get(store.key.format(self.user.pk)), winner['jti'])
@@ -0,0 +1,81 @@
+import time
+from unittest import mock
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from accounts.authentication import ClaimsUser, UserCache, user_cache
+from accounts.models import CustomUser
+from quiz.tests.base import BaseQuizTestCase
+
+
+class TokenClaimsTests(BaseQuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+        self.tokens = self.activate(password='newpass').data
+        self.progress_url = reverse('quiz-progress', args=[self.quiz.id])
+
+    def bearer(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    # Test if minted tokens carry the user type and participant profile id
+    def test_claims(self):
+        access = AccessToken(self.tokens['access'])
+        self.assertEqual((access['user_type'], access['participant_id']),
+                         (CustomUser.PARTICIPANT, self.participant.id))
+
+        response = self.client.post(reverse('token-refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(AccessToken(response.data['access'])['participant_id'], self.participant.id)
+
+        creator = CustomUser.objects.create_user(username='creator1', password='creatorpass')
+        response = self.client.post(reverse('login'), {'username': 'creator1', 'password': 'creatorpass'},
+                                    format='json')
+        access = AccessToken(response.data['access'])
+        self.assertEqual((access['user_type'], access['participant_id']), (CustomUser.CREATOR, None))
+
+    # Test if a quiz request is authenticated without reading the user
+    def test_no_user_query(self):
+        self.bearer(self.tokens['access'])
+        with self.assertNumQueries(1):  # enrolment
+            response = self.client.get(self.progress_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.wsgi_request.user, ClaimsUser)
+        self.assertEqual(response.wsgi_request.user.pk, self.user.pk)
+
+    # Test if tokens minted without the claims still authenticate
+    def test_legacy_token(self):
+        self.user.refresh_from_db()
+        self.bearer(RefreshToken.for_user(self.user).access_token)
+        with self.assertNumQueries(2):  # user + enrolment
+            response = self.client.get(self.progress_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # Test if /me reads the full user once, until it is saved
+    def test_me_cached(self):
+        self.bearer(self.tokens['access'])
+        url = reverse('me')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).data['email'], 'participant@example.com')
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.user.refresh_from_db()
+        self.user.save()  # evicts
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # Test if the user cache evicts the least recently used and expired users
+    def test_user_cache(self):
+        cache = UserCache(size=2, ttl=60)
+        users = [CustomUser(pk=pk, username=f'user{pk}') for pk in (1, 2, 3)]
+        cache.set(users[0])
+        cache.set(users[1])
+        cache.get(1)
+        cache.set(users[2])
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1).username, 'user1')
+        self.assertIsNot(cache.get(1), cache.get(1))
+
+        with mock.patch('accounts.authentication.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get(3))
@@ -1,6 +1,8 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from .views import QuizViewSet, SubmitAnswerView
+from . import async_views
+from .views import QuizViewSet, SubmitAnswerView, QuizExportView
 
 
 router = DefaultRouter()
@@ -8,6 +10,12 @@ router = DefaultRouter()
 router.register(r'quizzes', QuizViewSet, basename='quiz')
 
 urlpatterns = [
+    # Before the router: its format-suffix routes would take "answers.csv"
+    re_path(
+        r"^quizzes/(?P<pk>[0-9]+)/(?P<export>results|answers)\.(?P<fmt>csv|jsonl)$",
+        QuizExportView.as_view(),
+        name="quiz-export",
+    ),
     path('', include(router.urls)),
     path(
         "quizzes/<int:quiz_id>/questions/<int:question_id>/answers/",
@@ -15,3 +23,15 @@ urlpatterns = [
         name="submit-answer",
     ),
 ]
+
+if settings.QUIZ_ASYNC_VIEWS:
+    # Same paths and names as the routes above; listed first, they win
+    urlpatterns = [
+        path('quizzes/<int:pk>/', async_views.quiz_detail, name='quiz-detail'),
+        path('quizzes/<int:pk>/progress/', async_views.quiz_progress, name='quiz-progress'),
+        path(
+            "quizzes/<int:quiz_id>/questions/<int:question_id>/answers/",
+            async_views.submit_answer,
+            name="submit-answer",
+        ),
+    ] + urlpatterns
@@ -1,37 +1,132 @@
+import codecs
+from contextlib import ExitStack
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from .models import Quiz, Question, QuizParticipant, ParticipantAnswer
+from oper.db_routers import is_pinned, replica_reads
+from .analytics import quiz_analytics
+from .cache import get_quiz_content, overlay_answers
+from .conditional import quiz_detail_validators, progress_validators, respond_conditionally
+from .enrolment import get_enrolment
+from .exports import CONTENT_TYPES, export_lines
+from .ingestion import staged_ingestion
+from .invitations import CSV, JSONL, invite_participants, read_emails, invitation_csv
+from .leaderboard import get_top, get_rank
+from .models import Quiz, QuizParticipant, ParticipantAnswer, PendingAnswer
 from .serializers import (
-    QuizSerializer,
+    QuizListSerializer,
     QuizDetailSerializer,
     QuizProgressSerializer,
-    SubmitAnswerSerializer
+    LeaderboardSerializer,
+    QuizAnalyticsSerializer,
+    SubmitAnswerSerializer,
+    StageAnswerSerializer,
+    SubmitAnswerBatchSerializer
 )
-from .permissions import IsActivatedParticipant
+from .permissions import IsActivatedParticipant, IsQuizCreator
+
+
+def locked_enrolment(request, quiz_id):
+    """
+    Resolve the caller's enrolment in `quiz_id`, locked until the end of the
+    current transaction. Returns (enrolment or None, quiz) and raises 404
+    for an unknown quiz.
+    """
+    qp = get_enrolment(request, quiz_id, lock=True)
+    quiz = qp.quiz if qp else get_object_or_404(Quiz, pk=quiz_id)
+    return qp, quiz
+
+
+def check_enrolment_permissions(view, request, qp):
+    if qp is None:
+        view.permission_denied(request, message=IsActivatedParticipant.message)
+    view.check_object_permissions(request, qp)
+
+
+def progress_data(qp):
+    """Progress of an enrolment, from its counters."""
+    total = qp.quiz.question_count
+    answered = qp.answered_count
+    correct = qp.correct_count
+
+    return {
+        "started_at":       qp.started_at,
+        "completed_at":     qp.completed_at,
+        "total_questions":  total,
+        "answered":         answered,
+        "percent_complete": round(answered / total * 100, 2) if total else 0,
+        "current_score":    round(correct  / total * 100, 2) if total else 0,
+        "final_score":      qp.score,
+    }
 
 
 class QuizViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Quiz.objects.all()
-    serializer_class = QuizSerializer
+    serializer_class = QuizListSerializer
+    # Served from the read replica, unless the caller just wrote (see oper.db_routers)
+    replica_actions = ('list', 'retrieve', 'progress', 'leaderboard', 'analytics')
 
-    def get_queryset(self):
-        user = self.request.user
-        return Quiz.objects.filter(participants__user=user)
+    def dispatch(self, request, *args, **kwargs):
+        self.reads = ExitStack()
+        with self.reads:
+            return super().dispatch(request, *args, **kwargs)
 
-    # def get_queryset(self):
-    #     return Quiz.objects.filter(
-    #         quizparticipant__participant__user=self.request.user
-    #     ).distinct()
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # The caller is authenticated from here on
+        if self.action in self.replica_actions and not is_pinned(request.user.pk):
+            self.reads.enter_context(replica_reads())
+
+    def get_queryset(self):
+        # Semi-join: one row per quiz without DISTINCT, so keyset pages stay cheap
+        enrolled = QuizParticipant.objects.filter(
+            quiz=OuterRef('pk'),
+            participant__user_id=self.request.user.pk,
+        )
+        return Quiz.objects.filter(Exists(enrolled))
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return QuizDetailSerializer  # shows nested questions + answers
-        return QuizSerializer
+        return QuizListSerializer
+
+    def get_enrolment(self):
+        """The caller's enrolment in the requested quiz, 404 if there is none."""
+        qp = get_enrolment(self.request, self.kwargs[self.lookup_field])
+        if qp is None:
+            raise Http404
+        return qp
+
+    def retrieve(self, request, *args, **kwargs):
+        qp = self.get_enrolment()
+        # Shared content snapshot from the cache, overlaid with the caller's answers
+        content = get_quiz_content(qp.quiz)
+        etag, last_modified = quiz_detail_validators(qp, content)
+        return respond_conditionally(
+            request, etag, last_modified,
+            lambda: Response(overlay_answers(content, self.get_answer_map(qp))),
+        )
+
+    def get_answer_map(self, qp):
+        """
+        Map question id -> selected choice id for the enrolment's answers,
+        loaded with one query.
+        """
+        return dict(
+            ParticipantAnswer.objects.filter(
+                quiz_id=qp.quiz_id,
+                participant_id=qp.participant_id,
+            ).values_list('question_id', 'selected_choice_id')
+        )
     
     @extend_schema(
         responses={200: QuizProgressSerializer},
@@ -43,60 +138,208 @@ class QuizViewSet(viewsets.ReadOnlyModelViewSet):
         permission_classes=[IsActivatedParticipant]
     )
     def progress(self, request, pk=None):
-        quiz = get_object_or_404(self.get_queryset(), pk=pk)
-        qp = QuizParticipant.objects.get(
-                quiz=quiz,
-                participant=request.user.participant_profile
+        # Single-row read: counters are maintained on QuizParticipant/Quiz
+        qp = self.get_enrolment()
+        self.check_object_permissions(request, qp)
+        etag, last_modified = progress_validators(qp)
+        return respond_conditionally(
+            request, etag, last_modified, lambda: Response(self.get_progress(qp))
+        )
+
+    def get_progress(self, qp):
+        return progress_data(qp)
+
+    @extend_schema(
+        responses={200: LeaderboardSerializer},
+        tags=["quizzes"]
+    )
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[IsActivatedParticipant]
+    )
+    def leaderboard(self, request, pk=None):
+        qp = self.get_enrolment()
+        self.check_object_permissions(request, qp)
+        top = get_top(qp.quiz_id)
+        rank = get_rank(qp, top)
+        return Response(LeaderboardSerializer({
+            "completed": top['completed'],
+            "top": [
+                {**entry, "is_me": entry['participant_id'] == qp.participant_id}
+                for entry in top['entries']
+            ],
+            "me": {
+                "rank": rank,
+                "score": qp.score,
+                "completed_at": qp.completed_at,
+            } if rank else None,
+        }).data)
+
+    @extend_schema(
+        responses={200: QuizAnalyticsSerializer},
+        tags=["quizzes"]
+    )
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[IsQuizCreator]
+    )
+    def analytics(self, request, pk=None):
+        # Creators are not enrolled: look the quiz up outside get_queryset()
+        quiz = get_object_or_404(Quiz, pk=pk)
+        self.check_object_permissions(request, quiz)
+        return Response(QuizAnalyticsSerializer(quiz_analytics(quiz)).data)
+
+    @extend_schema(
+        request={'text/csv': OpenApiTypes.STR, 'application/jsonl': OpenApiTypes.STR},
+        responses={(200, 'text/csv'): OpenApiTypes.STR},
+        description=(
+            "Invite a list of emails (CSV, or JSONL with an application/jsonl body; "
+            "either as the request body or as a multipart `file`), creating missing "
+            "participants. Streams back one CSV row per email with its status and "
+            "invitation token."
+        ),
+        tags=["quizzes"]
+    )
+    @action(
+        detail=True,
+        methods=['post'],
+        permission_classes=[IsQuizCreator]
+    )
+    def invitations(self, request, pk=None):
+        quiz = get_object_or_404(Quiz, pk=pk)
+        self.check_object_permissions(request, quiz)
+
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({"file": ["No file was submitted."]})
+            source, name = upload, upload.name
+        else:
+            source, name = request.stream or [], ''
+        fmt = JSONL if 'json' in request.content_type or name.endswith(('.jsonl', '.ndjson')) else CSV
+
+        # Emails are read, invited and written back chunk by chunk while streaming
+        emails = read_emails(codecs.iterdecode(source, 'utf-8-sig'), fmt)
+        response = StreamingHttpResponse(
+            invitation_csv(invite_participants(quiz, emails)), content_type='text/csv'
+        )
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz.pk}-invitations.csv"'
+        return response
+
+    @extend_schema(
+        request=SubmitAnswerBatchSerializer,
+        responses={
+            201: OpenApiResponse(description="All answers submitted"),
+            207: OpenApiResponse(description="Some answers submitted, see per-item results"),
+            400: OpenApiResponse(description="No answer submitted"),
+        },
+        tags=["quizzes"]
+    )
+    @action(
+        detail=True,
+        methods=['post'],
+        permission_classes=[IsActivatedParticipant]
+    )
+    def answers(self, request, pk=None):
+        with transaction.atomic():
+            qp, quiz = locked_enrolment(request, pk)
+            check_enrolment_permissions(self, request, qp)
+
+            serializer = SubmitAnswerBatchSerializer(
+                data=request.data,
+                context={
+                    'request': request,
+                    'quiz_id': quiz.pk,
+                    'content': get_quiz_content(quiz),
+                }
             )
-        total = quiz.questions.count()
-        answered = ParticipantAnswer.objects.filter(
-            quiz=quiz, participant=qp.participant
-        ).count()
-        correct = ParticipantAnswer.objects.filter(
-            quiz=quiz,
-            participant=qp.participant,
-            selected_choice__is_correct=True
-        ).count()
+            serializer.is_valid(raise_exception=True)
+            results = serializer.save()
 
+        created = sum(1 for result in results if result['status'] == 'created')
+        if created == len(results):
+            status_code = status.HTTP_201_CREATED
+        elif created:
+            status_code = status.HTTP_207_MULTI_STATUS
+        else:
+            status_code = status.HTTP_400_BAD_REQUEST
         return Response({
-            "started_at":       qp.started_at,
-            "completed_at":     qp.completed_at,
-            "total_questions":  total,
-            "answered":         answered,
-            "percent_complete": round(answered / total * 100, 2) if total else 0,
-            "current_score":    round(correct  / total * 100, 2) if total else 0,
-            "final_score":      qp.score,
-        })
+            "created": created,
+            "failed": len(results) - created,
+            "results": results,
+        }, status=status_code)
 
 
 @extend_schema(
     tags=["quizzes"],
     request=SubmitAnswerSerializer,
-    responses={201: OpenApiResponse(description="Answer submitted successfully")}
+    responses={
+        201: OpenApiResponse(description="Answer submitted successfully"),
+        202: OpenApiResponse(description="Answer accepted, recorded shortly (staged ingestion)"),
+    }
 )
 class SubmitAnswerView(APIView):
     permission_classes = [IsActivatedParticipant]
 
     def post(self, request, quiz_id, question_id):
-        quiz = get_object_or_404(Quiz, pk=quiz_id)
-        question = get_object_or_404(Question, pk=question_id, quiz=quiz)
-        
-        # This ensures permissions run after object retrieval,
+        if staged_ingestion():
+            # No lock and no counters: the answer only joins the staging table
+            qp = get_enrolment(request, quiz_id)
+            quiz = qp.quiz if qp else get_object_or_404(Quiz, pk=quiz_id)
+            return self.submit(request, qp, quiz, question_id, StageAnswerSerializer)
+        with transaction.atomic():
+            # Caller's enrolment, locked until the answer is accounted for
+            qp, quiz = locked_enrolment(request, quiz_id)
+            return self.submit(request, qp, quiz, question_id, SubmitAnswerSerializer)
+
+    def submit(self, request, qp, quiz, question_id, serializer_class):
+        content = get_quiz_content(quiz)
+        if question_id not in content['choice_ids']:
+            raise Http404
+
+        # Permissions run after object retrieval,
         # giving correct 404 vs 403 semantics.
-        self.check_object_permissions(request, question)
+        check_enrolment_permissions(self, request, qp)
 
-        serializer = SubmitAnswerSerializer(
+        serializer = serializer_class(
             data=request.data,
             context={
                 'request': request,
-                'quiz': quiz,
-                'question': question,
+                'quiz_id': quiz.pk,
+                'question_id': question_id,
+                'content': content,
             }
         )
-        if serializer.is_valid():
-            answer = serializer.save()
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        answer = serializer.save()
+        if isinstance(answer, PendingAnswer):
             return Response({
-                "message": "Answer submitted successfully.",
-                "answer_id": answer.id
-            }, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                "message": "Answer accepted.",
+                "pending_id": answer.id
+            }, status=status.HTTP_202_ACCEPTED)
+        return Response({
+            "message": "Answer submitted successfully.",
+            "answer_id": answer.id
+        }, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    tags=["quizzes"],
+    responses={
+        (200, 'text/csv'): OpenApiTypes.STR,
+        (200, 'application/jsonl'): OpenApiTypes.STR,
+    },
+    description="Stream the results (one row per participant) or raw answers of a quiz, as CSV or JSONL.",
+)
+class QuizExportView(APIView):
+    permission_classes = [IsQuizCreator]
+
+    def get(self, request, pk, export, fmt):
+        quiz = get_object_or_404(Quiz, pk=pk)
+        self.check_object_permissions(request, quiz)
+        response = StreamingHttpResponse(export_lines(quiz.pk, export, fmt), content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz.pk}-{export}.{fmt}"'
+        return response